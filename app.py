@@ -1,8 +1,11 @@
-from flask import Flask, send_from_directory, request, jsonify
+from flask import Flask, Response, send_from_directory, request, jsonify
 import webbrowser
 import threading
+import queue
+import json
 import os
-from engine.command import takeCommand, set_voice_language, processTextCommand, test_command, allCommands, get_supported_languages, get_current_language
+from engine.command import takeCommand, set_voice_language, processTextCommand, test_command, allCommands, get_supported_languages, get_current_language, get_startup_status, get_whisper_stats, get_asr_stats, get_traces, get_provider_health, get_http_stats, get_llm_race_stats, get_response_cache_stats, get_semantic_cache_stats, get_ollama_model_stats, process_text_command_streaming, cancel_generation, reset_conversation
+from engine.speak_utils import get_tts_stats
 
 app = Flask(__name__, static_folder="www")
 
@@ -46,6 +49,43 @@ def api_process_text_command():
     response = processTextCommand(query)
     return jsonify({'response': response})
 
+@app.route('/api/stream', methods=['POST'])
+def api_stream():
+    """Server-sent events: {"token": ...} for each piece of the AI answer, then {"done": true, "response": ...}"""
+    data = request.get_json()
+    query = data.get('query')
+    events = queue.Queue()
+
+    def run():
+        try:
+            response = process_text_command_streaming(query, lambda text: events.put({'token': text}))
+            events.put({'done': True, 'response': response})
+        except Exception as e:
+            events.put({'done': True, 'error': str(e)})
+
+    def generate():
+        threading.Thread(target=run, name="spitch-stream", daemon=True).start()
+        try:
+            while True:
+                event = events.get()
+                yield f"data: {json.dumps(event)}\n\n"
+                if event.get('done'):
+                    break
+        except GeneratorExit:
+            # The client went away mid-answer: stop generating it
+            cancel_generation()
+            raise
+
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+@app.route('/api/cancel', methods=['POST'])
+def api_cancel():
+    return jsonify(cancel_generation())
+
+@app.route('/api/reset_conversation', methods=['POST'])
+def api_reset_conversation():
+    return jsonify(reset_conversation())
+
 @app.route('/api/test_command', methods=['GET'])
 def api_test_command():
     result = test_command()
@@ -66,6 +106,54 @@ def api_get_current_language():
     current_lang = get_current_language()
     return jsonify({'language': current_lang})
 
+@app.route('/api/startup_status', methods=['GET'])
+def api_startup_status():
+    return jsonify(get_startup_status())
+
+@app.route('/api/whisper_stats', methods=['GET'])
+def api_whisper_stats():
+    return jsonify(get_whisper_stats())
+
+@app.route('/api/asr_stats', methods=['GET'])
+def api_asr_stats():
+    return jsonify(get_asr_stats())
+
+@app.route('/api/tts_stats', methods=['GET'])
+def api_tts_stats():
+    return jsonify(get_tts_stats())
+
+@app.route('/api/provider_health', methods=['GET'])
+def api_provider_health():
+    return jsonify(get_provider_health())
+
+@app.route('/api/llm_race_stats', methods=['GET'])
+def api_llm_race_stats():
+    return jsonify(get_llm_race_stats())
+
+@app.route('/api/response_cache_stats', methods=['GET'])
+def api_response_cache_stats():
+    return jsonify(get_response_cache_stats())
+
+@app.route('/api/semantic_cache_stats', methods=['GET'])
+def api_semantic_cache_stats():
+    return jsonify(get_semantic_cache_stats())
+
+@app.route('/api/ollama_model_stats', methods=['GET'])
+def api_ollama_model_stats():
+    return jsonify(get_ollama_model_stats())
+
+@app.route('/api/http_stats', methods=['GET'])
+def api_http_stats():
+    return jsonify(get_http_stats())
+
+@app.route('/api/traces', methods=['GET'])
+def api_traces():
+    return jsonify(get_traces(request.args.get('limit', 20, type=int)))
+
+@app.route('/traces')
+def traces_page():
+    return send_from_directory("www", "traces.html")
+
 def open_browser():
     webbrowser.open_new('http://localhost:8000/')
 
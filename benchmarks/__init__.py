@@ -0,0 +1,6 @@
+"""
+Spitch benchmark suites
+
+Run from the repository root, e.g.:
+    python -m benchmarks.import_benchmark
+"""
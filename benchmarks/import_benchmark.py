@@ -0,0 +1,242 @@
+"""
+Import-time and startup benchmark with per-module budgets
+
+Imports every engine/* module plus main.py, app.py and mcp_server.py in a fresh
+interpreter (so each number includes the module's full transitive import cost),
+records wall-clock import time and resident-memory delta, and fails when a module
+exceeds its budget in benchmarks/import_budgets.json.
+
+Usage:
+    python -m benchmarks.import_benchmark
+    python -m benchmarks.import_benchmark --repeat 5 --output import_report.json
+    python -m benchmarks.import_benchmark --only engine.command main
+
+Exit code is 1 when any module is over budget (or fails to import with --strict).
+"""
+import argparse
+import datetime
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGETS_FILE = os.path.join(ROOT, 'benchmarks', 'import_budgets.json')
+RESULT_MARKER = "BENCHMARK_RESULT "
+
+# Imports that are known to cost hundreds of ms or open devices; reported when a target pulls them in
+HEAVY_MODULES = ['torch', 'whisper', 'numpy', 'selenium', 'pygame', 'pyautogui', 'openai',
+                 'speech_recognition', 'pyttsx3', 'spotipy', 'bs4', 'psutil', 'flask', 'mcp']
+
+ENTRY_POINTS = ['main', 'app', 'mcp_server']
+
+
+def discover_targets() -> List[str]:
+    """Every engine/*.py module plus the top-level entry points"""
+    engine_modules = sorted(
+        f"engine.{os.path.splitext(os.path.basename(path))[0]}"
+        for path in glob.glob(os.path.join(ROOT, 'engine', '*.py'))
+        if not path.endswith('__init__.py')
+    )
+    return engine_modules + ENTRY_POINTS
+
+
+def load_budgets(path: str = BUDGETS_FILE) -> Dict[str, Any]:
+    """Load budget configuration: {'default': {...}, 'modules': {name: {...}}, 'skip': [...]}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def budget_for(budgets: Dict[str, Any], module: str) -> Dict[str, float]:
+    budget = dict(budgets.get('default', {}))
+    budget.update(budgets.get('modules', {}).get(module, {}))
+    return budget
+
+
+# --- Child process: measure a single import ---
+
+def _rss_reader():
+    """Pick a resident-set-size reader before stubs are installed (psutil could be stubbed)"""
+    try:
+        import psutil
+        process = psutil.Process()
+        return lambda: process.memory_info().rss
+    except ImportError:
+        pass
+
+    if os.path.exists('/proc/self/statm'):
+        page_size = os.sysconf('SC_PAGE_SIZE')
+
+        def read_statm():
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * page_size
+        return read_statm
+
+    try:
+        import resource
+        # ru_maxrss is a peak value (KB on Linux, bytes on macOS); the best we have here
+        scale = 1 if sys.platform == 'darwin' else 1024
+        return lambda: resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    except ImportError:
+        return lambda: 0
+
+
+def measure_import(module: str, stub_missing: bool) -> Dict[str, Any]:
+    """Import one module in this (fresh) interpreter and describe the cost"""
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+    read_rss = _rss_reader()
+
+    from benchmarks import stubs
+    stubs.install(stub_missing=stub_missing)
+
+    import importlib
+    modules_before = set(sys.modules)
+    rss_before = read_rss()
+    error = None
+    start = time.perf_counter()
+    try:
+        importlib.import_module(module)
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+    import_seconds = time.perf_counter() - start
+    rss_after = read_rss()
+
+    new_modules = set(sys.modules) - modules_before
+    real_heavy = [
+        name for name in HEAVY_MODULES
+        if name in new_modules and not getattr(sys.modules.get(name), '__stub__', False)
+    ]
+    return {
+        'module': module,
+        'ok': error is None,
+        'error': error,
+        'import_ms': round(import_seconds * 1000, 2),
+        'rss_delta_mb': round((rss_after - rss_before) / (1024 * 1024), 2),
+        'modules_loaded': len(new_modules),
+        'heavy_imports': real_heavy,
+        'stubbed': sorted(set(stubs.stubbed_modules)),
+    }
+
+
+# --- Parent process: run every target and apply budgets ---
+
+def run_child(module: str, stub_missing: bool, timeout: float) -> Dict[str, Any]:
+    command = [sys.executable, '-m', 'benchmarks.import_benchmark', '--child', module]
+    if not stub_missing:
+        command.append('--no-stub-missing')
+    try:
+        completed = subprocess.run(command, cwd=ROOT, capture_output=True, text=True,
+                                   timeout=timeout, encoding='utf-8', errors='replace')
+    except subprocess.TimeoutExpired:
+        return {'module': module, 'ok': False, 'error': f"Timed out after {timeout}s",
+                'import_ms': timeout * 1000, 'rss_delta_mb': 0.0, 'modules_loaded': 0,
+                'heavy_imports': [], 'stubbed': []}
+
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+
+    stderr_tail = completed.stderr.strip().splitlines()[-1:] or ['no output']
+    return {'module': module, 'ok': False, 'error': f"Child crashed: {stderr_tail[0]}",
+            'import_ms': 0.0, 'rss_delta_mb': 0.0, 'modules_loaded': 0,
+            'heavy_imports': [], 'stubbed': []}
+
+
+def benchmark_module(module: str, repeat: int, stub_missing: bool, timeout: float) -> Dict[str, Any]:
+    """Run a module's import `repeat` times and keep the median sample"""
+    samples = [run_child(module, stub_missing, timeout) for _ in range(repeat)]
+    median_ms = statistics.median(s['import_ms'] for s in samples)
+    result = min(samples, key=lambda s: abs(s['import_ms'] - median_ms))
+    result['import_ms'] = round(median_ms, 2)
+    result['import_ms_samples'] = [s['import_ms'] for s in samples]
+    result['rss_delta_mb'] = round(statistics.median(s['rss_delta_mb'] for s in samples), 2)
+    return result
+
+
+def check_budget(result: Dict[str, Any], budget: Dict[str, float], strict: bool) -> List[str]:
+    """Return a list of human-readable budget violations for one result"""
+    violations = []
+    if 'import_ms' in budget and result['import_ms'] > budget['import_ms']:
+        violations.append(f"import {result['import_ms']:.0f}ms > {budget['import_ms']:.0f}ms")
+    if 'rss_mb' in budget and result['rss_delta_mb'] > budget['rss_mb']:
+        violations.append(f"memory {result['rss_delta_mb']:.1f}MB > {budget['rss_mb']:.1f}MB")
+    forbidden = [m for m in result['heavy_imports'] if m in budget.get('forbid_imports', [])]
+    if forbidden:
+        violations.append(f"forbidden top-level imports: {', '.join(forbidden)}")
+    if strict and not result['ok']:
+        violations.append(f"import failed: {result['error']}")
+    return violations
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure import time and memory of Spitch modules")
+    parser.add_argument('--only', nargs='+', help="Only benchmark these modules")
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh-interpreter samples per module")
+    parser.add_argument('--budgets', default=BUDGETS_FILE, help="Budget configuration JSON")
+    parser.add_argument('--output', help="Write the machine-readable report to this file")
+    parser.add_argument('--timeout', type=float, default=120.0, help="Per-import timeout in seconds")
+    parser.add_argument('--strict', action='store_true', help="Treat import failures as budget violations")
+    parser.add_argument('--no-stub-missing', action='store_true', help="Do not stub missing packages")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    stub_missing = not args.no_stub_missing
+
+    if args.child:
+        result = measure_import(args.child, stub_missing)
+        sys.stdout.flush()
+        print(RESULT_MARKER + json.dumps(result))
+        return 0
+
+    budgets = load_budgets(args.budgets)
+    skip = set(budgets.get('skip', []))
+    targets = [t for t in (args.only or discover_targets()) if t not in skip]
+
+    results = []
+    failures = 0
+    print(f"{'module':<34} {'import ms':>10} {'rss MB':>8}  status")
+    for module in targets:
+        result = benchmark_module(module, args.repeat, stub_missing, args.timeout)
+        result['budget'] = budget_for(budgets, module)
+        result['violations'] = check_budget(result, result['budget'], args.strict)
+        failures += bool(result['violations'])
+        results.append(result)
+
+        status = "OK" if result['ok'] else f"IMPORT ERROR ({result['error']})"
+        if result['violations']:
+            status = "OVER BUDGET: " + "; ".join(result['violations'])
+        print(f"{module:<34} {result['import_ms']:>10.1f} {result['rss_delta_mb']:>8.1f}  {status}")
+
+    report = {
+        'timestamp': datetime.datetime.now().isoformat(),
+        'git_revision': _git_revision(),
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'repeat': args.repeat,
+        'stub_missing': stub_missing,
+        'results': results,
+        'over_budget': failures,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    print(f"{failures} of {len(results)} modules over budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
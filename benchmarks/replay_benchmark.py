@@ -0,0 +1,548 @@
+"""
+Offline command replay benchmark
+
+Replays a corpus of typed/spoken commands through processTextCommand and, for
+the multi-step subset, straight through AITaskAgent.execute_task, with every
+outside dependency replaced by a stand-in:
+- Ollama and Gemini: a loopback FakeLLMServer (benchmarks/stubs.py) with
+  configurable latency and failure rate, reached through config (Ollama) and an
+  engine.http_client redirect (Gemini); OpenRouter/OpenAI is disabled
+- TTS: utterances finish instantly without touching an audio device
+- pyautogui, webbrowser, subprocess, os.system/os.startfile: recorded, never run
+- Task-agent skills: replaced by no-ops (keep them with --real-skills; their OS
+  calls are still faked)
+- time.sleep on the replay path (app launch waits, retry backoff): skipped and
+  totalled instead of slept
+- The response and semantic caches are off, so every AI command reaches a provider
+
+The real `requests` package is required: the engine's HTTP client has to reach
+the fake server. If it were stubbed, every LLM call would silently fail.
+
+Each command's routing path (direct, task_agent, compound, ai, ai_fallback,
+quick) is read from its trace (engine/tracing.py). ai_fallback is an AI command
+that no provider answered. The run fails when AI commands ran but the fake
+server saw no LLM request. The report gives p50/p95/p99 per path and
+commands per second, plus the corpus hash and git commit so runs of different
+commits can be compared with --baseline.
+
+The engine runs inside a temporary working directory, so conversation history,
+memory bank and trace files of the checkout are never touched.
+
+Usage:
+    python -m benchmarks.replay_benchmark
+    python -m benchmarks.replay_benchmark --commands 5000 --llm-latency-ms 20 --output replay.json
+    python -m benchmarks.replay_benchmark --corpus memory/traces.jsonl --baseline replay.json
+"""
+import argparse
+import contextlib
+import contextvars
+import datetime
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks import stubs  # noqa: E402
+
+PATHS = ['direct', 'task_agent', 'compound', 'ai', 'ai_fallback', 'quick']
+# Fake-server endpoints that mean an LLM was actually asked
+LLM_ENDPOINTS = ('ollama_generate', 'ollama_chat', 'gemini_generate', 'gemini_stream')
+
+# Templates for the generated corpus; {slots} are filled from FILLERS
+TEMPLATES = {
+    'direct': [
+        "what time is it", "time now", "what's the date today", "today", "play {song} on spotify",
+        "pause music", "pause the song", "resume the music", "continue", "google {topic}",
+        "calculate {a} plus {b}", "check my cpu usage", "how much ram do i have", "system info",
+        "set my location to {city}", "weather", "weather forecast for {days} days", "tell me a joke",
+        "something funny", "help", "what can you do", "open {app}", "trending songs on spotify",
+        "send a whatsapp message to {person}",
+    ],
+    'task_agent': [
+        "open {app} and write {text}", "open {app}, type {text}", "search google for {topic}",
+        "search the web for {topic}", "play {song} on youtube", "open youtube", "open github",
+        "create file {name}.txt", "write file {name}.txt", "what is {a} times {b}", "take a screenshot",
+        "open browser", "close browser", "go to {site}", "navigate to {site}", "fill the search box with {topic}",
+        "click the login button", "extract text from this page", "screenshot the page",
+        "generate an image of {thing}", "open spotify and play {song}", "set volume to {level}",
+        "mute", "lock the screen", "copy {text} to clipboard", "git status", "run command dir",
+        "find duplicate files", "show recent files", "organize my download files",
+    ],
+    'compound': [
+        "what time is it and tell me a joke", "what's the weather and what time is it",
+        "tell me a joke and what's the date", "who is {person} and why is the sky blue",
+        "pause music and tell me a joke", "explain {topic} and then summarize it",
+    ],
+    'ai': [
+        "who was {person}", "explain {topic} in simple terms", "write a poem about {thing}",
+        "how do i make {food}", "why is the sky blue", "what's the capital of {country}",
+        "give me a fun fact about {thing}", "recommend a movie for tonight", "summarize {topic} for me",
+        "how far is the moon", "translate good night to french",
+    ],
+    'quick': [
+        "hello", "hi there", "good morning", "thanks", "thank you so much", "how are you",
+        "who are you", "what is your name", "bye", "testing",
+    ],
+}
+
+FILLERS = {
+    'song': ["believer", "shape of you", "lofi beats", "cornfield chase", "bohemian rhapsody", "blinding lights"],
+    'topic': ["quantum computing", "black holes", "python decorators", "climate change", "the roman empire",
+              "machine learning", "best pizza near me"],
+    'city': ["london", "hyderabad", "new york", "tokyo", "berlin"],
+    'app': ["notepad", "chrome", "calculator", "vs code", "spotify", "word"],
+    'text': ["hello world", "meeting at five", "buy milk", "the quick brown fox"],
+    'person': ["mom", "albert einstein", "ada lovelace", "the first person on the moon"],
+    'name': ["notes", "todo", "report", "draft"],
+    'site': ["github.com", "wikipedia.org", "news.ycombinator.com"],
+    'thing': ["rain", "cats", "the ocean", "mountains", "coffee"],
+    'food': ["pasta", "pancakes", "biryani", "sourdough bread"],
+    'country': ["france", "japan", "brazil", "india"],
+    'a': ["12", "250", "7", "1024"],
+    'b': ["30", "4", "99", "16"],
+    'days': ["3", "5", "7"],
+    'level': ["20", "50", "80"],
+}
+
+# Share of each category in the generated corpus
+MIX = {'direct': 0.35, 'task_agent': 0.25, 'compound': 0.1, 'ai': 0.2, 'quick': 0.1}
+
+
+# --- Corpus ---
+
+def _misspell(text: str, rng: random.Random) -> str:
+    """Swap two neighbouring letters, like a recognition slip"""
+    positions = [i for i in range(len(text) - 1) if text[i].isalpha() and text[i + 1].isalpha()]
+    if not positions:
+        return text
+    i = rng.choice(positions)
+    return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+
+
+def generate_corpus(count: int, seed: int = 0, typo_rate: float = 0.1) -> List[str]:
+    """Deterministic mixed corpus of `count` commands drawn from TEMPLATES"""
+    rng = random.Random(seed)
+    categories = list(MIX)
+    weights = [MIX[c] for c in categories]
+    commands = []
+    for _ in range(count):
+        template = rng.choice(TEMPLATES[rng.choices(categories, weights)[0]])
+        command = template.format(**{k: rng.choice(v) for k, v in FILLERS.items()})
+        if rng.random() < typo_rate:
+            command = _misspell(command, rng)
+        commands.append(command)
+    return commands
+
+
+def load_corpus(path: str) -> List[str]:
+    """One command per line; lines of a traces JSONL file contribute their recorded query"""
+    commands = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('{'):
+                query = json.loads(line).get('attributes', {}).get('query')
+                if query:
+                    commands.append(query)
+            else:
+                commands.append(line)
+    return commands
+
+
+# --- Offline environment ---
+
+_replaying: contextvars.ContextVar = contextvars.ContextVar("replaying", default=False)
+
+
+class SideEffects:
+    """Counts the OS calls, sleeps and speech that the replay swallowed"""
+
+    def __init__(self):
+        self.calls: Dict[str, int] = {}
+        self.skipped_sleep = 0.0
+        self.utterances = 0
+
+    def record(self, name: str):
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+
+side_effects = SideEffects()
+
+
+def _replay_only(name: str, real, fake):
+    """Use fake while a command is being replayed (including its worker threads), real otherwise"""
+    def call(*args, **kwargs):
+        if _replaying.get():
+            side_effects.record(name)
+            return fake(*args, **kwargs)
+        return real(*args, **kwargs)
+    return call
+
+
+def _fake_completed(args=None, *rest, **kwargs):
+    return subprocess.CompletedProcess(args, 0, stdout='', stderr='')
+
+
+class _FakePopen:
+    def __init__(self, args=None, *rest, **kwargs):
+        self.args = args
+        self.pid = 0
+        self.returncode = 0
+
+    def communicate(self, *args, **kwargs):
+        return '', ''
+
+    def wait(self, *args, **kwargs):
+        return 0
+
+    def poll(self):
+        return 0
+
+
+def _skip_sleep(seconds):
+    side_effects.skipped_sleep += seconds
+
+
+def _patch_pyautogui(module):
+    for name in dir(module):
+        value = getattr(module, name)
+        if not name.startswith('_') and callable(value) and not isinstance(value, type):
+            setattr(module, name, _replay_only(f"pyautogui.{name}", value, lambda *a, **k: None))
+
+
+def configure(llm_url: str):
+    """Point the engine at the fake services and turn off subsystems a text replay never needs"""
+    import config
+    config.OLLAMA_BASE_URL = llm_url
+    config.GOOGLE_API_KEY = 'replay-benchmark'
+    config.OPENAI_API_KEY = None
+    config.OPENROUTER_API_KEY = None
+    os.environ.pop('OPENAI_API_KEY', None)
+    config.WHISPER_PRELOAD = False
+    config.TRACING_ENABLED = True
+    # Cached answers would turn most AI commands into lookups after the first few
+    config.RESPONSE_CACHE_ENABLED = False
+    config.SEMANTIC_CACHE_ENABLED = False
+
+
+def install_fakes():
+    """OS-level stand-ins; call before importing the engine"""
+    stubs.install(extra_patches={'pyautogui': _patch_pyautogui})
+    subprocess.run = _replay_only('subprocess.run', subprocess.run, _fake_completed)
+    subprocess.call = _replay_only('subprocess.call', subprocess.call, lambda *a, **k: 0)
+    subprocess.check_output = _replay_only('subprocess.check_output', subprocess.check_output, lambda *a, **k: '')
+    subprocess.Popen = _replay_only('subprocess.Popen', subprocess.Popen, _FakePopen)
+    os.system = _replay_only('os.system', os.system, lambda *a, **k: 0)
+    if hasattr(os, 'startfile'):
+        os.startfile = _replay_only('os.startfile', os.startfile, lambda *a, **k: None)
+    time.sleep = _replay_only('time.sleep', time.sleep, _skip_sleep)
+
+
+def silence_tts():
+    """Every utterance finishes instantly as spoken"""
+    from engine.tts_worker import tts_worker, Utterance, PRIORITY_NORMAL
+
+    def say(text, priority=PRIORITY_NORMAL):
+        side_effects.utterances += 1
+        utterance = Utterance(text, priority, 0)
+        utterance.started_at = utterance.queued_at
+        utterance.finish(True)
+        return utterance
+
+    tts_worker.say = say
+    tts_worker.interrupt = lambda: None
+
+
+def stub_skills(agent):
+    """Replace each task-agent skill with a no-op so only planning is measured"""
+    def no_op(action):
+        return lambda **params: f"{action} skipped"
+
+    for action, skill in list(agent.available_actions.items()):
+        if isinstance(skill, dict):
+            agent.available_actions[action] = dict(skill, func=no_op(action))
+        else:
+            agent.available_actions[action] = no_op(action)
+
+
+# --- Measurement ---
+
+def classify(trace: Optional[Dict[str, Any]]) -> str:
+    """Routing path that produced the answer, read from the command's trace"""
+    if not trace:
+        return 'quick'
+    names = {span['name'] for span in trace['spans']}
+    direct = [span for span in trace['spans'] if span['name'] == 'direct_route']
+    if 'compound_part' in names:
+        return 'compound'
+    if 'task_parse' in names and not direct:
+        return 'task_agent'
+    if direct and direct[0]['attributes'].get('handled'):
+        return 'direct'
+    if 'provider' in names:
+        return 'ai'
+    ai = [span for span in trace['spans'] if span['name'] == 'ai']
+    if ai:
+        return 'ai' if ai[0]['attributes'].get('cached') else 'ai_fallback'
+    return 'quick'
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def pct(p):
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 3)
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'p50_ms': pct(0.50),
+        'p95_ms': pct(0.95),
+        'p99_ms': pct(0.99),
+        'max_ms': round(ordered[-1], 3),
+    }
+
+
+def _timed(fn, *args, **kwargs):
+    token = _replaying.set(True)
+    start = time.perf_counter()
+    error = None
+    try:
+        fn(*args, **kwargs)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    elapsed = (time.perf_counter() - start) * 1000
+    _replaying.reset(token)
+    return elapsed, error
+
+
+def replay(commands: List[str], process, execute_task, tracer, warmup: int, verbose: bool) -> Dict[str, Any]:
+    """Run the corpus through both entry points and collect latencies per path"""
+    quiet = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    by_path: Dict[str, List[float]] = {p: [] for p in PATHS}
+    task_samples: List[float] = []
+    errors: List[Dict[str, str]] = []
+
+    with quiet:
+        for command in commands[:warmup]:
+            _timed(process, command)
+
+        start = time.perf_counter()
+        for command in commands:
+            elapsed, error = _timed(process, command)
+            recent = tracer.get_recent(1)
+            by_path[classify(recent[0] if recent else None)].append(elapsed)
+            if error:
+                errors.append({'command': command, 'error': error})
+        process_seconds = time.perf_counter() - start
+
+        from engine.command_rules import command_rules
+        complex_commands = [c for c in commands if command_rules.match(c).is_complex]
+        start = time.perf_counter()
+        for command in complex_commands:
+            elapsed, error = _timed(execute_task, command, speak_func=lambda text: None)
+            task_samples.append(elapsed)
+            if error:
+                errors.append({'command': command, 'error': error, 'entry': 'execute_task'})
+        task_seconds = time.perf_counter() - start
+
+    return {
+        'processTextCommand': {
+            'commands': len(commands),
+            'seconds': round(process_seconds, 3),
+            'commands_per_sec': round(len(commands) / process_seconds, 1) if process_seconds else None,
+            'overall': summarize([s for samples in by_path.values() for s in samples]),
+            'paths': {path: summarize(samples) for path, samples in by_path.items()},
+        },
+        'execute_task': {
+            'commands': len(complex_commands),
+            'seconds': round(task_seconds, 3),
+            'commands_per_sec': round(len(complex_commands) / task_seconds, 1) if task_seconds else None,
+            'overall': summarize(task_samples),
+        },
+        'errors': errors,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, timeout=10)
+        return result.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Relative change of p50/p95/p99 per path and of throughput against an earlier report"""
+    rows = []
+    current, previous = report['results'], baseline['results']
+    pairs = [('processTextCommand', 'overall', current['processTextCommand']['overall'], previous['processTextCommand']['overall']),
+             ('execute_task', 'overall', current['execute_task']['overall'], previous['execute_task']['overall'])]
+    for path in PATHS:
+        pairs.append(('processTextCommand', path, current['processTextCommand']['paths'].get(path, {}),
+                      previous['processTextCommand']['paths'].get(path, {})))
+    for entry, path, new, old in pairs:
+        for key in ('p50_ms', 'p95_ms', 'p99_ms'):
+            if new.get(key) and old.get(key):
+                rows.append({'entry': entry, 'path': path, 'metric': key, 'baseline': old[key], 'current': new[key],
+                             'change_pct': round((new[key] - old[key]) / old[key] * 100, 1)})
+    for entry in ('processTextCommand', 'execute_task'):
+        new, old = current[entry].get('commands_per_sec'), previous[entry].get('commands_per_sec')
+        if new and old:
+            rows.append({'entry': entry, 'path': 'all', 'metric': 'commands_per_sec', 'baseline': old, 'current': new,
+                         'change_pct': round((new - old) / old * 100, 1)})
+    return rows
+
+
+def _print_report(report: Dict[str, Any]):
+    results = report['results']
+    process = results['processTextCommand']
+    print(f"Replayed {process['commands']} commands in {process['seconds']:.2f}s "
+          f"({process['commands_per_sec']} commands/s, commit {report['commit']}, corpus {report['corpus']['sha1'][:10]})")
+    print(f"  {'path':12s} {'count':>6s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s}")
+    rows = [('overall', process['overall'])] + list(process['paths'].items())
+    rows.append(('execute_task', results['execute_task']['overall']))
+    for name, s in rows:
+        if s.get('count'):
+            print(f"  {name:12s} {s['count']:6d} {s['p50_ms']:9.3f} {s['p95_ms']:9.3f} {s['p99_ms']:9.3f}")
+    print(f"  execute_task: {results['execute_task']['commands_per_sec']} commands/s")
+    print(f"  errors: {len(results['errors'])}   skipped sleeps: {report['side_effects']['skipped_sleep_s']:.1f}s   "
+          f"fake LLM calls: {report['llm']['requests']}")
+    fallbacks = process['paths']['ai_fallback'].get('count', 0)
+    if fallbacks:
+        print(f"[WARNING] {fallbacks} AI commands got no answer from any provider (ai_fallback)")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a command corpus through the engine with offline backends")
+    parser.add_argument('--corpus', help="Command file (one per line) or traces JSONL; default is a generated corpus")
+    parser.add_argument('--commands', type=int, default=2000, help="Size of the generated corpus")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for corpus generation and fake LLM failures")
+    parser.add_argument('--warmup', type=int, default=50, help="Commands replayed before measuring")
+    parser.add_argument('--llm-latency-ms', type=float, default=0.0, help="Delay added by the fake Ollama/Gemini")
+    parser.add_argument('--llm-failure-rate', type=float, default=0.0, help="Share of fake LLM calls answered with HTTP 500")
+    parser.add_argument('--real-skills', action='store_true', help="Run task-agent skills (their OS calls are still faked)")
+    parser.add_argument('--baseline', help="Earlier --output report to compare against")
+    parser.add_argument('--max-regression', type=float, help="Exit 1 if any p95 is this many percent slower than the baseline")
+    parser.add_argument('--output', help="Write the report as JSON")
+    parser.add_argument('--verbose', action='store_true', help="Show the engine's own console output")
+    args = parser.parse_args(argv)
+    # The replay changes into a scratch directory, so resolve user paths first
+    for name in ('corpus', 'baseline', 'output'):
+        if getattr(args, name):
+            setattr(args, name, os.path.abspath(getattr(args, name)))
+
+    if args.corpus:
+        commands = load_corpus(args.corpus)
+    else:
+        commands = generate_corpus(args.commands, args.seed)
+    if not commands:
+        print("[ERROR] Empty corpus")
+        return 1
+    if importlib.util.find_spec('requests') is None:
+        print("[ERROR] The replay benchmark needs the real 'requests' package (pip install requests); "
+              "without it no LLM call reaches the fake server")
+        return 1
+
+    import config
+    server = stubs.FakeLLMServer(models=[f"{config.OLLAMA_DEFAULT_MODEL}:latest"], latency_ms=args.llm_latency_ms,
+                                 failure_rate=args.llm_failure_rate, seed=args.seed).start()
+    configure(server.url)
+    install_fakes()
+
+    # Conversation history, memory bank and traces are written relative to the working directory
+    workdir = tempfile.mkdtemp(prefix="spitch-replay-")
+    os.chdir(workdir)
+
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        from engine.http_client import http_client
+        gemini = urlsplit(config.GOOGLE_API_BASE_URL)
+        http_client.redirect(f"{gemini.scheme}://{gemini.netloc}", server.url)
+        import engine.command as command
+        from engine.startup import startup_manager
+        from engine.tracing import tracer
+        silence_tts()
+        tracer.path = os.path.join(workdir, 'traces.jsonl')
+        for name in startup_manager.get_status()['subsystems']:
+            startup_manager.get(name, timeout=120)
+        agent = command.get_ai_task_agent()
+    if agent is None:
+        print("[ERROR] AI Task Agent failed to load")
+        return 1
+    if not args.real_skills:
+        stub_skills(agent)
+
+    results = replay(commands, command.processTextCommand, agent.execute_task, tracer, args.warmup, args.verbose)
+    server.stop()
+
+    report = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'python': sys.version.split()[0],
+        'corpus': {
+            'source': args.corpus or 'generated',
+            'commands': len(commands),
+            'seed': args.seed,
+            'sha1': hashlib.sha1('\n'.join(commands).encode('utf-8')).hexdigest(),
+        },
+        'llm': {'latency_ms': args.llm_latency_ms, 'failure_rate': args.llm_failure_rate, 'requests': server.requests},
+        'http': http_client.get_stats(),
+        'skills': 'real' if args.real_skills else 'stubbed',
+        'side_effects': {
+            'calls': side_effects.calls,
+            'skipped_sleep_s': round(side_effects.skipped_sleep, 2),
+            'utterances': side_effects.utterances,
+        },
+        'results': results,
+    }
+    _print_report(report)
+
+    exit_code = 0
+    ai_commands = sum(results['processTextCommand']['paths'][path].get('count', 0) for path in ('ai', 'ai_fallback'))
+    llm_calls = sum(server.requests.get(endpoint, 0) for endpoint in LLM_ENDPOINTS)
+    if ai_commands and not llm_calls:
+        print(f"[ERROR] {ai_commands} AI commands ran but the fake LLM server got no request; "
+              "the LLM routing was not measured")
+        exit_code = 1
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('corpus', {}).get('sha1') != report['corpus']['sha1']:
+            print("[WARNING] Baseline was recorded on a different corpus; numbers are not directly comparable")
+        report['comparison'] = compare(report, baseline)
+        print(f"Compared with {baseline.get('commit') or 'baseline'}:")
+        for row in report['comparison']:
+            print(f"  {row['entry']:18s} {row['path']:12s} {row['metric']:16s} "
+                  f"{row['baseline']:>10} -> {row['current']:>10}  ({row['change_pct']:+.1f}%)")
+            if (args.max_regression is not None and row['metric'] == 'p95_ms'
+                    and row['change_pct'] > args.max_regression):
+                exit_code = 1
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Direct-command routing microbenchmark
+
+Times the compiled intent router against the former sequential cascade (one
+difflib.get_close_matches call per keyword, rule by rule) over a mixed query
+set, and checks both pick the same intent for every query.
+
+Usage:
+    python -m benchmarks.router_benchmark
+    python -m benchmarks.router_benchmark --rounds 2000 --output router_report.json
+"""
+import argparse
+import difflib
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from engine.intent_router import intent_router, IntentRouter  # noqa: E402
+
+QUERIES = [
+    "what time is it", "time", "wat time", "today", "what date",
+    "play believer on spotify", "play lofi on youtube", "pause", "pause music", "resum the music",
+    "google best pizza near me", "search", "calculate 12 + 30", "screenshot", "screen",
+    "check my cpu usage", "system", "memory", "set my location to london", "weather", "forcast",
+    "tell me a joke", "joke", "help", "what can you do", "open notepad", "open chrome and go to github",
+    "send a whatsapp message to mom", "trending songs on spotify", "video script",
+    "who was the first person on the moon", "explain quantum computing in simple terms",
+    "what's the capital of france", "write a poem about rain", "how do i make pasta",
+]
+
+
+def legacy_route(router: IntentRouter, query: str) -> Optional[str]:
+    """The pre-router approach: lower() per rule, one get_close_matches call per fuzzy keyword"""
+    for rule in router.rules:
+        for clause in rule.clauses:
+            q = query.lower().strip()
+            if any(p not in q for p in clause.all):
+                continue
+            if clause.any and not any(p in q for p in clause.any):
+                continue
+            if any(p in q for p in clause.none):
+                continue
+            if clause.fuzzy and not any(difflib.get_close_matches(q, [k], n=1, cutoff=c) for k, c in clause.fuzzy):
+                continue
+            return rule.intent
+    return None
+
+
+def _time_per_query(fn, rounds: int) -> List[float]:
+    samples = []
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn(query)
+        samples.append((time.perf_counter() - start) / rounds * 1e6)
+    return samples
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        'median_us': round(statistics.median(ordered), 2),
+        'p95_us': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        'max_us': round(ordered[-1], 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure per-query cost of direct-command routing")
+    parser.add_argument('--rounds', type=int, default=500, help="Repetitions per query")
+    parser.add_argument('--output', help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    mismatches = []
+    for query in QUERIES:
+        route = intent_router.route(query)
+        expected = legacy_route(intent_router, query)
+        if (route.intent if route else None) != expected:
+            mismatches.append({'query': query, 'router': route.intent if route else None, 'legacy': expected})
+
+    report = {
+        'queries': len(QUERIES),
+        'rounds': args.rounds,
+        'router': _summary(_time_per_query(intent_router.route, args.rounds)),
+        'legacy_cascade': _summary(_time_per_query(lambda q: legacy_route(intent_router, q), max(1, args.rounds // 10))),
+        'mismatches': mismatches,
+    }
+    report['speedup_median'] = round(report['legacy_cascade']['median_us'] / report['router']['median_us'], 1)
+
+    print(f"Routing {len(QUERIES)} queries x {args.rounds} rounds")
+    for name in ('router', 'legacy_cascade'):
+        s = report[name]
+        print(f"  {name:15s} median {s['median_us']:9.2f} us   p95 {s['p95_us']:9.2f} us   max {s['max_us']:9.2f} us")
+    print(f"  speedup (median): {report['speedup_median']}x")
+    for m in mismatches:
+        print(f"  [MISMATCH] {m['query']!r}: router={m['router']} legacy={m['legacy']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Semantic cache reuse check
+
+Stores one query and looks up a second one in both namespaces ('intent' and
+'answer') with the built-in hashed embedder, which is what runs whenever no
+Ollama embedding model is installed:
+- Reversed pairs ("is python better than java" / "is java better than python",
+  "move a from x to y" / "move a from y to x") must never reuse the stored entry
+- Rewordings that ask the same thing should reuse it
+
+Also times lookups against a cache filled with unrelated entries.
+
+Usage:
+    python -m benchmarks.semantic_cache_benchmark
+    python -m benchmarks.semantic_cache_benchmark --entries 1000 --output semantic_report.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from engine.semantic_cache import SemanticCache  # noqa: E402
+
+NAMESPACES = ['intent', 'answer']
+
+# Stored query, lookup query: opposite meaning, never reused
+MUST_MISS = [
+    ("move report.txt from desktop to documents", "move report.txt from documents to desktop"),
+    ("translate hello from english to spanish", "translate hello from spanish to english"),
+    ("convert ten miles to km", "convert ten km to miles"),
+    ("is python better than java for backend web development", "is java better than python for backend web development"),
+    ("explain the difference between tcp and udp", "explain the difference between udp and tcp"),
+    ("set volume to 50", "set volume to 60"),
+    ("play despacito", "pause despacito"),
+]
+
+# Stored query, lookup query: the same request, reused in the listed namespaces
+SHOULD_HIT = [
+    ("open notepad", "please launch notepad", NAMESPACES),
+    ("explain black holes", "explain the black holes please", NAMESPACES),
+    ("search for python tutorials", "find python tutorials", NAMESPACES),
+    ("what is photosynthesis", "can you tell me what is photosynthesis", ['intent']),
+]
+
+FILLER_TOPICS = ["rain", "cats", "the ocean", "mountains", "coffee", "volcanoes", "jazz", "chess", "tides", "bees"]
+
+
+def check(pairs: List[tuple], expect_hit: bool) -> List[Dict[str, Any]]:
+    rows = []
+    for stored, query, *namespaces in pairs:
+        for namespace in (namespaces[0] if namespaces else NAMESPACES):
+            cache = SemanticCache(embedder='hashed')
+            cache.store(namespace, stored, {'query': stored})
+            hit = cache.lookup(namespace, query) is not None
+            rows.append({'namespace': namespace, 'stored': stored, 'query': query,
+                         'hit': hit, 'ok': hit == expect_hit})
+    return rows
+
+
+def time_lookups(entries: int, rounds: int) -> Dict[str, float]:
+    cache = SemanticCache(embedder='hashed', max_entries=entries)
+    for i in range(entries):
+        cache.store('answer', f"tell me fact number {i} about {FILLER_TOPICS[i % len(FILLER_TOPICS)]}", i)
+    queries = [f"explain {topic} in simple terms" for topic in FILLER_TOPICS]
+    start = time.perf_counter()
+    for i in range(rounds):
+        cache.lookup('answer', queries[i % len(queries)])
+    seconds = time.perf_counter() - start
+    return {'entries': entries, 'lookups': rounds, 'mean_us': round(seconds / rounds * 1e6, 1)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check semantic cache reuse decisions and time lookups")
+    parser.add_argument('--entries', type=int, default=1000, help="Entries in the cache for the lookup timing")
+    parser.add_argument('--rounds', type=int, default=500, help="Timed lookups")
+    parser.add_argument('--output', help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    import contextlib
+    import io
+    with contextlib.redirect_stdout(io.StringIO()):
+        misses = check(MUST_MISS, expect_hit=False)
+        hits = check(SHOULD_HIT, expect_hit=True)
+        timing = time_lookups(args.entries, args.rounds)
+
+    wrong_reuse = [row for row in misses if not row['ok']]
+    missed_reuse = [row for row in hits if not row['ok']]
+    print(f"Reversed/different pairs reused: {len(wrong_reuse)} of {len(misses)}")
+    for row in wrong_reuse:
+        print(f"  [FAIL] {row['namespace']:6s} '{row['query']}' reused '{row['stored']}'")
+    print(f"Rewordings reused: {len(hits) - len(missed_reuse)} of {len(hits)}")
+    for row in missed_reuse:
+        print(f"  [MISS] {row['namespace']:6s} '{row['query']}' did not reuse '{row['stored']}'")
+    print(f"Lookup with {timing['entries']} entries: {timing['mean_us']} us")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'must_miss': misses, 'should_hit': hits, 'timing': timing}, f, indent=2)
+        print(f"Report written to {args.output}")
+    # Reusing an answer or plan for a different request is a correctness failure; a missed reuse only costs a model call
+    return 1 if wrong_reuse else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,522 @@
+"""
+Offline Stubs - Lets benchmarks run without network, GPU, audio or GUI
+
+Provides:
+- A network guard that refuses non-loopback connections (local stand-in servers still work)
+- Post-import patches that report no CUDA device and replace Whisper model loads,
+  pyttsx3 engines and pygame mixer init with inert fakes
+- Inert stub modules for third-party packages that are not installed, so import
+  chains can be measured on machines without the full dependency set
+- A loopback stand-in for the Ollama and Google Gemini HTTP APIs with configurable
+  latency and failure rate
+"""
+import importlib.abc
+import importlib.machinery
+import json
+import random
+import re
+import socket
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Third-party top-level packages the engine imports. Only these may be stubbed when missing.
+STUBBABLE_PACKAGES = {
+    'bs4', 'comtypes', 'eel', 'flask', 'mcp', 'numpy', 'openai', 'psutil', 'pyautogui',
+    'pycaw', 'pygame', 'pygetwindow', 'pyperclip', 'pyttsx3', 'requests', 'selenium',
+    'speech_recognition', 'spotipy', 'torch', 'webdriver_manager', 'whisper', 'win32api',
+    'win32con', 'win32gui', 'pywintypes', 'httpx'
+}
+
+LOOPBACK_HOSTS = {'127.0.0.1', 'localhost', '::1', '0.0.0.0'}
+
+_installed = False
+stubbed_modules: List[str] = []
+
+
+class NetworkDisabledError(OSError):
+    """Raised when benchmark code tries to reach a non-loopback host"""
+
+
+# --- Inert stand-ins ---
+
+class _Stub:
+    """Absorbs any attribute access or call and stays falsy"""
+
+    def __init__(self, name: str = "stub"):
+        self._name = name
+
+    def __getattr__(self, item):
+        if item.startswith('__'):
+            raise AttributeError(item)
+        return _stub_attribute(f"{self._name}.{item}", item)
+
+    def __call__(self, *args, **kwargs):
+        # Decorator passthrough: eel.expose(func), app.route('/x')(func)
+        if len(args) == 1 and not kwargs and callable(args[0]) and not isinstance(args[0], _Stub):
+            return args[0]
+        return _Stub(f"{self._name}()")
+
+    def __mro_entries__(self, bases):
+        return (object,)
+
+    def __bool__(self):
+        return False
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self):
+        return 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __int__(self):
+        return 0
+
+    def __float__(self):
+        return 0.0
+
+    def __index__(self):
+        return 0
+
+    def __format__(self, spec):
+        try:
+            return format(0, spec)
+        except ValueError:
+            return self._name
+
+    def __lt__(self, other):
+        return False
+
+    __le__ = __gt__ = __ge__ = __lt__
+
+    def __repr__(self):
+        return f"<stub {self._name}>"
+
+
+def _stub_attribute(qualified_name: str, attr: str):
+    """Exception-looking names become real exception classes so `except` clauses work"""
+    if attr.endswith(('Error', 'Exception', 'Timeout', 'Warning')) or attr == 'Timeout':
+        return type(attr, (Exception,), {'__module__': qualified_name.rsplit('.', 1)[0]})
+    return _Stub(qualified_name)
+
+
+class _StubModule(types.ModuleType):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__all__ = []
+        self.__path__ = []
+        self.__stub__ = True
+
+    def __getattr__(self, item):
+        if item.startswith('__'):
+            raise AttributeError(item)
+        value = _stub_attribute(f"{self.__name__}.{item}", item)
+        setattr(self, item, value)
+        return value
+
+
+class _StubLoader(importlib.abc.Loader):
+    def create_module(self, spec):
+        return _StubModule(spec.name)
+
+    def exec_module(self, module):
+        if '.' not in module.__name__:
+            stubbed_modules.append(module.__name__)
+
+
+class _MissingModuleFinder(importlib.abc.MetaPathFinder):
+    """Last-resort finder that fabricates stub modules for missing third-party packages"""
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname.split('.')[0] not in STUBBABLE_PACKAGES:
+            return None
+        return importlib.machinery.ModuleSpec(fullname, _StubLoader(), is_package=True)
+
+
+# --- Post-import patches for packages that are installed ---
+
+class _PatchingLoader(importlib.abc.Loader):
+    def __init__(self, loader, patch: Callable[[types.ModuleType], None]):
+        self._loader = loader
+        self._patch = patch
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._loader.exec_module(module)
+        try:
+            self._patch(module)
+        except Exception as e:
+            print(f"[Benchmark] Could not patch {module.__name__}: {e}")
+
+    def __getattr__(self, item):
+        return getattr(self._loader, item)
+
+
+class _PostImportPatcher(importlib.abc.MetaPathFinder):
+    """Wraps the real loader of selected modules and patches them right after they execute"""
+
+    def __init__(self, patches: Dict[str, Callable[[types.ModuleType], None]]):
+        self.patches = patches
+
+    def find_spec(self, fullname, path, target=None):
+        if fullname not in self.patches:
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None:
+            spec.loader = _PatchingLoader(spec.loader, self.patches[fullname])
+        return spec
+
+
+class FakeWhisperModel:
+    """Placeholder returned instead of downloading/loading real Whisper weights"""
+
+    def __init__(self, name: str = "base"):
+        self.name = name
+
+    def transcribe(self, audio, **kwargs):
+        return {'text': '', 'segments': [], 'language': kwargs.get('language', 'en')}
+
+
+class FakeTTSEngine:
+    """pyttsx3 engine that accepts everything and makes no sound"""
+
+    def __init__(self):
+        self._properties = {'voices': [], 'rate': 170, 'volume': 1.0}
+
+    def getProperty(self, name):
+        return self._properties.get(name)
+
+    def setProperty(self, name, value):
+        self._properties[name] = value
+
+    def say(self, text, name=None):
+        pass
+
+    def save_to_file(self, text, filename, name=None):
+        pass
+
+    def runAndWait(self):
+        pass
+
+    def connect(self, topic, callback):
+        return None
+
+    def stop(self):
+        pass
+
+
+def _patch_torch(module):
+    module.cuda.is_available = lambda: False
+
+
+def _patch_whisper(module):
+    module.load_model = lambda name, *args, **kwargs: FakeWhisperModel(name)
+
+
+def _patch_pyttsx3(module):
+    module.init = lambda *args, **kwargs: FakeTTSEngine()
+
+
+def _patch_pygame(module):
+    mixer = module.mixer
+    mixer.init = lambda *args, **kwargs: None
+    mixer.get_init = lambda: (22050, -16, 2)
+    mixer.music.load = lambda *args, **kwargs: None
+    mixer.music.play = lambda *args, **kwargs: None
+
+
+DEFAULT_PATCHES = {
+    'torch': _patch_torch,
+    'whisper': _patch_whisper,
+    'pyttsx3': _patch_pyttsx3,
+    'pygame': _patch_pygame,
+}
+
+
+# --- Network guard ---
+
+def _host_of(address) -> Optional[str]:
+    if isinstance(address, tuple) and address:
+        return str(address[0])
+    return None
+
+
+def _guard(host: Optional[str]):
+    if host is not None and host not in LOOPBACK_HOSTS and not host.startswith('127.'):
+        raise NetworkDisabledError(f"Network access to {host} is disabled in benchmarks")
+
+
+def _install_network_guard():
+    original_connect = socket.socket.connect
+    original_connect_ex = socket.socket.connect_ex
+    original_getaddrinfo = socket.getaddrinfo
+
+    def connect(self, address):
+        _guard(_host_of(address))
+        return original_connect(self, address)
+
+    def connect_ex(self, address):
+        _guard(_host_of(address))
+        return original_connect_ex(self, address)
+
+    def getaddrinfo(host, *args, **kwargs):
+        _guard(host if isinstance(host, str) else None)
+        return original_getaddrinfo(host, *args, **kwargs)
+
+    socket.socket.connect = connect
+    socket.socket.connect_ex = connect_ex
+    socket.getaddrinfo = getaddrinfo
+
+
+def install(stub_missing: bool = True, block_network: bool = True,
+            extra_patches: Optional[Dict[str, Callable]] = None,
+            extra_stubbable: Iterable[str] = ()):
+    """
+    Install offline stubs for the current process (idempotent).
+
+    Args:
+        stub_missing: Replace missing third-party packages with inert stub modules
+        block_network: Refuse connections to non-loopback hosts
+        extra_patches: Additional {module_name: patch(module)} post-import patches
+        extra_stubbable: Additional top-level package names that may be stubbed
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    STUBBABLE_PACKAGES.update(extra_stubbable)
+    patches = dict(DEFAULT_PATCHES)
+    patches.update(extra_patches or {})
+
+    # Patch modules that were already imported, hook the rest
+    for name, patch in patches.items():
+        if name in sys.modules:
+            patch(sys.modules[name])
+    sys.meta_path.insert(0, _PostImportPatcher(patches))
+
+    if stub_missing:
+        sys.meta_path.append(_MissingModuleFinder())
+
+    if block_network:
+        _install_network_guard()
+
+    # Never open real browser tabs from a benchmark
+    import webbrowser
+    webbrowser.open = lambda *args, **kwargs: True
+    webbrowser.open_new = webbrowser.open
+    webbrowser.open_new_tab = webbrowser.open
+
+
+# --- Fake LLM services ---
+
+def default_reply(prompt: str) -> str:
+    """Canned answer: an action plan for intent-parser prompts, two plain sentences otherwise"""
+    command = re.search(r'User Command: "([^"]*)"', prompt)
+    if command:
+        return json.dumps({
+            'intent': 'open_app',
+            'entities': {'app': 'notepad'},
+            'actions': [{'type': 'open_app', 'params': {'app': 'notepad'}}],
+            'confidence': 0.9
+        })
+    topic = prompt.strip().splitlines()[-1][:60] if prompt.strip() else "that"
+    return f"Here is a short answer about {topic}. Let me know if you want more detail."
+
+
+class FakeLLMServer:
+    """
+    Loopback HTTP server speaking enough of the Ollama and Gemini APIs for the engine
+
+    Ollama: GET /api/tags, POST /api/generate and /api/chat (streaming and not), POST /api/show
+    Gemini: GET /v1beta/models, POST /v1beta/models/<model>:generateContent and :streamGenerateContent (SSE)
+    """
+
+    def __init__(self, models: Iterable[str] = ('tinyllama:latest',), latency_ms: float = 0.0,
+                 failure_rate: float = 0.0, reply: Callable[[str], str] = default_reply,
+                 tokens_per_chunk: int = 4, seed: int = 0):
+        """
+        Args:
+            models: Model names reported by /api/tags
+            latency_ms: Delay before each generate/generateContent reply (also between stream chunks, split evenly)
+            failure_rate: Fraction of generate/generateContent calls answered with HTTP 500
+            reply: Maps the prompt to the response text
+            tokens_per_chunk: Words per streamed Ollama or Gemini chunk
+            seed: Seed for the failure draw, so runs are repeatable
+        """
+        self.models = list(models)
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.reply = reply
+        self.tokens_per_chunk = max(1, tokens_per_chunk)
+        self.requests: Dict[str, int] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeLLMServer":
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="fake-llm", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _count(self, endpoint: str) -> bool:
+        """Record a call; True if this call should fail"""
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+            return self._random.random() < self.failure_rate
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def _body(self) -> dict:
+                length = int(self.headers.get('Content-Length') or 0)
+                return json.loads(self.rfile.read(length) or b'{}') if length else {}
+
+            def _json(self, data, status: int = 200):
+                payload = json.dumps(data).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                if path == '/api/tags':
+                    fake._count('ollama_tags')
+                    self._json({'models': [{'name': name} for name in fake.models]})
+                elif path.endswith('/models'):
+                    fake._count('gemini_models')
+                    self._json({'models': [{'name': 'models/fake-gemini'}]})
+                else:
+                    self._json({'error': 'not found'}, 404)
+
+            def do_POST(self):
+                try:
+                    self._post()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # The client stopped reading a stream (cancelled generation)
+
+            def _post(self):
+                path = self.path.split('?')[0]
+                body = self._body()
+                if path == '/api/generate':
+                    self._ollama_generate(body)
+                elif path == '/api/chat':
+                    self._ollama_chat(body)
+                elif path == '/api/show':
+                    self._json({'modelfile': '', 'details': {'family': 'fake'}})
+                elif path.endswith(':generateContent'):
+                    self._gemini_generate(body)
+                elif path.endswith(':streamGenerateContent'):
+                    self._gemini_stream(body)
+                else:
+                    self._json({'error': 'not found'}, 404)
+
+            def _ollama_generate(self, body: dict):
+                if fake._count('ollama_generate'):
+                    self._json({'error': 'fake failure'}, 500)
+                    return
+                self._ollama_reply(body, fake.reply(body.get('prompt', '')), lambda text: {'response': text})
+
+            def _ollama_chat(self, body: dict):
+                if fake._count('ollama_chat'):
+                    self._json({'error': 'fake failure'}, 500)
+                    return
+                user = [m.get('content', '') for m in body.get('messages', []) if m.get('role') == 'user']
+                self._ollama_reply(body, fake.reply(user[-1] if user else ''),
+                                   lambda text: {'message': {'role': 'assistant', 'content': text}})
+
+            def _ollama_reply(self, body: dict, text: str, wrap: Callable[[str], dict]):
+                if not body.get('stream', True):
+                    time.sleep(fake.latency_ms / 1000)
+                    self._json({'model': body.get('model'), **wrap(text), 'done': True,
+                                'total_duration': int(fake.latency_ms * 1e6)})
+                    return
+                chunks = self._split(text)
+                self._start_stream('application/x-ndjson')
+                delay = fake.latency_ms / 1000 / max(1, len(chunks))
+                for chunk in chunks:
+                    time.sleep(delay)
+                    self._chunk(json.dumps({**wrap(chunk), 'done': False}) + '\n')
+                self._chunk(json.dumps({**wrap(''), 'done': True, 'total_duration': int(fake.latency_ms * 1e6)}) + '\n')
+                self.wfile.write(b'0\r\n\r\n')
+
+            def _split(self, text: str) -> List[str]:
+                words = text.split(' ')
+                return [' '.join(words[i:i + fake.tokens_per_chunk]) + ' '
+                        for i in range(0, len(words), fake.tokens_per_chunk)]
+
+            def _start_stream(self, content_type: str):
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+
+            def _chunk(self, line: str):
+                data = line.encode('utf-8')
+                self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b'\r\n')
+                self.wfile.flush()
+
+            def _gemini_generate(self, body: dict):
+                if fake._count('gemini_generate'):
+                    self._json({'error': {'code': 500, 'message': 'fake failure'}}, 500)
+                    return
+                prompt = ' '.join(part.get('text', '') for content in body.get('contents', [])
+                                  for part in content.get('parts', []))
+                time.sleep(fake.latency_ms / 1000)
+                self._json({'candidates': [{'content': {'parts': [{'text': fake.reply(prompt)}]}}]})
+
+            def _gemini_stream(self, body: dict):
+                if fake._count('gemini_stream'):
+                    self._json({'error': {'code': 500, 'message': 'fake failure'}}, 500)
+                    return
+                prompt = ' '.join(part.get('text', '') for content in body.get('contents', [])
+                                  for part in content.get('parts', []))
+                chunks = self._split(fake.reply(prompt))
+                self._start_stream('text/event-stream')
+                delay = fake.latency_ms / 1000 / max(1, len(chunks))
+                for chunk in chunks:
+                    time.sleep(delay)
+                    event = {'candidates': [{'content': {'parts': [{'text': chunk}]}}]}
+                    self._chunk(f"data: {json.dumps(event)}\r\n\r\n")
+                self.wfile.write(b'0\r\n\r\n')
+
+        return Handler
@@ -49,10 +49,106 @@ ENABLE_WAKE_WORD = True
 ENABLE_VOICE_COMMANDS = True
 ENABLE_TEXT_COMMANDS = True
 
+# Startup Configuration
+# Staged startup brings the UI and direct commands up immediately and loads
+# Whisper, the task agent, memory and MCP on a background warm-up thread.
+STAGED_STARTUP = True
+
 # Timeout Settings (in seconds) - Optimized for Ollama
 OLLAMA_TIMEOUT = 15  # Primary AI service timeout
+
+# Ollama model residency (warm-up at startup, keep_alive, RAM pressure)
+OLLAMA_WARMUP = True  # Load the default model on the warm-up thread at startup
+OLLAMA_KEEP_ALIVE = '5m'  # How long a model stays loaded after an occasional request
+OLLAMA_KEEP_ALIVE_BUSY = '30m'  # Same, for a model used OLLAMA_BUSY_USES_PER_HOUR times in the last hour
+OLLAMA_BUSY_USES_PER_HOUR = 6
+OLLAMA_RAM_PRESSURE_PERCENT = 90  # System RAM use at which large models are unloaded (0 = never)
+OLLAMA_LARGE_MODEL_GB = 2.0  # Resident size from which a model counts as large
+OLLAMA_CHAT_MAX_MESSAGES = 20  # Conversation messages sent to Ollama's /api/chat; older turns are dropped in blocks
+
+# Provider health (Ollama / Gemini / OpenRouter liveness cache and circuit breakers)
+PROVIDER_HEALTH_TTL = 30  # Seconds a liveness check is trusted before it is refreshed in the background
+PROVIDER_FAILURE_THRESHOLD = 3  # Consecutive failed calls (or 429s) before a provider is skipped
+PROVIDER_COOLDOWN = 30  # Seconds a failing provider is skipped before it is tried again
+
+# Hedged provider racing (start the next AI provider when the current one is slow)
+LLM_RACING = False  # True = race providers instead of waiting out each timeout in turn
+LLM_HEDGE_DELAY = 2.0  # Longest wait on a provider before the next one starts too (sooner once it is slower than usual)
+LLM_HEDGE_QUOTAS = {'gemini': 120, 'openrouter': 0, 'openai': 0}  # Hedged starts per hour (0 = fallback only, missing = unlimited)
+LLM_RACE_TIMEOUT = 30  # Overall limit for one race
+
+# AI response cache (exact repeats of a prompt skip the model)
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_FILE = "memory/response_cache.db"
+RESPONSE_CACHE_MAX_ENTRIES = 500  # Answers kept in memory (least recently used dropped first)
+RESPONSE_CACHE_MAX_DISK_ENTRIES = 5000  # Answers kept on disk across restarts
+# Seconds an answer stays valid per intent type ('inquiry' = YouTube/Spotify/weather prompts, 0 = never cached)
+RESPONSE_CACHE_TTLS = {'conversation': 86400, 'inquiry': 7 * 86400, 'default': 3600,
+                       'weather': 0, 'time': 0, 'date': 0, 'news': 0, 'fallback': 0}
+
+# Semantic cache (reworded repeats reuse an earlier intent plan or answer)
+SEMANTIC_CACHE_ENABLED = True
+SEMANTIC_CACHE_EMBEDDER = 'ollama'  # 'ollama' (falls back to 'hashed' without an embedding model) or 'hashed'
+SEMANTIC_CACHE_EMBED_MODEL = 'nomic-embed-text'  # Install with: ollama pull nomic-embed-text
+SEMANTIC_CACHE_THRESHOLDS = {'intent': 0.93, 'answer': 0.9}  # Minimum cosine similarity for a reuse
+SEMANTIC_CACHE_MAX_ENTRIES = 1000  # Per namespace; least recently used entries are replaced past it
+SEMANTIC_CACHE_TTL = 86400  # Seconds an entry can be reused
+
+# Outbound HTTP (shared keep-alive pools for Ollama, Gemini, weather, YouTube)
+HTTP_POOL_MAXSIZE = 10  # Keep-alive connections kept per host
+HTTP_CONNECT_TIMEOUT = 5  # Default seconds to connect when a call sets no timeout
+HTTP_READ_TIMEOUT = 30  # Default seconds to wait for data when a call sets no timeout
+HTTP2_HOSTS = ['generativelanguage.googleapis.com']  # Reached over HTTP/2 when httpx[http2] is installed
 OPENAI_TIMEOUT = 10  # Fallback timeout
 VOICE_RECOGNITION_TIMEOUT = 10
+MIC_DEVICE_INDEX = None  # Input device index (None = system default)
+MIC_CALIBRATION_SECONDS = 2  # One-time ambient-noise measurement per device
+
+# Continuous Listening Capture (persistent microphone stream + voice-activity detection)
+CONTINUOUS_CAPTURE_STREAM = True  # False = reopen the microphone for every command
+CAPTURE_FRAME_MS = 30  # VAD frame length
+CAPTURE_BUFFER_SECONDS = 20  # Ring buffer capacity
+VAD_PAUSE_SECONDS = 0.8  # Silence that ends an utterance
+VAD_PRE_ROLL_SECONDS = 0.3  # Audio kept from before speech onset
+VAD_MAX_UTTERANCE_SECONDS = 10
+
+# Wake Word (on-device keyword spotting before full speech recognition)
+WAKE_WORD_ENABLED = False  # Only recognize utterances that start with the wake word
+WAKE_WORD = "spitch"
+WAKE_WORD_SENSITIVITY = 0.5  # 0 = strict (fewer false wakes) ... 1 = lenient (fewer misses)
+WAKE_WORD_ARMED_SECONDS = 5  # After a bare wake word, accept the next utterance without it
+
+# Phrase Cache (pre-rendered audio for fixed assistant phrases)
+PHRASE_CACHE_ENABLED = True
+PHRASE_CACHE_DIR = "memory/phrase_cache"
+PHRASE_CACHE_MAX_MB = 50  # Least recently used renders are deleted past this size
+STREAMING_TTS = True  # Speak AI answers sentence by sentence while they are still generating
+
+# Compound Commands ("what's the weather and what time is it")
+COMPOUND_PARALLEL = True  # Run independent parts concurrently (speech still follows the spoken order)
+COMPOUND_MAX_WORKERS = 3
+
+# Tracing (per-command stage timings, viewable at /traces)
+TRACING_ENABLED = True
+TRACE_FILE = "memory/traces.jsonl"  # One finished trace per line
+TRACE_FILE_MAX_MB = 5  # Rotate the trace file at this size
+TRACE_FILE_BACKUPS = 3
+TRACE_KEEP = 50  # Recent traces kept in memory for the waterfall page
+
+# Whisper Configuration (offline speech recognition fallback)
+WHISPER_MODEL_DIR = "whisper_models"
+WHISPER_FALLBACK_MODEL = "small"  # Used when Google recognition fails
+WHISPER_PRELOAD = True  # Load the fallback model in the background after startup
+WHISPER_IDLE_TTL = 900  # Seconds before an unused model is unloaded (0 = never)
+
+# Hedged Speech Recognition (race Google against local Whisper)
+ASR_HEDGING = True  # False = try Google first, Whisper only after it fails
+ASR_HEDGE_DELAY = 1.5  # Seconds Google gets before Whisper starts too (0 = start both at once)
+ASR_MIN_CONFIDENCE = 0.5  # Transcripts below this confidence don't win the race
+ASR_TIMEOUT = 15  # Overall limit for one recognition
+ASR_WORKER_PROCESSES = True  # Run Whisper in separate worker processes instead of the UI process
+ASR_WORKERS = 0  # Worker processes (0 = derive from the core count)
+ASR_TORCH_THREADS = 0  # torch threads per worker (0 = cores / workers)
 
 # Spotify Configuration (if you have Spotify API credentials)
 # Get your credentials from: https://developer.spotify.com/dashboard
@@ -4,7 +4,8 @@ import json
 import re
 import sys
 import datetime
-from typing import Dict, Any, Optional
+import threading
+from typing import Callable, Dict, Any, Optional
 
 # Add parent directory to path to import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -50,6 +51,9 @@ else:
     print("[WARNING] No API key configured - using Ollama as primary AI")
     client = None
 
+# Name of the OpenRouter/OpenAI fallback in provider health (liveness judged from call results)
+API_PROVIDER = 'openrouter' if BASE_URL else 'openai'
+
 # Import Ollama integration
 try:
     from engine.ollama_integration import spitch_ollama
@@ -73,16 +77,59 @@ except ImportError:
     spitch_gemini = None
     print("[ERROR] Google Gemini integration not available")
 
+try:
+    from config import STAGED_STARTUP
+except ImportError:
+    STAGED_STARTUP = True
+
+try:
+    from config import LLM_RACING
+except ImportError:
+    LLM_RACING = False
+
+from engine.llm_racer import llm_racer
+from engine.phrase_cache import phrase_cache
+from engine.response_cache import response_cache, refers_to_conversation
+from engine.semantic_cache import semantic_cache
+from engine.provider_health import provider_health
+from engine.speech_stream import SentenceSegmenter, strip_list_marker
+from engine.tracing import tracer
+
+if API_AVAILABLE:
+    provider_health.register(API_PROVIDER)
+
+# ai_source reported for each provider name used by provider health and the racer
+RACE_SOURCES = {'ollama': "Ollama", 'gemini': "Google Gemini", 'openrouter': "OpenRouter", 'openai': "OpenAI"}
+
+# Fixed replies from get_quick_response(); pre-rendered by the phrase cache
+QUICK_RESPONSES = {
+    'greeting': "Hello! How can I help you today?",
+    'farewell': "Goodbye! Have a great day!",
+    'thanks': "You're welcome! Is there anything else I can help you with?",
+    'wellbeing': "I'm doing well, thank you for asking! How can I assist you?",
+    'identity': "I'm Spitch, your AI assistant! I'm here to help you with various tasks and answer your questions.",
+    'capabilities': "I can help you with many things! I can answer questions, tell jokes, provide information, help with calculations, and much more. Just ask me anything!",
+    'test': "Test successful! I'm working properly and ready to help you."
+}
+phrase_cache.register(QUICK_RESPONSES.values())
+
 class SpitchAI:
     def __init__(self):
         self.conversation_history = []
         self.user_preferences = {}
         self.learned_patterns = []
         self.conversation_db_file = "spitch_conversations.json"
+        # Compound commands can run several AI queries at once
+        self._learning_lock = threading.Lock()
         self.mcp_enabled = False
         self.mcp_client = None
+        self.mcp_initialized = False
+        # Ollama conversation for the default prompt; /api/chat reuses the cached prefix each turn
+        self.ollama_session = spitch_ollama.new_session() if spitch_ollama else None
         self.load_learned_data()
-        self.init_mcp()
+        # With staged startup the MCP handshake runs on the warm-up thread (engine.command)
+        if not STAGED_STARTUP:
+            self.init_mcp()
         self.system_prompt = """You are Spitch, a friendly AI assistant. 
 
 IMPORTANT RESPONSE RULES:
@@ -133,83 +180,80 @@ Always be honest about what you know and don't know. It's better to say "I don't
             language: The user's preferred language (e.g., 'en-US', 'te-IN', etc.)
         """
         try:
+            # The same prompt answered before (and not time-sensitive) skips the model entirely
+            cached = self._cached_response(user_input, system_prompt_override, model, language)
+            if cached:
+                return cached
+
             # Add user input to conversation history
             self.conversation_history.append({"role": "user", "content": user_input})
 
             ai_response_text = None
             ai_source = "None"
+            # Error text from a provider is shown to the user but never cached
+            answered = True
 
             # Always use tinyllama unless a different model is explicitly specified
             model_to_use = model if model else OLLAMA_DEFAULT_MODEL
 
             # FALLBACK CHAIN: Ollama → Google Gemini → OpenRouter
-            
+            if LLM_RACING:
+                # Hedged: a slow provider gets company from the next one instead of a full timeout
+                raced = llm_racer.race(self._race_contenders(user_input, system_prompt_override, model_to_use, language))
+                if raced:
+                    ai_source, ai_response_text = raced
+                    ai_source = RACE_SOURCES.get(ai_source, ai_source)
+
             # 1. Try Ollama first (primary AI service - fast and local)
-            if OLLAMA_AVAILABLE and spitch_ollama.test_connection():
-                try:
-                    print("[PROCESSING] Using Ollama for AI processing...")
-                    ai_response_text = spitch_ollama.process_query(
-                        user_input, 
-                        timeout=OLLAMA_TIMEOUT, 
-                        system_prompt_override=system_prompt_override,
-                        model=model_to_use
-                    )
-                    ai_source = "Ollama"
-                except Exception as ollama_error:
-                    print(f"[ERROR] Ollama error: {ollama_error}")
+            if not LLM_RACING and OLLAMA_AVAILABLE and spitch_ollama.test_connection():
+                with tracer.span('provider', provider='ollama', model=model_to_use) as span:
+                    try:
+                        print("[PROCESSING] Using Ollama for AI processing...")
+                        answered, ai_response_text = spitch_ollama.query(
+                            user_input, 
+                            timeout=OLLAMA_TIMEOUT, 
+                            system_prompt_override=system_prompt_override,
+                            model=model_to_use,
+                            session=self._ollama_session(system_prompt_override)
+                        )
+                        ai_source = "Ollama"
+                    except Exception as ollama_error:
+                        print(f"[ERROR] Ollama error: {ollama_error}")
+                        span.set(error=str(ollama_error))
+                    span.set(ok=bool(ai_response_text))
 
             # 2. Try Google Gemini if Ollama failed (free tier)
-            if not ai_response_text and GEMINI_AVAILABLE:
-                try:
-                    print("[PROCESSING] Using Google Gemini for AI processing...")
-                    ai_response_text = spitch_gemini.process_query(
-                        user_input,
-                        system_prompt=system_prompt_override or self.system_prompt,
-                        timeout=10
-                    )
-                    if ai_response_text:
-                        ai_source = "Google Gemini"
-                except Exception as gemini_error:
-                    print(f"[ERROR] Google Gemini error: {gemini_error}")
+            if not ai_response_text and not LLM_RACING and GEMINI_AVAILABLE and provider_health.available('gemini'):
+                with tracer.span('provider', provider='gemini') as span:
+                    try:
+                        print("[PROCESSING] Using Google Gemini for AI processing...")
+                        ai_response_text = spitch_gemini.process_query(
+                            user_input,
+                            system_prompt=system_prompt_override or self.system_prompt,
+                            timeout=10
+                        )
+                        if ai_response_text:
+                            ai_source = "Google Gemini"
+                    except Exception as gemini_error:
+                        print(f"[ERROR] Google Gemini error: {gemini_error}")
+                        span.set(error=str(gemini_error))
+                    span.set(ok=bool(ai_response_text))
 
             # 3. Fallback to OpenRouter if both Ollama and Gemini failed
-            if not ai_response_text and API_AVAILABLE and client:
-                try:
-                    print(f"[PROCESSING] Using {MODEL_NAME} for AI processing...")
-                    
-                    # Prepare messages for the API with language, personalized, and MCP context
-                    language_context = self._get_language_context(language)
-                    personalized_context = self.get_personalized_context(user_input)
-                    mcp_context = self.get_mcp_context()
-                    system_prompt_with_context = (system_prompt_override or self.system_prompt) + language_context + personalized_context + mcp_context
-                    
-                    messages = [
-                        {"role": "system", "content": system_prompt_with_context}
-                    ]
-                    
-                    # Add recent conversation history (last 5 exchanges)
-                    recent_history = self.conversation_history[-10:] if len(self.conversation_history) > 10 else self.conversation_history
-                    messages.extend(recent_history)
+            if not ai_response_text and not LLM_RACING and API_AVAILABLE and client and provider_health.available(API_PROVIDER):
+                with tracer.span('provider', provider=API_PROVIDER, model=MODEL_NAME) as span:
+                    try:
+                        print(f"[PROCESSING] Using {MODEL_NAME} for AI processing...")
+                        ai_response_text = self._query_api(user_input, system_prompt_override, language)
+                        ai_source = "OpenRouter" if BASE_URL else "OpenAI"
+                        print(f"[OK] Got response from {ai_source}")
+                        print(f"[INFO] Raw AI response: {ai_response_text[:200]}..." if ai_response_text else "[INFO] Empty response received")
                     
-                    # Add current user input
-                    messages.append({"role": "user", "content": user_input})
-                    
-                    # Make API call
-                    response = client.chat.completions.create(
-                        model=MODEL_NAME,
-                        messages=messages,
-                        max_tokens=500,
-                        temperature=0.7
-                    )
-                    
-                    ai_response_text = response.choices[0].message.content
-                    ai_source = "OpenRouter" if BASE_URL else "OpenAI"
-                    print(f"[OK] Got response from {ai_source}")
-                    print(f"[INFO] Raw AI response: {ai_response_text[:200]}..." if ai_response_text else "[INFO] Empty response received")
-                    
-                except Exception as api_error:
-                    print(f"[ERROR] API error: {api_error}")
-                    ai_response_text = None
+                    except Exception as api_error:
+                        print(f"[ERROR] API error: {api_error}")
+                        ai_response_text = None
+                        span.set(error=str(api_error))
+                    span.set(ok=bool(ai_response_text))
 
 
             # If all AI services fail, use a simple fallback
@@ -247,11 +291,15 @@ Always be honest about what you know and don't know. It's better to say "I don't
             # Learn from this interaction
             self.learn_from_interaction(user_input, response_for_user)
 
-            return {
+            result = {
                 "intent": intent,
                 "response": response_for_user,
                 "ai_source": ai_source
             }
+            if answered:
+                self._add_session_turn(user_input, system_prompt_override, ai_response_text.strip())
+                self._cache_response(user_input, system_prompt_override, model, language, result)
+            return result
 
         except Exception as e:
             print(f"[ERROR] AI processing error: {e}")
@@ -261,6 +309,263 @@ Always be honest about what you know and don't know. It's better to say "I don't
                 "ai_source": "Error"
             }
 
+    def _cached_response(self, user_input: str, system_prompt_override: Optional[str], model: Optional[str], language: str) -> Optional[Dict[str, Any]]:
+        """A previous result for the same (or a closely reworded) prompt, added to the history like a fresh one"""
+        if self._follows_conversation(user_input, len(self.conversation_history)):
+            return None
+        system_prompt = system_prompt_override or self.system_prompt
+        cached = response_cache.get(user_input, system_prompt, model or OLLAMA_DEFAULT_MODEL, language)
+        if cached is None:
+            cached = semantic_cache.lookup('answer', user_input, semantic_cache.context_key(system_prompt, model or OLLAMA_DEFAULT_MODEL, language))
+            if cached is None:
+                return None
+            cached = dict(cached)
+        print(f"[OK] Using cached AI response (originally from {cached.get('ai_source')})")
+        self.conversation_history.append({"role": "user", "content": user_input})
+        self.conversation_history.append({"role": "assistant", "content": cached["response"]})
+        self._add_session_turn(user_input, system_prompt_override, cached["response"])
+        cached["cached"] = True
+        return cached
+
+    def _cache_response(self, user_input: str, system_prompt_override: Optional[str], model: Optional[str], language: str, result: Dict[str, Any]):
+        # The exchange being cached is already the last two history entries
+        if self._follows_conversation(user_input, len(self.conversation_history) - 2):
+            return
+        system_prompt = system_prompt_override or self.system_prompt
+        # Answers to the feature-specific prompts (YouTube, Spotify, weather inquiries) share the 'inquiry' TTL
+        intent_type = result["intent"].get("type", 'default')
+        if system_prompt_override and intent_type == "conversation":
+            intent_type = 'inquiry'
+        ttl = response_cache.ttl_for(intent_type)
+        if ttl <= 0:
+            return
+        response_cache.put(user_input, system_prompt, model or OLLAMA_DEFAULT_MODEL, language, result, intent_type=intent_type)
+        semantic_cache.store('answer', user_input, {k: result[k] for k in ('intent', 'response', 'ai_source')},
+                             semantic_cache.context_key(system_prompt, model or OLLAMA_DEFAULT_MODEL, language), ttl=ttl)
+
+    def _ollama_session(self, system_prompt_override: Optional[str]):
+        """The Ollama chat session for the default prompt; one-off feature prompts get none"""
+        return self.ollama_session if system_prompt_override is None else None
+
+    def _add_session_turn(self, user_input: str, system_prompt_override: Optional[str], response: str):
+        # Answers from the other providers (and the caches) go in too, so Ollama sees the whole conversation
+        session = self._ollama_session(system_prompt_override)
+        if session is not None:
+            session.add_turn(user_input, response)
+
+    def reset_conversation(self):
+        """Forget the conversation so far (the next Ollama turn starts from the system prompt)"""
+        self.conversation_history = []
+        if self.ollama_session is not None:
+            self.ollama_session.reset()
+
+    @staticmethod
+    def _follows_conversation(user_input: str, earlier_messages: int) -> bool:
+        """A follow-up to earlier turns; its answer depends on them, so it is neither cached nor reused"""
+        return earlier_messages > 0 and refers_to_conversation(user_input)
+
+    def _query_api(self, user_input: str, system_prompt_override: Optional[str], language: str) -> str:
+        """Ask OpenRouter/OpenAI, recording the outcome in provider health (raises on failure)"""
+        # Prepare messages for the API with language, personalized, and MCP context
+        language_context = self._get_language_context(language)
+        personalized_context = self.get_personalized_context(user_input)
+        mcp_context = self.get_mcp_context()
+        system_prompt_with_context = (system_prompt_override or self.system_prompt) + language_context + personalized_context + mcp_context
+
+        messages = [
+            {"role": "system", "content": system_prompt_with_context}
+        ]
+
+        # Add recent conversation history (last 5 exchanges)
+        recent_history = self.conversation_history[-10:] if len(self.conversation_history) > 10 else self.conversation_history
+        messages.extend(recent_history)
+
+        # Add current user input
+        messages.append({"role": "user", "content": user_input})
+
+        try:
+            response = client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=messages,
+                max_tokens=500,
+                temperature=0.7
+            )
+        except Exception as api_error:
+            provider_health.record_failure(API_PROVIDER, api_error, rate_limited=getattr(api_error, 'status_code', None) == 429)
+            raise
+        provider_health.record_success(API_PROVIDER)
+        return response.choices[0].message.content
+
+    def _race_contenders(self, user_input: str, system_prompt_override: Optional[str], model: Optional[str], language: str):
+        """The fallback chain as llm_racer contenders; streamed providers stop generating when cancelled"""
+        contenders = []
+        if OLLAMA_AVAILABLE and spitch_ollama.test_connection():
+            contenders.append(('ollama', lambda cancel: ''.join(spitch_ollama.stream_query(
+                user_input,
+                timeout=OLLAMA_TIMEOUT,
+                system_prompt_override=system_prompt_override,
+                model=model,
+                cancel_event=cancel,
+                session=self._ollama_session(system_prompt_override)
+            ))))
+        if GEMINI_AVAILABLE and spitch_gemini.available and provider_health.available('gemini'):
+            contenders.append(('gemini', lambda cancel: ''.join(spitch_gemini.stream_query(
+                user_input,
+                system_prompt=system_prompt_override or self.system_prompt,
+                cancel_event=cancel
+            ))))
+        if API_AVAILABLE and client and provider_health.available(API_PROVIDER):
+            contenders.append((API_PROVIDER, lambda cancel: self._query_api(user_input, system_prompt_override, language)))
+        return contenders
+
+    def process_command_stream(self, user_input: str, on_sentence: Optional[Callable[[str], None]] = None, system_prompt_override: Optional[str] = None, model: Optional[str] = None, language: str = 'en-US',
+                               on_token: Optional[Callable[[str], None]] = None, cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        Like process_command(), but streams the answer while it is still being generated
+
+        Ollama is streamed first, then Gemini's streamGenerateContent; with LLM_RACING, Gemini starts
+        alongside a slow Ollama and the first to produce text is used. Text fragments go to on_token
+        as they arrive and cleaned sentences to on_sentence; JSON intents are buffered and passed to
+        neither. When no provider can stream, or each fails before producing text, this falls back to
+        process_command() and nothing is streamed. Setting cancel_event stops generation early.
+
+        Returns:
+            The process_command() result plus "streamed": True if on_sentence received the response
+            and "cancelled": True if cancel_event stopped the generation
+        """
+        cached = self._cached_response(user_input, system_prompt_override, model, language)
+        if cached:
+            # Replayed through the same callbacks, so the caller can't tell it apart from a fast stream
+            speakable = cached["intent"].get("type") == "conversation"
+            if speakable and on_token:
+                on_token(cached["response"])
+            if speakable and on_sentence:
+                segmenter = SentenceSegmenter()
+                for sentence in segmenter.feed(cached["response"]) + [segmenter.flush()]:
+                    if sentence:
+                        on_sentence(sentence)
+            cached.update(streamed=speakable and on_sentence is not None, cancelled=False)
+            return cached
+
+        model_to_use = model if model else OLLAMA_DEFAULT_MODEL
+        attempts = []
+        if OLLAMA_AVAILABLE and spitch_ollama.test_connection():
+            attempts.append(('ollama', "Ollama", model_to_use, lambda cancel: spitch_ollama.stream_query(
+                user_input,
+                timeout=OLLAMA_TIMEOUT,
+                system_prompt_override=system_prompt_override,
+                model=model_to_use,
+                cancel_event=cancel,
+                session=self._ollama_session(system_prompt_override)
+            )))
+        if GEMINI_AVAILABLE and spitch_gemini.available and provider_health.available('gemini'):
+            attempts.append(('gemini', "Google Gemini", spitch_gemini.model, lambda cancel: spitch_gemini.stream_query(
+                user_input,
+                system_prompt=system_prompt_override or self.system_prompt,
+                cancel_event=cancel
+            )))
+
+        if LLM_RACING and len(attempts) > 1:
+            # Hedged: the next provider starts streaming too when the first is slow to produce text
+            raced = llm_racer.race_streams([(attempt[0], attempt[3]) for attempt in attempts], cancel_event)
+            if raced is None and cancel_event is not None and cancel_event.is_set():
+                return {"intent": {"type": "conversation", "action_required": False}, "response": "",
+                        "ai_source": attempts[0][1], "streamed": False, "cancelled": True}
+            attempts = [attempt[:3] + (lambda cancel: raced[1],) for attempt in attempts if raced and attempt[0] == raced[0]]
+
+        for provider, ai_source, model_name, open_stream in attempts:
+            result = self._consume_stream(lambda: open_stream(cancel_event), provider, model_name, on_sentence, on_token, cancel_event)
+            if result is not None or (cancel_event is not None and cancel_event.is_set()):
+                break
+        else:
+            return self.process_command(user_input, system_prompt_override=system_prompt_override, model=model, language=language)
+
+        if result is None:
+            # Interrupted before the provider produced anything: don't fall back, the user moved on
+            return {"intent": {"type": "conversation", "action_required": False}, "response": "",
+                    "ai_source": ai_source, "streamed": False, "cancelled": True}
+
+        self.conversation_history.append({"role": "user", "content": user_input})
+        self.conversation_history.append({"role": "assistant", "content": result["response"]})
+        self._add_session_turn(user_input, system_prompt_override, result.pop("raw"))
+        self.learn_from_interaction(user_input, result["response"])
+        result["ai_source"] = ai_source
+        if not result["cancelled"]:
+            self._cache_response(user_input, system_prompt_override, model, language, result)
+        return result
+
+    def _consume_stream(self, open_stream: Callable, provider: str, model_name: Optional[str],
+                        on_sentence: Optional[Callable[[str], None]], on_token: Optional[Callable[[str], None]],
+                        cancel_event: Optional[threading.Event]) -> Optional[Dict[str, Any]]:
+        """Read one provider's stream; None if it failed (or stayed empty) before anything reached the user"""
+        segmenter = SentenceSegmenter()
+        raw_parts = []
+        spoken = []
+        is_json = None
+        delivered = False
+
+        def emit(sentence: str):
+            cleaned = self._clean_response(strip_list_marker(sentence))
+            if cleaned:
+                spoken.append(cleaned)
+                if on_sentence:
+                    on_sentence(cleaned)
+
+        with tracer.span('provider', provider=provider, model=model_name, streamed=True) as span:
+            try:
+                print(f"[PROCESSING] Streaming {provider} response...")
+                for chunk in open_stream():
+                    raw_parts.append(chunk)
+                    if is_json is None:
+                        head = ''.join(raw_parts).lstrip()
+                        if not head:
+                            continue
+                        is_json = head.startswith('{')
+                        chunk = ''.join(raw_parts)
+                    if not is_json:
+                        if on_token:
+                            on_token(chunk)
+                        delivered = True
+                        for sentence in segmenter.feed(chunk):
+                            emit(sentence)
+            except Exception as stream_error:
+                print(f"[ERROR] {provider} streaming error: {stream_error}")
+                span.set(error=str(stream_error))
+                if not delivered:
+                    return None
+            cancelled = cancel_event is not None and cancel_event.is_set()
+            span.set(ok=bool(raw_parts), sentences=len(spoken), cancelled=cancelled)
+
+        ai_response_text = ''.join(raw_parts).strip()
+        if not ai_response_text:
+            return None
+
+        if is_json:
+            try:
+                intent = json.loads(ai_response_text)
+                response_for_user = self._create_confirmation_response(intent)
+                print(f"[OK] Parsed AI intent (JSON): {intent}")
+            except json.JSONDecodeError:
+                intent = {"type": "conversation", "action_required": False}
+                response_for_user = self._clean_response(ai_response_text)
+            streamed = False
+        else:
+            rest = segmenter.flush()
+            if rest and not cancelled:
+                emit(rest)
+            intent = {"type": "conversation", "action_required": False}
+            response_for_user = ' '.join(spoken) or self._clean_response(ai_response_text)
+            streamed = bool(spoken) and on_sentence is not None
+            print(f"[OK] Streamed conversational AI response: {response_for_user}")
+
+        return {
+            "intent": intent,
+            "response": response_for_user,
+            "streamed": streamed,
+            "cancelled": cancelled,
+            "raw": ai_response_text
+        }
+
     def _clean_response(self, response: str) -> str:
         """Clean up AI response by removing markdown, HTML, and complex formatting"""
         import re
@@ -415,6 +720,10 @@ Always be honest about what you know and don't know. It's better to say "I don't
 
     def learn_from_interaction(self, user_input: str, ai_response: str, user_feedback: str = None):
         """Learn from user interactions to improve future responses"""
+        with self._learning_lock:
+            self._learn_from_interaction(user_input, ai_response, user_feedback)
+
+    def _learn_from_interaction(self, user_input: str, ai_response: str, user_feedback: str = None):
         try:
             # Extract patterns from successful interactions
             pattern = {
@@ -522,6 +831,9 @@ Always be honest about what you know and don't know. It's better to say "I don't
 
     def init_mcp(self):
         """Initialize MCP client for enhanced capabilities"""
+        if self.mcp_initialized:
+            return
+        self.mcp_initialized = True
         try:
             from engine.mcp_client import mcp_client
             import asyncio
@@ -546,6 +858,8 @@ Always be honest about what you know and don't know. It's better to say "I don't
 
     def get_mcp_context(self) -> str:
         """Get MCP tools context for AI"""
+        if not self.mcp_initialized:
+            self.init_mcp()
         if self.mcp_enabled and self.mcp_client:
             tools_desc = self.mcp_client.get_tools_description()
             if tools_desc:
@@ -577,25 +891,25 @@ Always be honest about what you know and don't know. It's better to say "I don't
         
         # Quick responses for common greetings (whole words only)
         if has_whole_word(user_input_lower, ['hello', 'hi', 'hey']) or any(phrase in user_input_lower for phrase in ['good morning', 'good evening']):
-            return "Hello! How can I help you today?"
+            return QUICK_RESPONSES['greeting']
         
         elif has_whole_word(user_input_lower, ['bye', 'goodbye']) or 'see you' in user_input_lower:
-            return "Goodbye! Have a great day!"
+            return QUICK_RESPONSES['farewell']
         
         elif any(phrase in user_input_lower for phrase in ['thanks', 'thank you']):
-            return "You're welcome! Is there anything else I can help you with?"
+            return QUICK_RESPONSES['thanks']
         
         elif any(phrase in user_input_lower for phrase in ['how are you', 'how do you do']):
-            return "I'm doing well, thank you for asking! How can I assist you?"
+            return QUICK_RESPONSES['wellbeing']
         
         elif 'what is your name' in user_input_lower or 'who are you' in user_input_lower:
-            return "I'm Spitch, your AI assistant! I'm here to help you with various tasks and answer your questions."
+            return QUICK_RESPONSES['identity']
         
         elif 'what can you do' in user_input_lower or 'help me' in user_input_lower:
-            return "I can help you with many things! I can answer questions, tell jokes, provide information, help with calculations, and much more. Just ask me anything!"
+            return QUICK_RESPONSES['capabilities']
         
         elif user_input_lower in ['test', 'testing', 'hello world']:
-            return "Test successful! I'm working properly and ready to help you."
+            return QUICK_RESPONSES['test']
         
         return None  # No quick response available
 
@@ -4,10 +4,15 @@ AI-Powered Intent Parser - JARVIS-Level Natural Language Understanding
 This module uses AI (Gemini/GPT) to parse natural language commands
 and extract intent, entities, and action plans dynamically.
 """
+import copy
 import json
 import re
 from typing import Dict, Any, List, Optional
 
+# Plans that move, delete, close or send things are always re-planned, never reused from the semantic cache
+DESTRUCTIVE_ACTIONS = {'organize_files', 'git_commit', 'git_push', 'run_shell_command', 'submit_form'}
+DESTRUCTIVE_WORDS = re.compile(r"move|delete|remove|close|kill|rename|erase|shutdown")
+
 class AIIntentParser:
     def __init__(self, ai_assistant):
         """Initialize with AI assistant instance for Gemini/GPT access"""
@@ -48,6 +53,13 @@ class AIIntentParser:
             print(f"[AIIntentParser] Session/Memory not available: {e}")
             context = ""
         
+        # A plan made earlier for the same request, however it was worded, skips the AI call
+        from engine.semantic_cache import semantic_cache
+        skills_key = semantic_cache.context_key(self._get_dynamic_skills_prompt())
+        cached_plan = semantic_cache.lookup('intent', user_input, skills_key)
+        if cached_plan:
+            return copy.deepcopy(cached_plan)
+        
         # Create AI prompt for intent extraction (with context)
         prompt = self._create_intent_prompt(user_input, context)
         
@@ -66,6 +78,8 @@ class AIIntentParser:
             
             # Parse JSON response
             intent_data = self._parse_ai_response(response)
+            if intent_data.get('actions') and intent_data.get('confidence', 0) > 0.5 and self._reusable(intent_data):
+                semantic_cache.store('intent', user_input, copy.deepcopy(intent_data), skills_key)
             
             return intent_data
             
@@ -74,6 +88,15 @@ class AIIntentParser:
             # Fallback to pattern-based parsing
             return self._fallback_parse(user_input)
     
+    @staticmethod
+    def _reusable(intent_data: Dict[str, Any]) -> bool:
+        """False for plans with a destructive action, which must not run for a merely similar request"""
+        for action in intent_data.get('actions', []):
+            action_type = str(action.get('type', ''))
+            if action_type in DESTRUCTIVE_ACTIONS or DESTRUCTIVE_WORDS.search(action_type):
+                return False
+        return not DESTRUCTIVE_WORDS.search(str(intent_data.get('intent', '')))
+
     def _get_dynamic_skills_prompt(self) -> str:
         """Get the available skills formatted for the prompt"""
         try:
@@ -3,10 +3,26 @@ AI Task Agent - Automatically plans and executes complex multi-step tasks
 """
 import json
 import re
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 from engine.mcp_operations import *
 from engine.skill_registry import skill_registry
+from engine.phrase_cache import phrase_cache
+from engine.command_rules import command_rules, RuleMatch
+from engine.tracing import tracer
+
+# Fixed success replies from _generate_success_message(); pre-rendered by the phrase cache
+SUCCESS_MESSAGES = {
+    'spotify': "Spotify opened. Please search for your song manually, or say 'play [song] on youtube' for automatic playback.",
+    'open_and_write': "Done. I've opened the application and entered your text.",
+    'calculate': "Calculation complete.",
+    'search': "Here's what I found.",
+    'create_file': "File created successfully.",
+    'screenshot': "Screenshot captured.",
+    'volume': "Volume adjusted.",
+    'single_step': "Done."
+}
+phrase_cache.register(SUCCESS_MESSAGES.values())
 
 class AITaskAgent:
     def __init__(self):
@@ -196,20 +212,28 @@ class AITaskAgent:
             {"filename": "Screenshot filename (optional)"}
         )(self.take_screenshot_action)
     
-    def parse_complex_command(self, command: str) -> List[Dict[str, Any]]:
-        """Parse a complex natural language command into actionable steps - ALL-ROUNDER VERSION"""
-        command_lower = command.lower()
+    def parse_complex_command(self, command: str, rule_match: Optional[RuleMatch] = None) -> List[Dict[str, Any]]:
+        """
+        Parse a complex natural language command into actionable steps - ALL-ROUNDER VERSION
+
+        The branch is picked by the task-rule table in engine/command_rules.py; pass the
+        RuleMatch from processTextCommand to skip scanning the command a second time.
+        """
+        if rule_match is None:
+            rule_match = command_rules.match(command)
+        command_lower = rule_match.query_lower
+        branch = rule_match.task_rule
         steps = []
         
         # ===== BROWSER OPERATIONS =====
-        if 'search' in command_lower and ('google' in command_lower or 'web' in command_lower or 'internet' in command_lower):
+        if branch == 'web_search':
             # "search google for X" or "search web for X"
             search_match = re.search(r'search\s+(?:google|web|internet)?\s*(?:for\s+)?(.+)', command_lower)
             if search_match:
                 query = search_match.group(1).strip()
                 steps.append({'action': 'open_website', 'params': {'url': f'https://www.google.com/search?q={query}'}})
         
-        elif 'open' in command_lower and any(site in command_lower for site in ['youtube', 'facebook', 'twitter', 'instagram', 'gmail', 'github']):
+        elif branch == 'open_website':
             # "open youtube" or "open facebook"
             for site in ['youtube', 'facebook', 'twitter', 'instagram', 'gmail', 'github', 'linkedin']:
                 if site in command_lower:
@@ -226,7 +250,7 @@ class AITaskAgent:
                     break
         
         # ===== BROWSER AUTOMATION =====
-        elif ('open browser' in command_lower or 'start browser' in command_lower) and 'automation' not in command_lower:
+        elif branch == 'open_browser':
             # "open browser" or "open browser and go to google.com"
             steps.append({'action': 'open_browser', 'params': {}})
             
@@ -242,7 +266,7 @@ class AITaskAgent:
                 query = search_match.group(1).strip()
                 steps.append({'action': 'navigate_to_url', 'params': {'url': f'https://www.google.com/search?q={query}'}})
         
-        elif 'fill' in command_lower and ('form' in command_lower or 'field' in command_lower or 'box' in command_lower or 'input' in command_lower):
+        elif branch == 'fill_form':
             # "fill the search box with laptop" or "fill form field username with john"
             field_match = re.search(r'fill\s+(?:the\s+)?(?:form\s+)?(?:field\s+)?(.+?)\s+with\s+["\']?(.+?)["\']?(?:\s+and|\s+then|$)', command_lower)
             if field_match:
@@ -254,7 +278,7 @@ class AITaskAgent:
                 if 'submit' in command_lower or 'press enter' in command_lower or 'click search' in command_lower:
                     steps.append({'action': 'submit_form', 'params': {}})
         
-        elif 'click' in command_lower and ('button' in command_lower or 'link' in command_lower or 'element' in command_lower):
+        elif branch == 'click_element':
             # "click the login button" or "click on search"
             element_match = re.search(r'click\s+(?:on\s+)?(?:the\s+)?(.+?)(?:\s+button|\s+link|\s+element|$)', command_lower)
             if element_match:
@@ -263,13 +287,13 @@ class AITaskAgent:
                 selector = f"button:contains('{element}'), a:contains('{element}'), [value*='{element}']"
                 steps.append({'action': 'click_on_element', 'params': {'selector': selector}})
         
-        elif 'screenshot' in command_lower and 'page' in command_lower:
+        elif branch == 'page_screenshot':
             # "take a screenshot of the page" or "screenshot the page"
             filename_match = re.search(r'(?:save as|name it|called)\s+(.+)', command_lower)
             filename = filename_match.group(1).strip() if filename_match else None
             steps.append({'action': 'take_page_screenshot', 'params': {'filename': filename}})
         
-        elif 'extract' in command_lower and 'text' in command_lower:
+        elif branch == 'extract_text':
             # "extract all product titles" or "get text from heading"
             selector_match = re.search(r'(?:extract|get)\s+(?:all\s+)?(?:text from\s+)?(.+)', command_lower)
             if selector_match:
@@ -277,12 +301,12 @@ class AITaskAgent:
                 extract_all = 'all' in command_lower
                 steps.append({'action': 'extract_text', 'params': {'selector': selector, 'all': extract_all}})
         
-        elif 'close browser' in command_lower:
+        elif branch == 'close_browser':
             # "close the browser" or "close browser"
             steps.append({'action': 'close_browser', 'params': {}})
         
         # ===== SPOTIFY / MEDIA OPERATIONS =====
-        elif 'open' in command_lower and 'spotify' in command_lower and 'play' in command_lower:
+        elif branch == 'spotify_play':
             # "open spotify and play X"
             song_match = re.search(r'play\s+(.+?)(?:\s+on\s+spotify|$)', command_lower)
             if song_match:
@@ -291,7 +315,7 @@ class AITaskAgent:
                 steps.append({'action': 'play_spotify_song', 'params': {'song': song}})
 
         # ===== MUSIC/MEDIA (YOUTUBE) =====
-        elif 'play' in command_lower and 'youtube' in command_lower:
+        elif branch == 'youtube_play':
             # "play X on youtube" - Existing logic
             video_match = re.search(r'play\s+(.+?)\s+on\s+youtube', command_lower)
             if video_match:
@@ -299,7 +323,7 @@ class AITaskAgent:
                 steps.append({'action': 'open_website', 'params': {'url': f'https://www.youtube.com/results?search_query={query}'}})
         
         # ===== OPEN APP AND DO ACTION =====
-        elif 'open' in command_lower and 'and' in command_lower and 'calculate' in command_lower:
+        elif branch == 'open_and_calculate':
             # "open calculator and calculate 3+2"
             app_match = re.search(r'open\s+(\w+)', command_lower)
             if app_match:
@@ -314,7 +338,7 @@ class AITaskAgent:
         
         # ===== NOTEPAD/TEXT EDITOR OPERATIONS =====
         # ===== NOTEPAD/TEXT EDITOR OPERATIONS =====
-        elif 'open' in command_lower and ('write' in command_lower or 'type' in command_lower):
+        elif branch == 'open_and_write':
             # "open notepad, write X, save file"
             # "open notepad and create a file called X and type Y..."
             app_match = re.search(r'open\s+(\w+)', command_lower)
@@ -347,7 +371,7 @@ class AITaskAgent:
                     steps.append({'action': 'press_key', 'params': {'key': 'enter'}})
         
         # ===== FILE OPERATIONS =====
-        elif 'create file' in command_lower or 'write file' in command_lower:
+        elif branch == 'create_file':
             # "create file X with content Y"
             file_match = re.search(r'(?:create|write)\s+file\s+(?:called\s+)?([^\s]+)', command_lower)
             content_match = re.search(r'(?:with content|containing)\s+(.+)', command_lower)
@@ -357,14 +381,14 @@ class AITaskAgent:
                 content = content_match.group(1) if content_match else ""
                 steps.append({'action': 'write_file', 'params': {'file_path': filename, 'content': content}})
         
-        elif 'delete file' in command_lower or 'remove file' in command_lower:
+        elif branch == 'delete_file':
             # "delete file X"
             file_match = re.search(r'(?:delete|remove)\s+file\s+(.+)', command_lower)
             if file_match:
                 filename = file_match.group(1).strip()
                 steps.append({'action': 'delete_file', 'params': {'file_path': filename}})
         
-        elif 'rename file' in command_lower:
+        elif branch == 'rename_file':
             # "rename file X to Y"
             rename_match = re.search(r'rename\s+file\s+(.+?)\s+to\s+(.+)', command_lower)
             if rename_match:
@@ -373,25 +397,25 @@ class AITaskAgent:
                 steps.append({'action': 'rename_file', 'params': {'old_path': old_name, 'new_path': new_name}})
         
         # ===== SYSTEM CONTROL =====
-        elif 'set volume' in command_lower or 'volume' in command_lower:
+        elif branch == 'set_volume':
             # "set volume to X"
             volume_match = re.search(r'(\d+)', command_lower)
             if volume_match:
                 volume = int(volume_match.group(1))
                 steps.append({'action': 'set_volume', 'params': {'level': volume}})
         
-        elif 'mute' in command_lower or 'unmute' in command_lower:
+        elif branch == 'mute':
             # "mute" or "unmute"
             if 'mute' in command_lower and 'unmute' not in command_lower:
                 steps.append({'action': 'set_volume', 'params': {'level': 0}})
             else:
                 steps.append({'action': 'set_volume', 'params': {'level': 50}})
         
-        elif 'lock' in command_lower and ('screen' in command_lower or 'computer' in command_lower):
+        elif branch == 'lock_screen':
             # "lock screen" or "lock computer"
             steps.append({'action': 'lock_screen', 'params': {}})
         
-        elif 'shutdown' in command_lower or 'restart' in command_lower or 'sleep' in command_lower:
+        elif branch == 'power':
             # "shutdown computer", "restart", "sleep"
             if 'shutdown' in command_lower:
                 steps.append({'action': 'shutdown', 'params': {'action': 'shutdown'}})
@@ -401,7 +425,7 @@ class AITaskAgent:
                 steps.append({'action': 'shutdown', 'params': {'action': 'sleep'}})
         
         # ===== CLIPBOARD OPERATIONS =====
-        elif 'copy' in command_lower and 'clipboard' in command_lower:
+        elif branch == 'clipboard':
             # "copy X to clipboard"
             text_match = re.search(r'copy\s+["\']?(.+?)["\']?\s+to\s+clipboard', command_lower)
             if text_match:
@@ -409,7 +433,7 @@ class AITaskAgent:
                 steps.append({'action': 'copy_to_clipboard', 'params': {'text': text}})
         
         # ===== PROCESS MANAGEMENT =====
-        elif 'close' in command_lower or 'kill' in command_lower:
+        elif branch == 'kill_process':
             # "close notepad" or "kill chrome"
             app_match = re.search(r'(?:close|kill)\s+(\w+)', command_lower)
             if app_match:
@@ -417,18 +441,18 @@ class AITaskAgent:
                 steps.append({'action': 'kill_process', 'params': {'process': app_name}})
         
         # ===== SCREENSHOT =====
-        elif 'screenshot' in command_lower or 'take screenshot' in command_lower:
+        elif branch == 'screenshot':
             # "take screenshot"
             filename = f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
             steps.append({'action': 'take_screenshot', 'params': {'filename': filename}})
         
         # ===== EMAIL (if applicable) =====
-        elif 'send email' in command_lower or 'email' in command_lower:
+        elif branch == 'email':
             # "send email to X" - opens email client
             steps.append({'action': 'open_website', 'params': {'url': 'https://mail.google.com'}})
         
         # ===== CALCULATOR =====
-        elif 'calculate' in command_lower or 'what is' in command_lower:
+        elif branch == 'calculate':
             # "calculate 5+5" or "what is 10*2"
             expr_match = re.search(r'(?:calculate|what is)\s+(.+)', command_lower)
             if expr_match:
@@ -436,7 +460,7 @@ class AITaskAgent:
                 steps.append({'action': 'calculate', 'params': {'expression': expression}})
         
         # ===== MUSIC/MEDIA =====
-        elif 'play music' in command_lower or 'play song' in command_lower:
+        elif branch == 'play_music':
             # "play music" or "play song X"
             song_match = re.search(r'play\s+(?:music|song)\s+(.+)', command_lower)
             if song_match:
@@ -446,35 +470,35 @@ class AITaskAgent:
                 steps.append({'action': 'open_app', 'params': {'app': 'spotify'}})
         
         # ===== FILE INTELLIGENCE OPERATIONS =====
-        elif 'organize' in command_lower and 'file' in command_lower:
+        elif branch == 'organize_files':
             # "organize my files" or "organize files in downloads"
             dir_match = re.search(r'in\s+(.+)', command_lower)
             directory = dir_match.group(1) if dir_match else None
             steps.append({'action': 'organize_files', 'params': {'directory': directory}})
         
-        elif 'recent file' in command_lower or 'show recent' in command_lower:
+        elif branch == 'recent_files':
             # "show recent files"
             steps.append({'action': 'find_recent_files', 'params': {}})
         
-        elif 'search' in command_lower and 'file' in command_lower:
+        elif branch == 'search_files':
             # "search for file named report"
             query_match = re.search(r'(?:search|find).*?(?:file|files).*?(?:named|called)?\s+(.+)', command_lower)
             if query_match:
                 query = query_match.group(1).strip()
                 steps.append({'action': 'search_files', 'params': {'query': query}})
         
-        elif 'find duplicate' in command_lower or 'duplicate file' in command_lower:
+        elif branch == 'find_duplicates':
             # "find duplicates in my documents"
             dir_match = re.search(r'in\s+(.+)', command_lower)
             directory = dir_match.group(1) if dir_match else '.'
             steps.append({'action': 'find_duplicates', 'params': {'directory': directory}})
         
         # ===== GIT OPERATIONS =====
-        elif 'git status' in command_lower or 'check git' in command_lower:
+        elif branch == 'git_status':
             # "git status" or "check git status"
             steps.append({'action': 'git_status', 'params': {}})
         
-        elif 'git commit' in command_lower or 'commit' in command_lower:
+        elif branch == 'git_commit':
             # "commit changes with message update" or "git commit update"
             msg_match = re.search(r'(?:message|msg)\s+(.+)', command_lower)
             if msg_match:
@@ -483,15 +507,15 @@ class AITaskAgent:
                 message = "Update"
             steps.append({'action': 'git_commit', 'params': {'message': message}})
         
-        elif 'git push' in command_lower or 'push' in command_lower:
+        elif branch == 'git_push':
             # "git push" or "push to git"
             steps.append({'action': 'git_push', 'params': {}})
         
-        elif 'git pull' in command_lower or 'pull' in command_lower:
+        elif branch == 'git_pull':
             # "git pull" or "pull from git"
             steps.append({'action': 'git_pull', 'params': {}})
         
-        elif 'run command' in command_lower or 'execute' in command_lower:
+        elif branch == 'run_command':
             # "run command npm install"
             cmd_match = re.search(r'(?:run|execute)\s+(?:command\s+)?(.+)', command_lower)
             if cmd_match:
@@ -499,7 +523,7 @@ class AITaskAgent:
                 steps.append({'action': 'run_shell_command', 'params': {'command': command}})
         
         # ===== MULTI-APP WORKFLOWS =====
-        elif 'open' in command_lower and 'and' in command_lower:
+        elif branch == 'open_multiple':
             # "open chrome and youtube"
             apps = re.findall(r'open\s+(\w+)', command_lower)
             for app in apps:
@@ -507,12 +531,17 @@ class AITaskAgent:
         
         return steps
     
-    def execute_task(self, command: str, speak_func=None) -> Dict[str, Any]:
+    def execute_task(self, command: str, speak_func=None, rule_match: Optional[RuleMatch] = None) -> Dict[str, Any]:
         """Execute a complex task automatically - JARVIS-LEVEL with AI intent parsing"""
         print(f"[AITaskAgent] Parsing command: {command}")
         
         # First, try pattern-based parsing
-        steps = self.parse_complex_command(command)
+        if rule_match is None:
+            rule_match = command_rules.match(command)
+        print(f"[AITaskAgent] Rule trace: {rule_match.trace()}")
+        with tracer.span('task_parse', rule=rule_match.task_rule) as span:
+            steps = self.parse_complex_command(command, rule_match)
+            span.set(steps=len(steps))
         
         # If no steps found, use AI-powered intent parsing
         if not steps:
@@ -520,7 +549,9 @@ class AITaskAgent:
             try:
                 import traceback
                 if self.intent_parser:
-                    intent_data = self.intent_parser.parse_intent(command)
+                    with tracer.span('intent_parser') as span:
+                        intent_data = self.intent_parser.parse_intent(command)
+                        span.set(intent=intent_data.get('intent'), confidence=intent_data.get('confidence'))
                     
                     if intent_data['confidence'] > 0.5 and intent_data['actions']:
                         print(f"[AITaskAgent] AI parsed intent: {intent_data['intent']} (confidence: {intent_data['confidence']})")
@@ -552,7 +583,9 @@ class AITaskAgent:
             
             if action in self.available_actions:
                 # Try executing with retry logic
-                success, result = self._execute_with_retry(action, params, max_retries=3)
+                with tracer.span('skill', action=action, step=i+1) as span:
+                    success, result = self._execute_with_retry(action, params, max_retries=3)
+                    span.set(success=success)
                 
                 if success:
                     results.append({'step': i+1, 'action': action, 'success': True, 'result': result})
@@ -658,24 +691,25 @@ class AITaskAgent:
         
         # Contextual responses based on command type
         if 'spotify' in command_lower and 'play' in command_lower:
-            return "Spotify opened. Please search for your song manually, or say 'play [song] on youtube' for automatic playback."
+            return SUCCESS_MESSAGES['spotify']
         elif 'open' in command_lower and 'write' in command_lower:
-            return "Done. I've opened the application and entered your text."
+            return SUCCESS_MESSAGES['open_and_write']
         elif 'calculate' in command_lower or 'what is' in command_lower:
-            return "Calculation complete."
+            return SUCCESS_MESSAGES['calculate']
         elif 'search' in command_lower or 'find' in command_lower:
-            return "Here's what I found."
+            return SUCCESS_MESSAGES['search']
         elif 'create file' in command_lower:
-            return "File created successfully."
+            return SUCCESS_MESSAGES['create_file']
         elif 'screenshot' in command_lower:
-            return "Screenshot captured."
+            return SUCCESS_MESSAGES['screenshot']
         elif 'volume' in command_lower:
-            return "Volume adjusted."
+            return SUCCESS_MESSAGES['volume']
         else:
             # Generic but conversational
             if num_steps == 1:
-                return "Done."
+                return SUCCESS_MESSAGES['single_step']
             else:
+                # Templated: spoken live, not cached
                 return f"All set. Completed {num_steps} steps."
     
     # Action implementations
@@ -0,0 +1,399 @@
+"""
+ASR Worker Pool - Out-of-process Whisper transcription
+
+Keeps Whisper off the UI and command threads by:
+- Running a pool of worker processes (sized by core count) that each own a resident model
+- Passing raw PCM to workers through shared memory instead of pickling audio
+- Returning transcripts asynchronously as Futures, so the next utterance can be
+  transcribed while the previous command is still executing
+- Tuning torch's thread count per worker so the pool doesn't oversubscribe the CPU
+
+Workers are started as `python -m engine.asr_worker` rather than through
+multiprocessing's spawn, which would re-run main.py's top-level code in every child.
+"""
+import argparse
+import atexit
+import itertools
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+from multiprocessing.connection import Client, Listener
+from typing import Any, Dict, Optional
+
+from engine.whisper_manager import _module_available
+
+try:
+    from config import ASR_WORKERS, ASR_TORCH_THREADS
+except ImportError:
+    ASR_WORKERS = 0
+    ASR_TORCH_THREADS = 0
+
+try:
+    from config import WHISPER_MODEL_DIR, WHISPER_FALLBACK_MODEL
+except ImportError:
+    WHISPER_MODEL_DIR = "whisper_models"
+    WHISPER_FALLBACK_MODEL = "small"
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AUTHKEY_ENV = "SPITCH_ASR_AUTHKEY"
+JOB_TIMEOUT = 60  # seconds a single transcription may take before the caller gives up
+
+
+def _pool_size(workers: int = ASR_WORKERS, torch_threads: int = ASR_TORCH_THREADS):
+    """Workers and torch threads per worker (0 = derive from the core count)"""
+    cores = os.cpu_count() or 1
+    # Each worker holds its own model copy, so more than two rarely pays for the RAM
+    workers = workers or max(1, min(2, cores // 4))
+    torch_threads = torch_threads or max(1, cores // workers)
+    return workers, torch_threads
+
+
+class _Worker:
+    """Parent-side handle for one worker process"""
+
+    def __init__(self, worker_id: int, process: subprocess.Popen):
+        self.worker_id = worker_id
+        self.process = process
+        self.conn = None
+        self.ready = False
+        self.failed = None
+        self.load_seconds = None
+        self.device = None
+        self.completed = 0
+        self.in_flight: Dict[int, Dict[str, Any]] = {}
+        self.send_lock = threading.Lock()
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+
+class ASRWorkerPool:
+    def __init__(self, model_name: str = WHISPER_FALLBACK_MODEL, download_root: str = WHISPER_MODEL_DIR,
+                 workers: int = ASR_WORKERS, torch_threads: int = ASR_TORCH_THREADS):
+        """
+        Initialize the pool (no processes are started until start() or the first submit())
+
+        Args:
+            model_name: Whisper model each worker loads
+            download_root: Directory Whisper reads weights from
+            workers: Number of worker processes (0 = derive from the core count)
+            torch_threads: torch intra-op threads per worker (0 = cores / workers)
+        """
+        self.model_name = model_name
+        self.download_root = download_root
+        self.num_workers, self.torch_threads = _pool_size(workers, torch_threads)
+        self.available = all(_module_available(name) for name in ('whisper', 'torch', 'numpy'))
+        self._workers: Dict[int, _Worker] = {}
+        self._listener = None
+        self._authkey = secrets.token_bytes(16)
+        self._job_ids = itertools.count(1)
+        self._worker_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._started = False
+        self._stopping = False
+        self.latencies = deque(maxlen=200)
+
+    # --- Lifecycle ---
+
+    def start(self):
+        """Launch the worker processes (idempotent); models load inside the workers"""
+        with self._lock:
+            if self._started:
+                return
+            if not self.available:
+                raise ImportError("whisper, torch or numpy is not installed")
+            self._listener = Listener(('127.0.0.1', 0), authkey=self._authkey)
+            self._started = True
+            self._stopping = False
+            for _ in range(self.num_workers):
+                self._spawn_worker()
+        threading.Thread(target=self._accept_loop, name="asr-accept", daemon=True).start()
+        atexit.register(self.stop)
+        print(f"[ASRWorker] Started {self.num_workers} worker(s) with {self.torch_threads} torch thread(s) each")
+
+    def stop(self):
+        """Ask every worker to exit and release the pool"""
+        with self._lock:
+            if not self._started:
+                return
+            self._stopping = True
+            self._started = False
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            try:
+                if worker.conn:
+                    with worker.send_lock:
+                        worker.conn.send(('stop',))
+                worker.process.wait(timeout=2)
+            except Exception:
+                worker.process.kill()
+            self._fail_jobs(worker, RuntimeError("ASR worker pool stopped"))
+        try:
+            self._listener.close()
+        except Exception:
+            pass
+
+    def _spawn_worker(self):
+        worker_id = next(self._worker_ids)
+        host, port = self._listener.address
+        env = dict(os.environ)
+        env[AUTHKEY_ENV] = self._authkey.hex()
+        # Set before torch is imported in the child so OpenMP/MKL size their pools to match
+        env['OMP_NUM_THREADS'] = str(self.torch_threads)
+        env['MKL_NUM_THREADS'] = str(self.torch_threads)
+        worker = _Worker(worker_id, None)
+        # Registered before launch so the accept thread can match the worker's hello
+        self._workers[worker_id] = worker
+        worker.process = subprocess.Popen(
+            [sys.executable, '-m', 'engine.asr_worker',
+             '--connect', f"{host}:{port}",
+             '--worker-id', str(worker_id),
+             '--model', self.model_name,
+             '--download-root', self.download_root,
+             '--threads', str(self.torch_threads)],
+            cwd=PROJECT_ROOT, env=env
+        )
+
+    def _accept_loop(self):
+        """Pair incoming worker connections with their handles"""
+        while self._started:
+            try:
+                conn = self._listener.accept()
+                hello = conn.recv()
+            except Exception:
+                if self._started:
+                    continue
+                return
+            worker = self._workers.get(hello[1]) if hello and hello[0] == 'hello' else None
+            if worker is None:
+                conn.close()
+                continue
+            worker.conn = conn
+            threading.Thread(target=self._reader_loop, args=(worker,),
+                             name=f"asr-reader-{worker.worker_id}", daemon=True).start()
+
+    def _reader_loop(self, worker: _Worker):
+        """Resolve Futures from one worker's replies"""
+        while True:
+            try:
+                message = worker.conn.recv()
+            except (EOFError, OSError):
+                break
+            kind = message[0]
+            if kind == 'ready':
+                worker.ready = True
+                worker.load_seconds, worker.device = message[1], message[2]
+                print(f"[ASRWorker] Worker {worker.worker_id} ready ({worker.device}, model loaded in {worker.load_seconds:.2f}s)")
+            elif kind == 'failed':
+                worker.failed = message[1]
+                print(f"[ASRWorker] Worker {worker.worker_id} could not load the model: {worker.failed}")
+            elif kind in ('result', 'error'):
+                job = worker.in_flight.pop(message[1], None)
+                if job is None:
+                    continue
+                self._release_shm(job)
+                if kind == 'result':
+                    worker.completed += 1
+                    self.latencies.append(time.perf_counter() - job['submitted'])
+                    job['future'].set_result(message[2])
+                else:
+                    job['future'].set_exception(RuntimeError(message[2]))
+        self._handle_exit(worker)
+
+    def _handle_exit(self, worker: _Worker):
+        """A worker's connection closed: fail its jobs and replace it unless we are stopping"""
+        self._fail_jobs(worker, RuntimeError(f"ASR worker {worker.worker_id} exited"))
+        with self._lock:
+            if self._workers.pop(worker.worker_id, None) is None or self._stopping:
+                return
+            if worker.failed:
+                # A model that failed to load will fail again; don't respawn in a loop
+                return
+            print(f"[ASRWorker] Worker {worker.worker_id} exited; starting a replacement")
+            self._spawn_worker()
+
+    def _fail_jobs(self, worker: _Worker, error: Exception):
+        for job_id in list(worker.in_flight):
+            job = worker.in_flight.pop(job_id, None)
+            if job:
+                self._release_shm(job)
+                if not job['future'].done():
+                    job['future'].set_exception(error)
+
+    @staticmethod
+    def _release_shm(job: Dict[str, Any]):
+        try:
+            job['shm'].close()
+            job['shm'].unlink()
+        except Exception:
+            pass
+
+    # --- Transcription ---
+
+    def _pick_worker(self) -> Optional[_Worker]:
+        candidates = [w for w in self._workers.values() if w.conn and w.is_alive() and not w.failed]
+        if not candidates:
+            return None
+        # Prefer workers whose model is loaded, then the least busy one
+        return min(candidates, key=lambda w: (not w.ready, len(w.in_flight)))
+
+    def submit(self, pcm, language: Optional[str] = None, connect_timeout: float = 10.0) -> Future:
+        """
+        Queue audio for transcription
+
+        Args:
+            pcm: Raw 16 kHz mono int16 PCM (bytes or memoryview)
+            language: Whisper language code (e.g., 'en')
+            connect_timeout: Seconds to wait for a worker to come up after start()
+
+        Returns:
+            Future resolving to {'text', 'segments', 'language', 'transcribe_seconds', 'model', 'worker'}
+        """
+        self.start()
+        deadline = time.time() + connect_timeout
+        worker = self._pick_worker()
+        while worker is None and time.time() < deadline:
+            time.sleep(0.05)
+            worker = self._pick_worker()
+        if worker is None:
+            raise RuntimeError("No ASR worker is available")
+
+        data = memoryview(pcm).cast('B')
+        shm = shared_memory.SharedMemory(create=True, size=max(1, data.nbytes))
+        shm.buf[:data.nbytes] = data
+        job_id = next(self._job_ids)
+        future = Future()
+        worker.in_flight[job_id] = {'future': future, 'shm': shm, 'submitted': time.perf_counter()}
+        try:
+            with worker.send_lock:
+                worker.conn.send(('transcribe', job_id, shm.name, data.nbytes, language))
+        except Exception as e:
+            job = worker.in_flight.pop(job_id, None)
+            if job:
+                self._release_shm(job)
+            raise RuntimeError(f"Could not send audio to ASR worker: {e}")
+        return future
+
+    def transcribe(self, pcm, language: Optional[str] = None, timeout: float = JOB_TIMEOUT) -> Dict[str, Any]:
+        """Blocking wrapper around submit()"""
+        return self.submit(pcm, language).result(timeout=timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        latencies = list(self.latencies)
+        return {
+            'available': self.available,
+            'running': self._started,
+            'torch_threads': self.torch_threads,
+            'workers': [
+                {
+                    'worker_id': w.worker_id,
+                    'pid': w.process.pid,
+                    'alive': w.is_alive(),
+                    'ready': w.ready,
+                    'failed': w.failed,
+                    'device': w.device,
+                    'load_seconds': w.load_seconds,
+                    'in_flight': len(w.in_flight),
+                    'completed': w.completed
+                }
+                for w in list(self._workers.values())
+            ],
+            'avg_latency_seconds': (sum(latencies) / len(latencies)) if latencies else None
+        }
+
+
+# --- Worker process ---
+
+def _attach_shm(name: str):
+    """Open the parent's shared memory block without taking ownership of it"""
+    shm = shared_memory.SharedMemory(name=name)
+    if os.name == 'posix':
+        # The parent unlinks the block; stop this process's resource tracker from doing it too
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        except Exception:
+            pass
+    return shm
+
+
+def worker_main(argv=None):
+    """Entry point for one worker process: load the model, then serve transcription requests"""
+    parser = argparse.ArgumentParser(description="Spitch ASR worker")
+    parser.add_argument('--connect', required=True)
+    parser.add_argument('--worker-id', type=int, required=True)
+    parser.add_argument('--model', default=WHISPER_FALLBACK_MODEL)
+    parser.add_argument('--download-root', default=WHISPER_MODEL_DIR)
+    parser.add_argument('--threads', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    host, port = args.connect.rsplit(':', 1)
+    conn = Client((host, int(port)), authkey=bytes.fromhex(os.environ[AUTHKEY_ENV]))
+    conn.send(('hello', args.worker_id, os.getpid()))
+
+    try:
+        import numpy as np
+        import torch
+        import whisper
+        torch.set_num_threads(args.threads)
+        try:
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        start = time.perf_counter()
+        model = whisper.load_model(args.model, device=device, download_root=args.download_root)
+        conn.send(('ready', time.perf_counter() - start, device))
+    except Exception as e:
+        conn.send(('failed', str(e)))
+        conn.close()
+        return 1
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break  # parent went away
+        if message[0] == 'stop':
+            break
+        _, job_id, shm_name, nbytes, language = message
+        try:
+            shm = _attach_shm(shm_name)
+            try:
+                samples = np.frombuffer(shm.buf, dtype=np.int16, count=nbytes // 2)
+                audio = samples.astype(np.float32) / 32768.0
+                del samples  # release the view before closing the block
+            finally:
+                shm.close()
+
+            start = time.perf_counter()
+            result = model.transcribe(audio, fp16=(device == "cuda"), language=language)
+            conn.send(('result', job_id, {
+                'text': result.get('text', ''),
+                'language': result.get('language'),
+                'segments': [
+                    {key: segment.get(key) for key in ('start', 'end', 'text', 'avg_logprob', 'no_speech_prob')}
+                    for segment in result.get('segments', [])
+                ],
+                'transcribe_seconds': time.perf_counter() - start,
+                'model': args.model,
+                'worker': args.worker_id
+            }))
+        except Exception as e:
+            conn.send(('error', job_id, str(e)))
+    conn.close()
+    return 0
+
+# Global instance
+asr_worker_pool = ASRWorkerPool()
+
+
+if __name__ == "__main__":
+    sys.exit(worker_main())
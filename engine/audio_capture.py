@@ -0,0 +1,289 @@
+"""
+Audio Capture - Persistent microphone stream with voice-activity detection
+
+Keeps continuous listening from losing speech between commands by:
+- Holding one microphone stream open on a dedicated capture thread
+- Writing frames into a fixed-size NumPy ring buffer (frames are zero-copy views of the device bytes)
+- Running energy-based voice-activity detection on every frame
+- Passing finished utterances through an optional filter (the wake-word spotter)
+- Handing complete utterances to recognition through a queue
+- Counting dropped frames and utterances
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from engine.mic_calibration import mic_calibration, MIC_DEVICE_INDEX
+
+try:
+    from config import (CAPTURE_FRAME_MS, CAPTURE_BUFFER_SECONDS, VAD_PAUSE_SECONDS,
+                        VAD_PRE_ROLL_SECONDS, VAD_MAX_UTTERANCE_SECONDS)
+except ImportError:
+    CAPTURE_FRAME_MS = 30
+    CAPTURE_BUFFER_SECONDS = 20
+    VAD_PAUSE_SECONDS = 0.8
+    VAD_PRE_ROLL_SECONDS = 0.3
+    VAD_MAX_UTTERANCE_SECONDS = 10
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2  # int16
+SPEECH_START_FRAMES = 3  # consecutive loud frames before an utterance starts
+MIN_UTTERANCE_SECONDS = 0.25
+
+
+class RingBuffer:
+    """Fixed-capacity int16 sample buffer addressed by absolute sample position"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buffer = np.zeros(capacity, dtype=np.int16)
+        self.write_pos = 0  # total samples ever written
+
+    @property
+    def oldest_pos(self) -> int:
+        """Absolute position of the oldest sample still held"""
+        return max(0, self.write_pos - self.capacity)
+
+    def write(self, samples: np.ndarray):
+        """Copy samples in, wrapping around and overwriting the oldest data"""
+        n = len(samples)
+        if n >= self.capacity:
+            samples = samples[-self.capacity:]
+            self.write_pos += n - self.capacity
+            n = self.capacity
+        start = self.write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self._buffer[start:start + first] = samples[:first]
+        if first < n:
+            self._buffer[:n - first] = samples[first:]
+        self.write_pos += n
+
+    def read(self, start_pos: int, end_pos: int) -> np.ndarray:
+        """Copy out samples in [start_pos, end_pos); positions older than the buffer are clipped"""
+        start_pos = max(start_pos, self.oldest_pos)
+        n = max(0, end_pos - start_pos)
+        start = start_pos % self.capacity
+        if start + n <= self.capacity:
+            return self._buffer[start:start + n].copy()
+        return np.concatenate((self._buffer[start:], self._buffer[:n - (self.capacity - start)]))
+
+
+class Utterance:
+    """A complete stretch of speech handed from the capture thread to recognition"""
+
+    def __init__(self, samples: np.ndarray, started_at: float, clipped_samples: int = 0):
+        self.samples = samples
+        self.started_at = started_at
+        self.duration = len(samples) / SAMPLE_RATE
+        self.clipped_samples = clipped_samples
+        self._audio = None
+
+    @property
+    def pcm(self) -> memoryview:
+        """Raw int16 PCM without copying"""
+        return memoryview(self.samples).cast('B')
+
+    @property
+    def audio(self):
+        """speech_recognition AudioData for Google recognition (built on first access)"""
+        if self._audio is None:
+            import speech_recognition as sr
+            self._audio = sr.AudioData(self.samples.tobytes(), SAMPLE_RATE, SAMPLE_WIDTH)
+        return self._audio
+
+
+class AudioCaptureStream:
+    def __init__(self, device_index: Optional[int] = MIC_DEVICE_INDEX, frame_ms: int = CAPTURE_FRAME_MS,
+                 buffer_seconds: float = CAPTURE_BUFFER_SECONDS, max_queued: int = 8):
+        """
+        Initialize the capture stream (the device is opened by start())
+
+        Args:
+            device_index: Input device (None = system default)
+            frame_ms: Frame length used for VAD decisions
+            buffer_seconds: Ring buffer capacity
+            max_queued: Utterances kept waiting for recognition before new ones are dropped
+        """
+        self.device_index = device_index
+        self.frame_samples = int(SAMPLE_RATE * frame_ms / 1000)
+        self.frame_seconds = self.frame_samples / SAMPLE_RATE
+        self.ring = RingBuffer(int(SAMPLE_RATE * buffer_seconds))
+        self.utterances: "queue.Queue[Utterance]" = queue.Queue(maxsize=max_queued)
+        self.pause_frames = max(1, int(VAD_PAUSE_SECONDS / self.frame_seconds))
+        self.pre_roll_samples = int(VAD_PRE_ROLL_SECONDS * SAMPLE_RATE)
+        self.max_utterance_samples = int(VAD_MAX_UTTERANCE_SECONDS * SAMPLE_RATE)
+        self.suppress_when: Optional[Callable[[], bool]] = None
+        # Runs on the capture thread; returns the samples to recognize, or None to drop the utterance
+        self.utterance_filter: Optional[Callable[[np.ndarray], Optional[np.ndarray]]] = None
+        self._stop = threading.Event()
+        self._ready = threading.Event()  # set once the device is open or has failed to open
+        self._thread = None
+        self.error: Optional[Exception] = None
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.stats = {
+            'frames_read': 0,
+            'frames_dropped': 0,        # device overflows (audio lost before we read it)
+            'samples_clipped': 0,       # utterance start overwritten in the ring buffer
+            'utterances_emitted': 0,
+            'utterances_dropped': 0,    # recognition queue was full
+            'utterances_filtered': 0,   # rejected by the utterance filter (e.g. no wake word)
+            'suppressed_frames': 0,     # frames ignored while the assistant was speaking
+            'started_at': None
+        }
+
+    # --- Lifecycle ---
+
+    def start(self, timeout: float = 5.0):
+        """
+        Open the microphone and start the capture thread (idempotent)
+
+        Waits up to timeout seconds for the device to open.
+
+        Raises:
+            RuntimeError: If the microphone could not be opened
+        """
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._ready.clear()
+        self.error = None
+        self._reset_stats()
+        self._thread = threading.Thread(target=self._capture_loop, name="spitch-capture", daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            print(f"[AudioCapture] Microphone not open after {timeout:.0f}s, still waiting in the background")
+        elif self.error is not None:
+            self._thread.join(timeout=1.0)
+            raise RuntimeError(f"Could not open microphone: {self.error}")
+
+    def stop(self, timeout: float = 2.0):
+        """Stop capturing and close the microphone"""
+        self._stop.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def is_running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def get_utterance(self, timeout: Optional[float] = None) -> Optional[Utterance]:
+        """Next complete utterance, or None if none arrived within the timeout"""
+        try:
+            return self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def clear(self):
+        """Discard utterances waiting for recognition"""
+        while True:
+            try:
+                self.utterances.get_nowait()
+            except queue.Empty:
+                return
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['running'] = self.is_running()
+        stats['queued_utterances'] = self.utterances.qsize()
+        stats['energy_threshold'] = mic_calibration.get_threshold(self.device_index)
+        return stats
+
+    # --- Capture thread ---
+
+    def _capture_loop(self):
+        import speech_recognition as sr
+        try:
+            with sr.Microphone(device_index=self.device_index, sample_rate=SAMPLE_RATE,
+                               chunk_size=self.frame_samples) as source:
+                self._ready.set()
+                if mic_calibration.get_threshold(self.device_index) is None:
+                    recognizer = sr.Recognizer()
+                    mic_calibration.calibrate(recognizer, source, self.device_index)
+                self.stats['started_at'] = time.time()
+                print("[AudioCapture] Microphone stream open")
+                self._run_vad(source.stream.pyaudio_stream)
+        except Exception as e:
+            self.error = e
+            print(f"[AudioCapture] Capture stopped: {e}")
+        finally:
+            self._ready.set()
+            mic_calibration.flush()
+            print("[AudioCapture] Microphone stream closed")
+
+    def _read_frame(self, stream) -> bytes:
+        try:
+            return stream.read(self.frame_samples, exception_on_overflow=True)
+        except IOError:
+            # Input overflowed: the device discarded audio we were too slow to read
+            self.stats['frames_dropped'] += 1
+            return stream.read(self.frame_samples, exception_on_overflow=False)
+
+    def _run_vad(self, stream):
+        threshold = mic_calibration.get_threshold(self.device_index) or 300.0
+        loud_frames = 0
+        silent_frames = 0
+        utterance_start = None
+        utterance_started_at = 0.0
+
+        while not self._stop.is_set():
+            data = self._read_frame(stream)
+            frame = np.frombuffer(data, dtype=np.int16)  # view over the device bytes, no copy
+            self.ring.write(frame)
+            self.stats['frames_read'] += 1
+
+            if self.suppress_when and self.suppress_when():
+                # The assistant is talking: don't treat its own voice as a command
+                self.stats['suppressed_frames'] += 1
+                loud_frames = silent_frames = 0
+                utterance_start = None
+                continue
+
+            energy = float(np.sqrt(np.mean(np.square(frame, dtype=np.float32)))) if len(frame) else 0.0
+
+            if utterance_start is None:
+                if energy > threshold:
+                    loud_frames += 1
+                    if loud_frames >= SPEECH_START_FRAMES:
+                        onset = self.ring.write_pos - loud_frames * self.frame_samples
+                        utterance_start = max(0, onset - self.pre_roll_samples)
+                        utterance_started_at = time.time() - (self.ring.write_pos - utterance_start) / SAMPLE_RATE
+                        silent_frames = 0
+                else:
+                    loud_frames = 0
+                    threshold = mic_calibration.adapt_from_energy(energy, self.frame_seconds, self.device_index)
+                continue
+
+            silent_frames = silent_frames + 1 if energy <= threshold else 0
+            length = self.ring.write_pos - utterance_start
+            if silent_frames >= self.pause_frames or length >= self.max_utterance_samples:
+                self._emit(utterance_start, utterance_started_at)
+                utterance_start = None
+                loud_frames = silent_frames = 0
+
+    def _emit(self, start_pos: int, started_at: float):
+        clipped = max(0, self.ring.oldest_pos - start_pos)
+        self.stats['samples_clipped'] += clipped
+        samples = self.ring.read(start_pos, self.ring.write_pos)
+        if len(samples) < MIN_UTTERANCE_SECONDS * SAMPLE_RATE:
+            return
+        if self.utterance_filter is not None:
+            try:
+                samples = self.utterance_filter(samples)
+            except Exception as e:
+                print(f"[AudioCapture] Utterance filter failed: {e}")
+            if samples is None:
+                self.stats['utterances_filtered'] += 1
+                return
+        try:
+            self.utterances.put_nowait(Utterance(samples, started_at, clipped))
+            self.stats['utterances_emitted'] += 1
+        except queue.Full:
+            self.stats['utterances_dropped'] += 1
+            print("[AudioCapture] Recognition is falling behind; dropped an utterance")
+
+# Global instance
+audio_capture = AudioCaptureStream()
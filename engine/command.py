@@ -9,6 +9,8 @@ import subprocess
 import requests
 import re
 import sys
+import threading
+import contextvars
 # Try to import speech recognition with PyAudio fallback handling
 try:
     import speech_recognition as sr
@@ -27,60 +29,233 @@ def safe_display_message(message):
         eel.DisplayMessage(message)
     except (ImportError, AttributeError, Exception):
         print(f"[UI] {message}")  # Fallback to console
-import difflib
 
-# Imports for Whisper (optional)
-try:
-    import whisper
-    import torch
-    import numpy as np
-    WHISPER_AVAILABLE = True
+# Whisper is optional; models are loaded and kept resident by the model manager
+from engine.whisper_manager import whisper_manager
+WHISPER_AVAILABLE = whisper_manager.available
+if WHISPER_AVAILABLE:
     print("[OK] Whisper available for speech recognition")
-except ImportError as e:
-    print(f"[WARNING] Whisper not available: {e}")
+else:
+    print("[WARNING] Whisper not available")
     print("   Speech recognition will use Google only")
-    WHISPER_AVAILABLE = False
-    whisper = None
-    torch = None
-    np = None
 
 from engine.advanced_features import *
 from engine.spotify_api import search_and_play_song, pause_music, resume_music, handle_spotify_inquiry
 from engine.ai_assistant import spitch_ai
-from engine.speak_utils import speak
+from engine.speak_utils import speak, speak_async, interrupt_speech
 from engine.features import openCommand, PlayYoutube, toggle_youtube_playback, handle_youtube_inquiry
 from engine.weather import get_weather
 from engine.user_prefs import set_user_location
+from engine.startup import startup_manager
+from engine.mic_calibration import mic_calibration, MIC_DEVICE_INDEX
+from engine.hedged_recognition import hedged_recognizer, whisper_confidence
+from engine.asr_worker import asr_worker_pool
+from engine.speech_stream import SentenceSpeaker, STREAMING_TTS
+from engine.intent_router import intent_router
+from engine.command_rules import command_rules
+from engine.compound_executor import compound_executor, CompoundPart, refers_back
+from engine.http_client import http_client
+from engine.ollama_models import ollama_models, OLLAMA_WARMUP
+from engine.llm_racer import llm_racer
+from engine.response_cache import response_cache
+from engine.semantic_cache import semantic_cache
+from engine.provider_health import provider_health
+from engine.tracing import tracer
+
+try:
+    from config import STAGED_STARTUP
+except ImportError:
+    STAGED_STARTUP = True
 
-# Import AI Task Agent for skill-based command execution
 try:
+    from config import WHISPER_FALLBACK_MODEL, WHISPER_PRELOAD
+except ImportError:
+    WHISPER_FALLBACK_MODEL = "small"
+    WHISPER_PRELOAD = True
+
+try:
+    from config import ASR_HEDGING, ASR_WORKER_PROCESSES
+except ImportError:
+    ASR_HEDGING = True
+    ASR_WORKER_PROCESSES = True
+
+# Whisper runs in worker processes when enabled, so transcription never holds this process's GIL
+USE_ASR_WORKERS = WHISPER_AVAILABLE and ASR_WORKER_PROCESSES
+
+
+# --- DEFERRED SUBSYSTEM LOADERS ---
+# Each loader runs once, either on the warm-up thread or on the first command that needs it.
+
+def _load_whisper():
+    """Preload the Whisper fallback model so the first failed Google recognition doesn't pay for it"""
+    return whisper_manager.get_model(WHISPER_FALLBACK_MODEL)
+
+
+def _load_asr_workers():
+    """Start the ASR worker processes; each loads the Whisper model in its own process"""
+    asr_worker_pool.start()
+    return asr_worker_pool
+
+
+def _load_ai_task_agent():
+    """Import the AI Task Agent (pulls in pyautogui, MCP operations and skills)"""
     from engine.ai_task_agent import ai_task_agent
-    AI_TASK_AGENT_AVAILABLE = True
     print("[OK] AI Task Agent available")
-except ImportError as e:
-    print(f"[WARNING] AI Task Agent not available: {e}")
-    AI_TASK_AGENT_AVAILABLE = False
-    ai_task_agent = None
+    return ai_task_agent
 
-# --- WHISPER SPEECH RECOGNITION SETUP ---
-if WHISPER_AVAILABLE:
-    # Check if a CUDA-enabled GPU is available, otherwise use CPU
-    DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
-    print(f"Whisper using device: {DEVICE}")
-
-    # Load the Whisper model. 
-    # "base" is a good starting point. Other options: "tiny", "small", "medium", "large"
-    print("Loading Whisper model (base)...")
-    model = whisper.load_model("base", device=DEVICE, download_root="whisper_models")
-    print("Whisper model loaded.")
-else:
-    DEVICE = "cpu"
-    model = None
 
+def _load_intent_parser():
+    """Initialize AI Intent Parser for JARVIS-level understanding"""
+    from engine.ai_intent_parser import initialize_parser
+    parser = initialize_parser(spitch_ai)
+    print("[OK] AI Intent Parser initialized - JARVIS-level NLU enabled")
+    return parser
+
+
+def _load_memory():
+    """Initialize Session Manager and Memory Bank for learning"""
+    from engine.session_manager import session_manager
+    from engine.memory_bank import memory_bank
+
+    print("[OK] Session Manager initialized - Conversation tracking enabled")
+    print("[OK] Memory Bank initialized - Learning system active")
+
+    # Load previous session if exists
+    if session_manager.load_session():
+        print("[OK] Previous session loaded")
+
+    # Print memory summary
+    summary = memory_bank.get_memory_summary()
+    print(f"[MEMORY] Learned from {summary['total_successful_commands']} successful commands")
+    if summary['most_used_apps']:
+        top_app = summary['most_used_apps'][0]
+        print(f"[MEMORY] Most used app: {top_app[0]} ({top_app[1]} times)")
+    return memory_bank
+
+
+def _load_proactive():
+    """Initialize Proactive Assistant and Pattern Tracker for JARVIS-level anticipation"""
+    from engine.proactive_assistant import proactive_assistant
+    from engine.pattern_tracker import pattern_tracker
+
+    print("[OK] Proactive Assistant initialized - Smart suggestions enabled")
+    print("[OK] Pattern Tracker initialized - Learning user habits")
+
+    # Non-blocking CPU sample: the default 1s sampling interval would stall warm-up
+    status = proactive_assistant.get_system_status(cpu_interval=None)
+    print(f"[SYSTEM] CPU: {status.get('cpu_percent', 0):.1f}%, Memory: {status.get('memory_percent', 0):.1f}%, Disk: {status.get('disk_percent', 0):.1f}%")
+    print(f"[TIME] Current period: {status.get('time_of_day', 'unknown')}")
+
+    # Get proactive suggestions
+    suggestions = proactive_assistant.get_proactive_suggestions()
+    if suggestions:
+        print(f"[PROACTIVE] {len(suggestions)} suggestions available")
+        for suggestion in suggestions:
+            print(f"  💡 {suggestion}")
+    return proactive_assistant
+
+
+def _load_ollama_model():
+    """Load the default Ollama model so the first AI answer doesn't include the model load"""
+    from engine.ollama_integration import spitch_ollama
+    if spitch_ollama.ollama.service_running:
+        spitch_ollama.ollama.warm_up()
+    return spitch_ollama
+
+
+def _load_mcp():
+    """Connect the MCP client used for tool descriptions"""
+    spitch_ai.init_mcp()
+    return spitch_ai.mcp_client
+
+
+startup_manager.register('ai_task_agent', _load_ai_task_agent, "AI Task Agent")
+startup_manager.register('intent_parser', _load_intent_parser, "AI Intent Parser")
+startup_manager.register('memory', _load_memory, "Session and Memory Bank")
+startup_manager.register('mcp', _load_mcp, "MCP client")
+startup_manager.register('proactive', _load_proactive, "Proactive Assistant")
+if OLLAMA_WARMUP:
+    startup_manager.register('ollama_model', _load_ollama_model, "Ollama default model")
+if USE_ASR_WORKERS and WHISPER_PRELOAD:
+    startup_manager.register('asr_workers', _load_asr_workers, "Whisper worker processes")
+elif WHISPER_AVAILABLE and WHISPER_PRELOAD:
+    startup_manager.register('whisper', _load_whisper, "Whisper speech model")
+
+
+def get_ai_task_agent():
+    """Return the AI Task Agent, loading it now if warm-up has not reached it yet"""
+    return startup_manager.get('ai_task_agent')
+
+
+@eel.expose
+def get_startup_status():
+    """Return readiness flags for each deferred subsystem"""
+    return startup_manager.get_status()
+
+
+@eel.expose
+def recalibrate_microphone():
+    """Forget the saved noise threshold so the next voice command measures it again"""
+    mic_calibration.reset()
+    return {"status": "ok", "message": "Microphone will be recalibrated on the next voice command"}
+
+
+@eel.expose
+def get_whisper_stats():
+    """Return Whisper model residency plus load and transcription timings"""
+    if USE_ASR_WORKERS:
+        return {'available': WHISPER_AVAILABLE, 'worker_pool': asr_worker_pool.get_stats()}
+    return whisper_manager.get_stats()
+
+
+@eel.expose
+def get_asr_stats():
+    """Return per-engine win rates and latencies from hedged recognition"""
+    return hedged_recognizer.get_stats()
+
+
+@eel.expose
+def get_provider_health():
+    """Liveness, circuit breaker state and call counters for each AI provider"""
+    return provider_health.get_status()
+
+@eel.expose
+def get_llm_race_stats():
+    """Hedged provider races: hedges started, quota use and wins per provider"""
+    return llm_racer.get_stats()
+
+@eel.expose
+def get_response_cache_stats():
+    """Hits, misses and size of the AI response cache"""
+    return response_cache.get_stats()
+
+@eel.expose
+def get_semantic_cache_stats():
+    """Hits, rejections and size of the semantic intent/answer cache"""
+    return semantic_cache.get_stats()
+
+@eel.expose
+def get_ollama_model_stats():
+    """Ollama load, prompt-eval and eval times per model, keep_alive/RAM pressure state and the chat session size"""
+    session = spitch_ai.ollama_session
+    return {**ollama_models.get_stats(), 'chat_session': session.get_stats() if session else None}
+
+@eel.expose
+def get_http_stats():
+    """Requests, errors and HTTP/2 use per outbound host from the shared connection pools"""
+    return http_client.get_stats()
+
+@eel.expose
+def get_traces(limit=20):
+    """Last N command traces (newest first) for the /traces waterfall"""
+    return tracer.get_recent(int(limit))
 
 @eel.expose
-def takeCommand():
-    """Takes microphone input from the user and returns string output using Google Speech Recognition first, then Whisper (small) as fallback."""
+def takeCommand(utterance_filter=None):
+    """Takes microphone input from the user and returns string output using Google Speech Recognition first, then Whisper (small) as fallback.
+
+    utterance_filter works as on the capture stream: it gets the 16 kHz int16 samples and
+    returns the part to recognize, or None to drop the utterance (used for the wake word)."""
     if not SPEECH_RECOGNITION_AVAILABLE:
         print("Speech recognition not available - PyAudio not installed")
         safe_display_message("Microphone not available. Please use text input instead.")
@@ -88,10 +263,12 @@ def takeCommand():
     
     try:
         r = sr.Recognizer()
-        with sr.Microphone(sample_rate=16000) as source:
+        capture_started = time.time()
+        with sr.Microphone(device_index=MIC_DEVICE_INDEX, sample_rate=16000) as source:
             print("Listening for voice command...")
             r.pause_threshold = 0.8
-            r.adjust_for_ambient_noise(source, duration=3)
+            # Saved per-device threshold: no calibration pause except on first use
+            mic_calibration.apply(r, source)
             try:
                 audio = r.listen(source, timeout=5, phrase_time_limit=10)
             except sr.WaitTimeoutError:
@@ -107,6 +284,40 @@ def takeCommand():
         safe_display_message("Microphone not available. Please use text input instead.")
         return ""
 
+    # Keep the background-noise adaptation made while waiting for speech
+    mic_calibration.update_from_recognizer(r)
+    tracer.record('capture', capture_started, time.time(), source='microphone')
+
+    if utterance_filter is not None:
+        import numpy as np
+        samples = np.frombuffer(audio.get_raw_data(convert_rate=16000, convert_width=2), dtype=np.int16)
+        samples = utterance_filter(samples)
+        if samples is None or not len(samples):
+            return ""
+        audio = sr.AudioData(samples.tobytes(), 16000, 2)
+
+    return recognize_audio(audio, recognizer=r)
+
+
+def _transcribe_whisper(pcm, language):
+    """Transcribe raw PCM with Whisper in a worker process, or in-process when workers are disabled"""
+    if USE_ASR_WORKERS:
+        return asr_worker_pool.transcribe(pcm, language=language)
+    return whisper_manager.transcribe(pcm, model_name=WHISPER_FALLBACK_MODEL, language=language)
+
+
+def recognize_audio(audio, recognizer=None):
+    """Turn captured audio (sr.AudioData) into lower-case text: Google first, then resident Whisper."""
+    with tracer.span('asr', hedged=ASR_HEDGING, language=VOICE_LANGUAGE) as span:
+        query = _recognize_audio(audio, recognizer)
+        span.set(chars=len(query or ''))
+        return query
+
+def _recognize_audio(audio, recognizer=None):
+    r = recognizer or sr.Recognizer()
+    if ASR_HEDGING:
+        return _recognize_hedged(audio, r)
+
     # Try Google Speech Recognition first
     try:
         google_lang = SUPPORTED_LANGUAGES[VOICE_LANGUAGE]['google_code']
@@ -118,18 +329,13 @@ def takeCommand():
         print(f"Google recognition error: {e}")
         safe_display_message(f"Google recognition error: {e}. Trying Whisper fallback...")
 
-    # Fallback: Whisper (small) - only if available
+    # Fallback: Whisper (small) - only if available, using the resident model
     if WHISPER_AVAILABLE:
         try:
-            print("Loading Whisper model (small)...")
-            model = whisper.load_model("small", device=DEVICE, download_root="whisper_models")
-            print("Whisper model loaded.")
-            audio_data = audio.get_raw_data()
-            audio_np = np.frombuffer(audio_data, dtype=np.int16).astype(np.float32) / 32768.0
             whisper_lang = SUPPORTED_LANGUAGES[VOICE_LANGUAGE]['whisper_code']
-            result = model.transcribe(audio_np, fp16=(DEVICE == "cuda"), language=whisper_lang)
+            result = _transcribe_whisper(audio.get_raw_data(), whisper_lang)
             query = result['text']
-            print(f"Recognized (Whisper): {query}")
+            print(f"Recognized (Whisper, {result['transcribe_seconds']:.2f}s): {query}")
             safe_display_message(f"(Whisper) You said: {query}")
             return query.lower()
         except Exception as e:
@@ -142,6 +348,36 @@ def takeCommand():
         return ""
 
 
+def _recognize_hedged(audio, r):
+    """Race Google against Whisper and keep the first confident transcript."""
+    google_lang = SUPPORTED_LANGUAGES[VOICE_LANGUAGE]['google_code']
+    whisper_lang = SUPPORTED_LANGUAGES[VOICE_LANGUAGE]['whisper_code']
+
+    def google_fn():
+        response = r.recognize_google(audio, language=google_lang, show_all=True)
+        alternatives = response.get('alternative', []) if isinstance(response, dict) else []
+        if not alternatives:
+            return {'text': ''}
+        best = alternatives[0]
+        # Google only scores some responses; an unscored top alternative is taken as confident
+        return {'text': best.get('transcript', ''), 'confidence': best.get('confidence', 1.0)}
+
+    def whisper_fn():
+        result = _transcribe_whisper(audio.get_raw_data(), whisper_lang)
+        return {'text': result['text'], 'confidence': whisper_confidence(result)}
+
+    outcome = hedged_recognizer.recognize(google_fn, whisper_fn if WHISPER_AVAILABLE else None)
+    if not outcome:
+        print("Speech recognition failed - no engine produced a transcript")
+        safe_display_message("Sorry, I didn't catch that.")
+        return ""
+
+    query = outcome['text']
+    print(f"Recognized ({outcome['engine']}, {outcome['latency']:.2f}s, confidence {outcome['confidence']:.2f}): {query}")
+    safe_display_message(f"({outcome['engine'].capitalize()}) You said: {query}")
+    return query.lower()
+
+
 # Multi-language support
 SUPPORTED_LANGUAGES = {
     'en-US': {'name': 'English', 'whisper_code': 'en', 'google_code': 'en-US'},
@@ -174,224 +410,168 @@ def get_current_language():
     """Return current language setting"""
     return VOICE_LANGUAGE
 
-def process_direct_command(query):
-    """Process commands directly without AI for faster response, now with fuzzy matching."""
-    query_lower = query.lower().strip()
-    print(f"Processing direct command: {query_lower}")
-
-    # Fuzzy matching helpers
-    def fuzzy_match(query, options, cutoff=0.6):
-        match = difflib.get_close_matches(query, options, n=1, cutoff=cutoff)
-        return match[0] if match else None
-
-    # Keywords for advanced YouTube inquiries
-    youtube_inquiry_keywords = [
-        'videos about', 'most-watched youtube', 'beginner tutorials', 'trending youtube shorts',
-        'recommend youtubers', 'title ideas', 'video script', 'thumbnail ideas', 'shorts concept',
-        'video description', 'ask my audience', 'call to action', 'community post', 'ideas for polls',
-        'analyze performance', 'best time to post', 'content calendar', 'seo strategies', 
-        'optimize my videos', 'monetization requirements', 'passive income', 'brand sponsorships'
-    ]
-    if any(fuzzy_match(query_lower, [k], 0.8) for k in youtube_inquiry_keywords):
-        handle_youtube_inquiry(query, speak_func=speak)
-        return True
-
-    # Keywords for advanced Spotify inquiries
-    spotify_inquiry_keywords = [
-        'music similar to', 'trending songs', 'top 10 songs', 'top songs on spotify', 'chill music',
-        'indie rock albums', 'recommend a playlist', 'create a playlist', 'add this song',
-        'shuffle my playlist', 'remove song', 'sort my playlist', 'most played song', 
-        'discover weekly', 'songs i\'ve liked', 'build a playlist', 'top genre', 'play something',
-        'feeling sad', 'i need a boost', 'motivational tracks', 'true crime podcast', 'latest episode',
-        'trending podcasts', 'podcast under', 'listening stats', 'my top 5 songs', 'most listened-to artists'
-    ]
-    if 'spotify' in query_lower and any(fuzzy_match(query_lower, [k], 0.8) for k in spotify_inquiry_keywords):
-        handle_spotify_inquiry(query, speak_func=speak)
-        return True
-
-    # Fuzzy match for time and date
-    if any(phrase in query_lower for phrase in ['what time is it', 'current time', 'time now']) or fuzzy_match(query_lower, ['time', 'what time'], 0.8):
-        current_time = datetime.datetime.now().strftime("%I:%M %p")
-        speak(f"The current time is {current_time}")
-        return True
-    elif fuzzy_match(query_lower, ['date', 'what date', 'today'], 0.8):
-        current_date = datetime.datetime.now().strftime("%B %d, %Y")
-        speak(f"Today is {current_date}")
-        return True
-
-    # YouTube/Spotify music commands (moved up)
-    elif 'youtube' in query_lower:
-        PlayYoutube(query)
-        return True
-    elif 'play' in query_lower and 'spotify' in query_lower:
-        song_name = query_lower.replace('play', '').replace('on spotify', '').strip()
-        speak(f"Playing {song_name} on Spotify.")
-        search_and_play_song(song_name, speak_func=speak)
-        return True
-
-    # Fuzzy match for pause/resume
-    elif fuzzy_match(query_lower, ['pause', 'pause the song', 'pause music', 'pause youtube'], 0.7):
-        if 'youtube' in query_lower:
-            toggle_youtube_playback('pause', speak_func=speak)
-        else:
-            pause_music(speak_func=speak)
-        return True
-    elif fuzzy_match(query_lower, ['resume', 'continue', 'resume music', 'resume the music', 'resume youtube'], 0.7):
-        if 'youtube' in query_lower:
-            toggle_youtube_playback('resume', speak_func=speak)
-        else:
-            resume_music(speak_func=speak)
-        return True
-
-    # Web search commands (now after YouTube)
-    elif 'google' in query_lower or (any(fuzzy_match(query_lower, [w], 0.8) for w in ['search', 'find']) and 'youtube' not in query_lower):
-        search_term = query_lower
-        for word in ['search', 'for', 'google', 'find', 'on', 'the', 'web']:
-            search_term = search_term.replace(word, '')
-        search_term = search_term.strip()
-        if search_term:
-            speak(f"Searching for {search_term}")
-            webbrowser.open(f"https://www.google.com/search?q={search_term}")
-            return True
-
-    # Calculator commands
-    elif any(fuzzy_match(query_lower, [w], 0.8) for w in ['calculate', 'math', 'what is']) and any(op in query_lower for op in ['+', '-', '*', '/', 'plus', 'minus', 'times', 'divided']):
-        math_pattern = r'(\d+\s*[\+\-\*\/]\s*\d+)'
-        match = re.search(math_pattern, query)
-        if match:
-            expression = match.group(1)
-            try:
-                result = eval(expression)
-                speak(f"The result is {result}")
-                return True
-            except:
-                speak("I couldn't calculate that. Please try again.")
+def process_direct_command(query, speak_func=None):
+    """Process commands directly without AI for faster response, routed by the compiled intent router."""
+    print(f"Processing direct command: {intent_router.normalize(query)}")
+    with tracer.span('direct_route') as span:
+        for route in intent_router.routes(query):
+            span.set(intent=route.intent)
+            if DIRECT_HANDLERS[route.intent](query, route.slots, speak_func or speak):
+                span.set(handled=True)
                 return True
+        span.set(handled=False)
+        return False
 
-    # Screenshot commands
-    elif any(fuzzy_match(query_lower, [w], 0.8) for w in ['screenshot', 'capture', 'screen']):
-        take_screenshot(speak_func=speak)
-        return True
-
-    # System info commands (including CPU usage)
-    elif any(fuzzy_match(query_lower, [w], 0.8) for w in ['system', 'computer', 'info', 'specs', 'cpu', 'memory', 'ram']):
-        get_system_info(speak_func=speak, query=query_lower)
-        return True
-    elif 'cpu usage' in query_lower or ('cpu' in query_lower and any(w in query_lower for w in ['usage', 'use', 'percent'])):
-        get_system_info(speak_func=speak, query=query_lower)
-        return True
-
-    # Set location command
-    elif fuzzy_match(query_lower, ['set my location to'], 0.8):
-        city = query_lower.replace("set my location to", "").strip()
-        if city:
-            set_user_location(city.title(), speak_func=speak)
-        else:
-            speak("Please tell me which city to set as your location.")
-        return True
-
-    # Weather commands
-    elif any(fuzzy_match(query_lower, [w], 0.8) for w in ['weather', 'forecast']):
-        forecast_days = 1
-        match = re.search(r"(\d+)\s*day", query_lower)
-        if match:
-            forecast_days = int(match.group(1))
-        elif "week" in query_lower:
-            forecast_days = 7
-        get_weather(query=query_lower, speak_func=speak, forecast_days=forecast_days)
-        return True
-
-    # Joke commands
-    elif any(fuzzy_match(query_lower, [w], 0.8) for w in ['joke', 'funny', 'humor']):
-        speak("Here's a joke for you: Why don't scientists trust atoms? Because they make up everything!")
-        return True
-
-    # Help commands
-    elif any(fuzzy_match(query_lower, [w], 0.8) for w in ['help', 'what can you do', 'capabilities']):
-        speak("I can help you with: opening apps, playing music on YouTube or Spotify, web searches, telling time and date, taking screenshots, checking weather, and more!")
-        return True
-
-    # Open application commands
-    elif 'open' in query_lower:
-        openCommand(query)
-        return True
+# Direct command handlers: (original query, router slots, speak function) -> True if handled,
+# False to let the next matching route try
+def _direct_time(query, slots, say):
+    current_time = datetime.datetime.now().strftime("%I:%M %p")
+    say(f"The current time is {current_time}")
+    return True
+
+def _direct_date(query, slots, say):
+    current_date = datetime.datetime.now().strftime("%B %d, %Y")
+    say(f"Today is {current_date}")
+    return True
+
+def _direct_spotify_play(query, slots, say):
+    say(f"Playing {slots['song_name']} on Spotify.")
+    search_and_play_song(slots['song_name'], speak_func=say)
+    return True
+
+def _direct_pause(query, slots, say):
+    if slots['target'] == 'youtube':
+        toggle_youtube_playback('pause', speak_func=say)
+    else:
+        pause_music(speak_func=say)
+    return True
 
-    # WhatsApp LLM/creative message handling
-    if 'whatsapp' in query_lower and any(w in query_lower for w in ['message', 'draft', 'send']):
-        draft_whatsapp_message(query, speak_func=speak)
-        return True
+def _direct_resume(query, slots, say):
+    if slots['target'] == 'youtube':
+        toggle_youtube_playback('resume', speak_func=say)
+    else:
+        resume_music(speak_func=say)
+    return True
 
-    return False
+def _direct_web_search(query, slots, say):
+    search_term = slots['search_term']
+    if not search_term:
+        return False
+    say(f"Searching for {search_term}")
+    webbrowser.open(f"https://www.google.com/search?q={search_term}")
+    return True
 
-# Import AI Task Agent
-try:
-    from engine.ai_task_agent import ai_task_agent
-    AI_TASK_AGENT_AVAILABLE = True
-    print("[OK] AI Task Agent available")
-except ImportError:
-    AI_TASK_AGENT_AVAILABLE = False
-    ai_task_agent = None
-    print("[WARNING] AI Task Agent not available")
+def _direct_calculate(query, slots, say):
+    if not slots['expression']:
+        return False
+    try:
+        result = eval(slots['expression'])
+        say(f"The result is {result}")
+    except:
+        say("I couldn't calculate that. Please try again.")
+    return True
+
+def _direct_set_location(query, slots, say):
+    if slots['city']:
+        set_user_location(slots['city'].title(), speak_func=say)
+    else:
+        say("Please tell me which city to set as your location.")
+    return True
+
+def _direct_weather(query, slots, say):
+    get_weather(query=intent_router.normalize(query), speak_func=say, forecast_days=slots['forecast_days'])
+    return True
+
+def _direct_joke(query, slots, say):
+    say("Here's a joke for you: Why don't scientists trust atoms? Because they make up everything!")
+    return True
+
+def _direct_help(query, slots, say):
+    say("I can help you with: opening apps, playing music on YouTube or Spotify, web searches, telling time and date, taking screenshots, checking weather, and more!")
+    return True
+
+DIRECT_HANDLERS = {
+    'youtube_inquiry': lambda query, slots, say: handle_youtube_inquiry(query, speak_func=say) or True,
+    'spotify_inquiry': lambda query, slots, say: handle_spotify_inquiry(query, speak_func=say) or True,
+    'time': _direct_time,
+    'date': _direct_date,
+    'youtube_play': lambda query, slots, say: PlayYoutube(query) or True,
+    'spotify_play': _direct_spotify_play,
+    'pause': _direct_pause,
+    'resume': _direct_resume,
+    'web_search': _direct_web_search,
+    'calculate': _direct_calculate,
+    'screenshot': lambda query, slots, say: take_screenshot(speak_func=say) or True,
+    'system_info': lambda query, slots, say: get_system_info(speak_func=say, query=intent_router.normalize(query)) or True,
+    'set_location': _direct_set_location,
+    'weather': _direct_weather,
+    'joke': _direct_joke,
+    'help': _direct_help,
+    'open_app': lambda query, slots, say: openCommand(query) or True,
+    'whatsapp_message': lambda query, slots, say: draft_whatsapp_message(query, speak_func=say) or True,
+}
 
-# Initialize AI Intent Parser for JARVIS-level understanding
-try:
-    from engine.ai_intent_parser import initialize_parser
-    from engine.ai_assistant import spitch_ai
-    
-    ai_intent_parser = initialize_parser(spitch_ai)
-    print("[OK] AI Intent Parser initialized - JARVIS-level NLU enabled")
-except Exception as e:
-    print(f"[WARNING] AI Intent Parser initialization failed: {e}")
+# Staged startup: the UI and direct-command path are usable immediately and heavy
+# subsystems load in the background. Legacy mode loads everything before returning.
+if STAGED_STARTUP:
+    startup_manager.start_warmup()
+else:
+    startup_manager.load_all()
+
+# The AI generation of the command in flight; a new command or cancel_generation() stops it
+_generation_lock = threading.Lock()
+_generation_cancel = threading.Event()
+_command_cancel = contextvars.ContextVar('command_cancel', default=None)
+# Per-request receiver for streamed AI text (set by the Flask /api/stream endpoint)
+_token_sink = contextvars.ContextVar('token_sink', default=None)
+
+def _begin_generation():
+    """Cancel the previous command's AI generation and return the cancel event for a new one"""
+    global _generation_cancel
+    with _generation_lock:
+        _generation_cancel.set()
+        _generation_cancel = threading.Event()
+        return _generation_cancel
 
-# Initialize Session Manager and Memory Bank for learning
-try:
-    from engine.session_manager import session_manager
-    from engine.memory_bank import memory_bank
-    
-    print("[OK] Session Manager initialized - Conversation tracking enabled")
-    print("[OK] Memory Bank initialized - Learning system active")
-    
-    # Load previous session if exists
-    if session_manager.load_session():
-        print("[OK] Previous session loaded")
-    
-    # Print memory summary
-    summary = memory_bank.get_memory_summary()
-    print(f"[MEMORY] Learned from {summary['total_successful_commands']} successful commands")
-    if summary['most_used_apps']:
-        top_app = summary['most_used_apps'][0]
-        print(f"[MEMORY] Most used app: {top_app[0]} ({top_app[1]} times)")
-    
-except Exception as e:
-    print(f"[WARNING] Session/Memory initialization failed: {e}")
+@eel.expose
+def cancel_generation():
+    """Stop generating (and speaking) the current AI answer"""
+    with _generation_lock:
+        _generation_cancel.set()
+    interrupt_speech()
+    return {"status": "cancelled"}
 
-# Initialize Proactive Assistant and Pattern Tracker for JARVIS-level anticipation
-try:
-    from engine.proactive_assistant import proactive_assistant
-    from engine.pattern_tracker import pattern_tracker
-    
-    print("[OK] Proactive Assistant initialized - Smart suggestions enabled")
-    print("[OK] Pattern Tracker initialized - Learning user habits")
-    
-    # Get system status
-    status = proactive_assistant.get_system_status()
-    print(f"[SYSTEM] CPU: {status.get('cpu_percent', 0):.1f}%, Memory: {status.get('memory_percent', 0):.1f}%, Disk: {status.get('disk_percent', 0):.1f}%")
-    print(f"[TIME] Current period: {status.get('time_of_day', 'unknown')}")
-    
-    # Get proactive suggestions
-    suggestions = proactive_assistant.get_proactive_suggestions()
-    if suggestions:
-        print(f"[PROACTIVE] {len(suggestions)} suggestions available")
-        for suggestion in suggestions:
-            print(f"  💡 {suggestion}")
-    
-except Exception as e:
-    print(f"[WARNING] Proactive features initialization failed: {e}")
+@eel.expose
+def reset_conversation():
+    """Start a new conversation: earlier turns are no longer sent to the AI"""
+    spitch_ai.reset_conversation()
+    return {"status": "reset"}
 
 @eel.expose
 def processTextCommand(query, image_base64=None):
     """Process text commands with optional image attachment. Returns the spoken/text response as a string."""
+    cancel_token = _command_cancel.set(_begin_generation())
+    try:
+        with tracer.trace('command', query=(query or '')[:80], image=bool(image_base64)) as span:
+            response = _process_text_command(query, image_base64)
+            span.set(response=(response or '')[:80])
+            return response
+    finally:
+        _command_cancel.reset(cancel_token)
+
+def process_text_command_streaming(query, on_token, image_base64=None):
+    """processTextCommand(), handing each fragment of a streamed AI answer to on_token as it arrives"""
+    sink_token = _token_sink.set(on_token)
+    try:
+        return processTextCommand(query, image_base64)
+    finally:
+        _token_sink.reset(sink_token)
+
+def _process_text_command(query, image_base64=None):
     print(f"[TextCommand] Received: {query}")
+    command_started = time.perf_counter()
+    # A new command makes whatever the assistant was still saying stale
+    interrupt_speech()
     safe_display_message(f"Processing command: {query[:50]}...") # DEBUG
     
     if image_base64:
@@ -447,34 +627,16 @@ def processTextCommand(query, image_base64=None):
 
     # IMPORTANT: Check for complex multi-step commands FIRST before direct command processing
     # This prevents commands like "open notepad, write text" from being treated as simple "open" commands
-    complex_patterns = [
-        ('open' in query.lower() and 'write' in query.lower()),
-        ('open' in query.lower() and 'save' in query.lower()),
-        ('open' in query.lower() and 'calculate' in query.lower()),  # NEW: "open calculator and calculate"
-        ('open' in query.lower() and 'and' in query.lower() and any(word in query.lower() for word in ['write', 'save', 'type', 'calculate', 'search', 'play'])),  # NEW: open X and do Y
-        ('create file' in query.lower() or 'write file' in query.lower()),
-        (query.lower().count(',') >= 1 and any(word in query.lower() for word in ['write', 'save', 'type'])),  # Comma with action words
-        ('search' in query.lower() and ('google' in query.lower() or 'web' in query.lower())),  # NEW: search commands
-        ('play' in query.lower() and 'youtube' in query.lower()),  # NEW: play on youtube
-        ('calculate' in query.lower() or 'what is' in query.lower()),  # NEW: calculations
-        ('take screenshot' in query.lower() or 'screenshot' in query.lower()),  # NEW: screenshots
-        ('generate' in query.lower() and 'image' in query.lower()),  # NEW: image generation
-        ('create' in query.lower() and ('image' in query.lower() or 'picture' in query.lower())),  # NEW: create image/picture
-        ('make' in query.lower() and ('image' in query.lower() or 'picture' in query.lower())),  # NEW: make image/picture
-        # BROWSER AUTOMATION PATTERNS
-        ('open browser' in query.lower() or 'start browser' in query.lower()),  # NEW: browser automation
-        ('close browser' in query.lower()),  # NEW: close browser
-        ('fill' in query.lower() and any(word in query.lower() for word in ['form', 'field', 'box', 'input'])),  # NEW: form filling
-        ('click' in query.lower() and any(word in query.lower() for word in ['button', 'link', 'element'])),  # NEW: clicking elements
-        ('extract' in query.lower() and 'text' in query.lower()),  # NEW: text extraction
-        ('screenshot' in query.lower() and 'page' in query.lower()),  # NEW: page screenshot
-        ('navigate to' in query.lower() or 'go to' in query.lower()),  # NEW: navigation
-    ]
+    # (rule tables live in engine/command_rules.py; the match is reused by the task agent)
+    with tracer.span('routing') as span:
+        rule_match = command_rules.match(query)
+        span.set(**rule_match.trace())
     
-    if AI_TASK_AGENT_AVAILABLE and any(complex_patterns):
-        print("[TextCommand] Detected complex multi-step command, using AI Task Agent")
+    ai_task_agent = get_ai_task_agent() if rule_match.is_complex else None
+    if ai_task_agent:
+        print(f"[TextCommand] Detected complex multi-step command (rule: {rule_match.complex_rule}), using AI Task Agent")
         try:
-            result = ai_task_agent.execute_task(query, speak_func=speak)
+            result = ai_task_agent.execute_task(query, speak_func=speak, rule_match=rule_match)
             if result['success']:
                 safe_display_message(result['message'])
                 return result['message']
@@ -497,65 +659,25 @@ def processTextCommand(query, image_base64=None):
     # Check if this is a compound command (contains 'and')
     if ' and ' in query.lower():
         print("[TextCommand] Detected compound command with 'and'")
-        # Split by 'and' and process each part
-        parts = [part.strip() for part in query.split(' and ')]
-        results = []
-        
-        for i, part in enumerate(parts):
-            print(f"[TextCommand] Processing part {i+1}/{len(parts)}: {part}")
-            
-            # First, try direct command processing for faster response
-            try:
-                direct_result = process_direct_command(part)
-                print(f"[TextCommand] Part {i+1} direct command result: {direct_result}")
-                if direct_result:
-                    results.append(f"Part {i+1} completed")
-                    continue
-            except Exception as e:
-                print(f"[TextCommand] Error in direct command processing for part {i+1}: {e}")
-            
-            # If direct processing didn't work, try AI processing for this part
-            try:
-                print(f"[TextCommand] Trying AI processing for part {i+1}...")
-                
-                # Try quick response first
-                quick_response = spitch_ai.get_quick_response(part)
-                if quick_response:
-                    print(f"[TextCommand] Quick Response for part {i+1}: {quick_response}")
-                    speak(quick_response)
-                    safe_display_message(quick_response)
-                    results.append(quick_response)
-                    continue
-                
-                # Use full AI processing
-                ai_result = spitch_ai.process_command(part, speak_func=speak, language=VOICE_LANGUAGE)
-                intent = ai_result["intent"]
-                ai_response = ai_result["response"]
-                
-                speak(ai_response)
-                safe_display_message(ai_response)
-                results.append(ai_response)
-                
-            except Exception as e:
-                print(f"[TextCommand] AI processing failed for part {i+1}: {e}")
-                results.append(f"Could not process: {part}")
+        # Split by 'and'; independent parts run concurrently, speech comes out in the spoken order
+        parts = [CompoundPart(i, part.strip(), _is_independent_part(part.strip()))
+                 for i, part in enumerate(query.split(' and '))]
+        print(f"[TextCommand] Compound parts: {parts}")
+        utterances = []
+
+        def emit(part):
+            for text in part.speech:
+                utterances.append(speak_async(text))
+
+        compound_executor.run(parts, _run_compound_part, emit)
+        if utterances:
+            utterances[-1].wait(timeout=30 + sum(len(u.text) for u in utterances) / 5)
         
         # Return combined results
-        final_response = " ".join(results)
+        final_response = " ".join(part.result for part in parts)
         return final_response
 
-    # Single command processing (original logic)
-    # First, try direct command processing for faster response
-    try:
-        direct_result = process_direct_command(query)
-        print(f"[TextCommand] Direct command result: {direct_result}")
-        if direct_result:
-            # If direct command handled, return a more specific message
-            return "Direct command executed successfully."
-    except Exception as e:
-        print(f"[TextCommand] Error in direct command processing: {e}")
-
-    # If direct processing didn't work, try AI processing
+    # Single command processing: direct routing already ran above, so go to AI processing
     try:
         print("[TextCommand] Trying AI processing...")
         
@@ -568,7 +690,9 @@ def processTextCommand(query, image_base64=None):
             return quick_response
         
         # Use full AI processing
-        ai_result = spitch_ai.process_command(query, speak_func=speak, language=VOICE_LANGUAGE)
+        with tracer.span('ai') as span:
+            ai_result = _process_ai(query, command_started)
+            span.set(source=ai_result.get("ai_source"), cached=bool(ai_result.get("cached")))
         intent = ai_result["intent"]
         ai_response = ai_result["response"]
         ai_source = ai_result.get("ai_source", "Unknown")
@@ -597,8 +721,9 @@ def processTextCommand(query, image_base64=None):
                 safe_display_message(response)
                 return response
         
-        # Return the AI response
-        speak(ai_response)
+        # Return the AI response (streamed answers were already spoken sentence by sentence)
+        if not ai_result.get("streamed") and not ai_result.get("cancelled"):
+            speak(ai_response)
         safe_display_message(ai_response)
         return ai_response
         
@@ -610,6 +735,73 @@ def processTextCommand(query, image_base64=None):
         safe_display_message(fallback_msg)
         return fallback_msg
 
+# Direct intents with no side effects, safe to run alongside other parts of a compound command
+PARALLEL_SAFE_INTENTS = {'youtube_inquiry', 'spotify_inquiry', 'time', 'date', 'calculate',
+                         'system_info', 'weather', 'joke', 'help'}
+
+def _is_independent_part(part):
+    route = intent_router.route(part)
+    if route:
+        return route.intent in PARALLEL_SAFE_INTENTS
+    # Questions for the AI are independent unless they point back at an earlier part
+    return not refers_back(part)
+
+def _run_compound_part(part):
+    """Direct command, quick response or AI for one part; speech is buffered on the part"""
+    print(f"[TextCommand] Processing part {part.index+1}: {part.text}")
+    try:
+        if process_direct_command(part.text, speak_func=part.say):
+            return f"Part {part.index+1} completed"
+    except Exception as e:
+        print(f"[TextCommand] Error in direct command processing for part {part.index+1}: {e}")
+
+    quick_response = spitch_ai.get_quick_response(part.text)
+    if quick_response:
+        print(f"[TextCommand] Quick Response for part {part.index+1}: {quick_response}")
+        part.say(quick_response)
+        return quick_response
+
+    # Parts run concurrently, so answers are generated whole and spoken in order afterwards
+    ai_result = spitch_ai.process_command(part.text, speak_func=part.say, language=VOICE_LANGUAGE)
+    part.say(ai_result["response"])
+    return ai_result["response"]
+
+def _process_ai(query, started_at):
+    """Run the AI chain, showing the answer as it streams in; with STREAMING_TTS, speak each sentence while the rest is still generating"""
+    speaker = SentenceSpeaker(started_at) if STREAMING_TTS else None
+    sink = _token_sink.get()
+    shown = []
+
+    def on_token(text):
+        shown.append(text)
+        if sink:
+            sink(text)
+        try:
+            eel.StreamResponse(''.join(shown).strip())
+        except Exception:
+            pass  # Flask mode or no UI connected
+
+    def on_sentence(sentence):
+        speaker.say(sentence)
+        safe_display_message(' '.join(u.text for u in speaker.utterances))
+
+    ai_result = spitch_ai.process_command_stream(
+        query,
+        on_sentence if speaker else None,
+        language=VOICE_LANGUAGE,
+        on_token=on_token,
+        cancel_event=_command_cancel.get()
+    )
+    if ai_result.get("cancelled"):
+        print("[TextCommand] AI answer cancelled")
+    if ai_result.get("streamed"):
+        with tracer.span('tts', streamed=True, sentences=len(speaker.utterances)) as span:
+            ttfa = speaker.finish()
+            span.set(time_to_first_audio=ttfa)
+        if ttfa is not None:
+            print(f"[TextCommand] Time to first audio: {ttfa:.2f}s")
+    return ai_result
+
 @eel.expose
 def test_command():
     """Test function to verify basic command processing is working"""
@@ -0,0 +1,127 @@
+"""
+Command Rules - Declarative table for multi-step (task agent) command detection
+
+Replaces the per-command boolean cascades in processTextCommand and
+AITaskAgent.parse_complex_command by:
+- Normalizing and scanning each command once into a phrase match mask
+- Evaluating both the complex-command detector rules and the task-parsing rules on that mask
+- Handing the resulting RuleMatch to the task agent so it does not re-scan the command
+- Recording which rule fired in each table, and how long the match took
+"""
+import time
+from typing import Any, Dict, Optional
+
+from engine.intent_router import IntentRouter, Rule, Clause
+
+# A command matching any of these is sent to the AI task agent before direct routing
+COMPLEX_COMMAND_RULES = [
+    Rule('open_and_write', [Clause(all=['open', 'write'])]),
+    Rule('open_and_save', [Clause(all=['open', 'save'])]),
+    Rule('open_and_calculate', [Clause(all=['open', 'calculate'])]),
+    Rule('open_and_action', [Clause(all=['open', 'and'], any=['write', 'save', 'type', 'calculate', 'search', 'play'])]),
+    Rule('file_write', [Clause(any=['create file', 'write file'])]),
+    Rule('comma_action', [Clause(all=[','], any=['write', 'save', 'type'])]),
+    Rule('web_search', [Clause(all=['search'], any=['google', 'web'])]),
+    Rule('youtube_play', [Clause(all=['play', 'youtube'])]),
+    Rule('calculation', [Clause(any=['calculate', 'what is'])]),
+    Rule('screenshot', [Clause(any=['take screenshot', 'screenshot'])]),
+    Rule('image_generation', [Clause(all=['generate', 'image']),
+                              Clause(all=['create'], any=['image', 'picture']),
+                              Clause(all=['make'], any=['image', 'picture'])]),
+    # Browser automation
+    Rule('browser_open', [Clause(any=['open browser', 'start browser'])]),
+    Rule('browser_close', [Clause(all=['close browser'])]),
+    Rule('form_fill', [Clause(all=['fill'], any=['form', 'field', 'box', 'input'])]),
+    Rule('element_click', [Clause(all=['click'], any=['button', 'link', 'element'])]),
+    Rule('text_extract', [Clause(all=['extract', 'text'])]),
+    Rule('page_screenshot', [Clause(all=['screenshot', 'page'])]),
+    Rule('navigation', [Clause(any=['navigate to', 'go to'])]),
+]
+
+# Branches of AITaskAgent.parse_complex_command, in priority order
+TASK_RULES = [
+    Rule('web_search', [Clause(all=['search'], any=['google', 'web', 'internet'])]),
+    Rule('open_website', [Clause(all=['open'], any=['youtube', 'facebook', 'twitter', 'instagram', 'gmail', 'github'])]),
+    Rule('open_browser', [Clause(any=['open browser', 'start browser'], none=['automation'])]),
+    Rule('fill_form', [Clause(all=['fill'], any=['form', 'field', 'box', 'input'])]),
+    Rule('click_element', [Clause(all=['click'], any=['button', 'link', 'element'])]),
+    Rule('page_screenshot', [Clause(all=['screenshot', 'page'])]),
+    Rule('extract_text', [Clause(all=['extract', 'text'])]),
+    Rule('close_browser', [Clause(all=['close browser'])]),
+    Rule('spotify_play', [Clause(all=['open', 'spotify', 'play'])]),
+    Rule('youtube_play', [Clause(all=['play', 'youtube'])]),
+    Rule('open_and_calculate', [Clause(all=['open', 'and', 'calculate'])]),
+    Rule('open_and_write', [Clause(all=['open'], any=['write', 'type'])]),
+    Rule('create_file', [Clause(any=['create file', 'write file'])]),
+    Rule('delete_file', [Clause(any=['delete file', 'remove file'])]),
+    Rule('rename_file', [Clause(all=['rename file'])]),
+    Rule('set_volume', [Clause(any=['set volume', 'volume'])]),
+    Rule('mute', [Clause(any=['mute', 'unmute'])]),
+    Rule('lock_screen', [Clause(all=['lock'], any=['screen', 'computer'])]),
+    Rule('power', [Clause(any=['shutdown', 'restart', 'sleep'])]),
+    Rule('clipboard', [Clause(all=['copy', 'clipboard'])]),
+    Rule('kill_process', [Clause(any=['close', 'kill'])]),
+    Rule('screenshot', [Clause(any=['screenshot', 'take screenshot'])]),
+    Rule('email', [Clause(any=['send email', 'email'])]),
+    Rule('calculate', [Clause(any=['calculate', 'what is'])]),
+    Rule('play_music', [Clause(any=['play music', 'play song'])]),
+    Rule('organize_files', [Clause(all=['organize', 'file'])]),
+    Rule('recent_files', [Clause(any=['recent file', 'show recent'])]),
+    Rule('search_files', [Clause(all=['search', 'file'])]),
+    Rule('find_duplicates', [Clause(any=['find duplicate', 'duplicate file'])]),
+    Rule('git_status', [Clause(any=['git status', 'check git'])]),
+    Rule('git_commit', [Clause(any=['git commit', 'commit'])]),
+    Rule('git_push', [Clause(any=['git push', 'push'])]),
+    Rule('git_pull', [Clause(any=['git pull', 'pull'])]),
+    Rule('run_command', [Clause(any=['run command', 'execute'])]),
+    Rule('open_multiple', [Clause(all=['open', 'and'])]),
+]
+
+
+class RuleMatch:
+    """One command scanned once, with the first matching rule of each table"""
+
+    def __init__(self, query: str, query_lower: str, complex_rule: Optional[str], task_rule: Optional[str], seconds: float):
+        self.query = query
+        self.query_lower = query_lower
+        self.complex_rule = complex_rule
+        self.task_rule = task_rule
+        self.seconds = seconds
+
+    @property
+    def is_complex(self) -> bool:
+        return self.complex_rule is not None
+
+    def trace(self) -> Dict[str, Any]:
+        return {
+            'complex_rule': self.complex_rule,
+            'task_rule': self.task_rule,
+            'match_us': round(self.seconds * 1e6, 1)
+        }
+
+    def __repr__(self):
+        return f"RuleMatch(complex={self.complex_rule!r}, task={self.task_rule!r})"
+
+
+class CommandRules:
+    def __init__(self, complex_rules=COMPLEX_COMMAND_RULES, task_rules=TASK_RULES):
+        """Compile both tables into one router so a command is scanned a single time"""
+        self._complex = {id(rule) for rule in complex_rules}
+        self._task = {id(rule) for rule in task_rules}
+        self._router = IntentRouter(list(complex_rules) + list(task_rules))
+
+    def match(self, query: str) -> RuleMatch:
+        start = time.perf_counter()
+        query_lower = query.lower()
+        complex_rule = task_rule = None
+        for rule in self._router.matching_rules(self._router.scan(query_lower)):
+            if complex_rule is None and id(rule) in self._complex:
+                complex_rule = rule.intent
+            elif task_rule is None and id(rule) in self._task:
+                task_rule = rule.intent
+            if complex_rule and task_rule:
+                break
+        return RuleMatch(query, query_lower, complex_rule, task_rule, time.perf_counter() - start)
+
+# Global instance
+command_rules = CommandRules()
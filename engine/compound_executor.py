@@ -0,0 +1,125 @@
+"""
+Compound Executor - Run the parts of an "X and Y and Z" command concurrently
+
+Cuts compound-command latency from the sum of its parts to roughly the slowest part by:
+- Classifying parts as independent (questions, read-only lookups) or order-dependent (actions)
+- Running independent parts on a bounded thread pool while order-dependent parts run in sequence
+- Buffering each part's speech and releasing it strictly in the order the parts were spoken
+"""
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from engine.tracing import tracer
+
+try:
+    from config import COMPOUND_PARALLEL, COMPOUND_MAX_WORKERS
+except ImportError:
+    COMPOUND_PARALLEL = True
+    COMPOUND_MAX_WORKERS = 3
+
+# Words that tie a part to what came before it ("open notepad and then type hello", "... and save it")
+BACK_REFERENCES = {'then', 'it', 'them', 'that', 'there', 'afterwards', 'after'}
+
+
+def refers_back(text: str) -> bool:
+    """True if a part mentions an earlier part and therefore has to wait for it"""
+    return bool(BACK_REFERENCES & set(re.findall(r"[a-z']+", text.lower())))
+
+
+class CompoundPart:
+    """One piece of a compound command; handlers speak into it through say()"""
+
+    def __init__(self, index: int, text: str, independent: bool):
+        self.index = index
+        self.text = text
+        self.independent = independent
+        self.speech: List[str] = []
+        self.result: Optional[str] = None
+        self.seconds = 0.0
+        self.done = threading.Event()
+
+    def say(self, text: str):
+        self.speech.append(text)
+
+    def __repr__(self):
+        kind = 'independent' if self.independent else 'ordered'
+        return f"CompoundPart({self.index}, {self.text!r}, {kind})"
+
+
+class CompoundExecutor:
+    def __init__(self, max_workers: int = COMPOUND_MAX_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._pool = None
+        self._lock = threading.Lock()
+        self.stats = {'commands': 0, 'parts': 0, 'parallel_parts': 0, 'seconds_saved': 0.0}
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="spitch-compound")
+            return self._pool
+
+    def run(self, parts: List[CompoundPart], handler: Callable[[CompoundPart], str],
+            emit: Callable[[CompoundPart], None]) -> List[CompoundPart]:
+        """
+        Execute all parts and hand each finished part to emit() in original order
+
+        Args:
+            parts: Parts in the order the user said them
+            handler: Runs one part and returns its result text (speaking via part.say)
+            emit: Receives each finished part, earliest first, as soon as all earlier parts have been emitted
+
+        Returns:
+            The same parts, with result, speech and timing filled in
+        """
+        start = time.perf_counter()
+        next_to_emit = [0]
+        emit_lock = threading.Lock()
+
+        def finish(part: CompoundPart):
+            part.done.set()
+            # Release every finished part at the head of the line, so speech keeps the spoken order
+            with emit_lock:
+                while next_to_emit[0] < len(parts) and parts[next_to_emit[0]].done.is_set():
+                    emit(parts[next_to_emit[0]])
+                    next_to_emit[0] += 1
+
+        def execute(part: CompoundPart):
+            part_start = time.perf_counter()
+            try:
+                with tracer.span('compound_part', index=part.index, independent=part.independent):
+                    part.result = handler(part)
+            except Exception as e:
+                print(f"[Compound] Part {part.index + 1} failed: {e}")
+                part.result = f"Could not process: {part.text}"
+            part.seconds = time.perf_counter() - part_start
+            finish(part)
+
+        parallel = [p for p in parts if p.independent] if COMPOUND_PARALLEL else []
+        futures = [self._get_pool().submit(tracer.wrap(execute), p) for p in parallel]
+        # Order-dependent parts run one after another on the calling thread
+        for part in parts:
+            if part not in parallel:
+                execute(part)
+        for future in futures:
+            future.result()
+
+        elapsed = time.perf_counter() - start
+        self.stats['commands'] += 1
+        self.stats['parts'] += len(parts)
+        self.stats['parallel_parts'] += len(parallel)
+        self.stats['seconds_saved'] += max(0.0, sum(p.seconds for p in parts) - elapsed)
+        print(f"[Compound] {len(parts)} parts ({len(parallel)} in parallel) in {elapsed:.2f}s")
+        return parts
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['enabled'] = COMPOUND_PARALLEL
+        stats['max_workers'] = self.max_workers
+        return stats
+
+# Global instance
+compound_executor = CompoundExecutor()
@@ -4,18 +4,17 @@ import webbrowser
 import urllib.parse
 try:
     import pygame
-    pygame.mixer.init()
     AUDIO_AVAILABLE = True
 except ImportError:
     AUDIO_AVAILABLE = False
     print("Audio playback not available - pygame not installed")
 import eel
-import requests
 import json
 import datetime
 import subprocess
 import time
 from engine.speak_utils import speak
+from engine.http_client import http_client
 import difflib
 from bs4 import BeautifulSoup
 
@@ -23,10 +22,16 @@ from engine.config import ASSISTANT_NAME
 import pyautogui
 import pygetwindow as gw
 from engine.ai_assistant import spitch_ai
+def _ensure_mixer():
+    """Initialize the pygame mixer on first playback instead of at import time"""
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+
 #sound function for playing sound
 def playAssistantSound():
     if AUDIO_AVAILABLE:
         try:
+            _ensure_mixer()
             music_dir = "www\\assets\\audio\\start_sound.mp3"
             pygame.mixer.music.load(music_dir)
             pygame.mixer.music.play()
@@ -38,6 +43,7 @@ def playAssistantSound():
 def playClickSound():
     if AUDIO_AVAILABLE:
         try:
+            _ensure_mixer()
             music_dir = "www\\assets\\audio\\click_sound.mp3"
             pygame.mixer.music.load(music_dir)
             pygame.mixer.music.play()
@@ -45,7 +51,7 @@ def playClickSound():
             print(f"Could not play click sound: {e}")
 
 # --- Settings Management ---
-from engine.user_prefs import load_settings, save_setting
+from engine.user_prefs import load_settings, save_settings
 from engine.speak_utils import get_voice_options # Expose this
 
 @eel.expose
@@ -55,11 +61,9 @@ def get_all_settings():
 
 @eel.expose
 def save_all_settings(settings):
-    """Save multiple settings at once"""
+    """Save multiple settings at once (one file write; the TTS worker picks up voice changes itself)"""
     try:
-        for key, value in settings.items():
-            save_setting(key, value)
-        return True
+        return save_settings(settings)
     except Exception as e:
         print(f"Error saving settings: {e}")
         return False
@@ -207,7 +211,7 @@ def PlayYoutube(query):
         # Get the top video result
         try:
             url = f"https://www.youtube.com/results?search_query={search_term}&sp=EgIQAQ%253D%253D"  # Filter for videos only
-            response = requests.get(url)
+            response = http_client.get(url)
             soup = BeautifulSoup(response.text, 'html.parser')
             for link in soup.find_all('a'):
                 href = link.get('href')
@@ -5,7 +5,10 @@ Provides access to Google's Gemini models as a fallback AI service
 
 import requests
 import json
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, Iterator
+from engine.http_client import http_client
+from engine.provider_health import provider_health
 
 class GoogleGemini:
     def __init__(self):
@@ -39,7 +42,7 @@ class GoogleGemini:
         
         try:
             url = f"{self.base_url}/models?key={self.api_key}"
-            response = requests.get(url, timeout=5)
+            response = http_client.get(url, timeout=5)
             return response.status_code == 200
         except Exception as e:
             print(f"[WARNING] Google Gemini connection test failed: {e}")
@@ -59,34 +62,21 @@ class GoogleGemini:
         """
         if not self.available:
             return None
+        # Skip instantly while the circuit is open (repeated errors or rate limits)
+        if not provider_health.available('gemini'):
+            return None
         
         try:
-            # Construct the prompt
-            full_prompt = query
-            if system_prompt:
-                full_prompt = f"{system_prompt}\n\nUser: {query}\n\nAssistant:"
-            
             # Prepare the API request
             url = f"{self.base_url}/models/{self.model}:generateContent?key={self.api_key}"
             headers = {"Content-Type": "application/json"}
-            data = {
-                "contents": [{
-                    "parts": [{
-                        "text": full_prompt
-                    }]
-                }],
-                "generationConfig": {
-                    "temperature": 0.7,
-                    "maxOutputTokens": 500,
-                    "topP": 0.8,
-                    "topK": 40
-                }
-            }
+            data = self._generation_payload(query, system_prompt)
             
             # Make the request
-            response = requests.post(url, headers=headers, json=data, timeout=timeout)
+            response = http_client.post(url, headers=headers, json=data, timeout=timeout)
             
             if response.status_code == 200:
+                provider_health.record_success('gemini')
                 result = response.json()
                 text = result.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text', '')
                 return text.strip() if text else None
@@ -94,19 +84,91 @@ class GoogleGemini:
             elif response.status_code == 429:
                 # Rate limit exceeded
                 print("[WARNING] Google Gemini rate limit exceeded")
+                retry_after = response.headers.get('Retry-After', '')
+                provider_health.record_failure('gemini', "HTTP 429", rate_limited=True,
+                                               retry_after=float(retry_after) if retry_after.isdigit() else None)
                 return None
             
             else:
                 print(f"[WARNING] Google Gemini API error: {response.status_code}")
+                provider_health.record_failure('gemini', f"HTTP {response.status_code}")
                 return None
                 
         except requests.exceptions.Timeout:
             print("[WARNING] Google Gemini request timeout")
+            provider_health.record_failure('gemini', "timeout")
             return None
         except Exception as e:
             print(f"[WARNING] Google Gemini error: {e}")
+            provider_health.record_failure('gemini', e)
             return None
 
+    def stream_query(self, query: str, system_prompt: Optional[str] = None, timeout: int = 10,
+                     cancel_event: Optional[threading.Event] = None) -> Iterator[str]:
+        """
+        Stream a response from Gemini's streamGenerateContent endpoint as text chunks
+
+        Unlike process_query(), errors are raised instead of returning None, so the caller
+        can fall back to another service.
+
+        Args:
+            cancel_event: When set, stop reading and close the connection
+        """
+        if not self.available:
+            raise RuntimeError("Google Gemini is not configured")
+        if not provider_health.available('gemini'):
+            raise RuntimeError("Google Gemini is being skipped after repeated failures")
+
+        url = f"{self.base_url}/models/{self.model}:streamGenerateContent?alt=sse&key={self.api_key}"
+        headers = {"Content-Type": "application/json"}
+        print(f"[AI] Streaming with Google Gemini ({self.model})...")
+        try:
+            with http_client.post(url, headers=headers, json=self._generation_payload(query, system_prompt),
+                                  timeout=timeout, stream=True) as response:
+                if response.status_code == 429:
+                    retry_after = response.headers.get('Retry-After', '')
+                    provider_health.record_failure('gemini', "HTTP 429", rate_limited=True,
+                                                   retry_after=float(retry_after) if retry_after.isdigit() else None)
+                    raise RuntimeError("Google Gemini rate limit exceeded")
+                response.raise_for_status()
+                # Server-sent events: one "data: {json}" line per chunk
+                for line in response.iter_lines():
+                    if cancel_event is not None and cancel_event.is_set():
+                        print("[AI] Gemini generation cancelled")
+                        break
+                    if not line.startswith(b'data:'):
+                        continue
+                    chunk = json.loads(line[5:])
+                    text = chunk.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text', '')
+                    if text:
+                        yield text
+        except RuntimeError:
+            raise
+        except Exception as e:
+            provider_health.record_failure('gemini', e)
+            raise
+        provider_health.record_success('gemini')
+
+    def _generation_payload(self, query: str, system_prompt: Optional[str]) -> Dict[str, Any]:
+        """Request body for generateContent / streamGenerateContent"""
+        # Construct the prompt
+        full_prompt = query
+        if system_prompt:
+            full_prompt = f"{system_prompt}\n\nUser: {query}\n\nAssistant:"
+        return {
+            "contents": [{
+                "parts": [{
+                    "text": full_prompt
+                }]
+            }],
+            "generationConfig": {
+                "temperature": 0.7,
+                "maxOutputTokens": 500,
+                "topP": 0.8,
+                "topK": 40
+            }
+        }
+
     def process_vision_query(self, query: str, image_bytes: bytes, timeout: int = 15) -> Optional[str]:
         """
         Process a vision query (text + image) using Google Gemini
@@ -144,7 +206,7 @@ class GoogleGemini:
                 }
             }
             
-            response = requests.post(url, headers=headers, json=data, timeout=timeout)
+            response = http_client.post(url, headers=headers, json=data, timeout=timeout)
             
             if response.status_code == 200:
                 result = response.json()
@@ -166,7 +228,7 @@ class GoogleGemini:
         
         try:
             url = f"{self.base_url}/models?key={self.api_key}"
-            response = requests.get(url, timeout=5)
+            response = http_client.get(url, timeout=5)
             
             if response.status_code == 200:
                 models = response.json().get('models', [])
@@ -183,3 +245,5 @@ class GoogleGemini:
 
 # Global instance
 spitch_gemini = GoogleGemini()
+if spitch_gemini.available:
+    provider_health.register('gemini', spitch_gemini.test_connection)
@@ -0,0 +1,185 @@
+"""
+Hedged Speech Recognition - Races Google and local Whisper
+
+Cuts bad-network recognition latency by:
+- Starting Google recognition first and launching Whisper after a short hedge delay
+- Launching Whisper immediately when the network is known to be down (Google is still
+  tried when there is no Whisper, so a Google-only setup keeps recognizing)
+- Taking the first transcript with acceptable confidence and ignoring the loser
+- Recording per-engine win rates and latencies
+"""
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from config import ASR_HEDGE_DELAY, ASR_MIN_CONFIDENCE, ASR_TIMEOUT
+except ImportError:
+    ASR_HEDGE_DELAY = 1.5
+    ASR_MIN_CONFIDENCE = 0.5
+    ASR_TIMEOUT = 15
+
+NETWORK_DOWN_SECONDS = 30  # how long a network failure keeps Google out of the race
+
+GOOGLE = "google"
+WHISPER = "whisper"
+
+
+def whisper_confidence(result: Dict[str, Any]) -> float:
+    """Approximate a 0-1 confidence from Whisper segment log-probabilities"""
+    segments = result.get('segments') or []
+    if not segments:
+        return 0.0 if not (result.get('text') or '').strip() else 0.5
+    avg_logprob = sum(s.get('avg_logprob', -1.0) for s in segments) / len(segments)
+    no_speech = sum(s.get('no_speech_prob', 0.0) for s in segments) / len(segments)
+    return max(0.0, min(1.0, math.exp(avg_logprob) * (1.0 - no_speech)))
+
+
+class HedgedRecognizer:
+    def __init__(self, hedge_delay: float = ASR_HEDGE_DELAY, min_confidence: float = ASR_MIN_CONFIDENCE,
+                 timeout: float = ASR_TIMEOUT):
+        """
+        Initialize the recognizer race
+
+        Args:
+            hedge_delay: Seconds to give Google before Whisper is started as well
+            min_confidence: Transcripts below this confidence don't win the race
+            timeout: Overall time limit for one recognition
+        """
+        self.hedge_delay = hedge_delay
+        self.min_confidence = min_confidence
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="spitch-asr")
+        self._network_down_until = 0.0
+        self._lock = threading.Lock()
+        self.total_requests = 0
+        self.stats = {
+            name: {'attempts': 0, 'wins': 0, 'failures': 0, 'low_confidence': 0,
+                   'latencies': deque(maxlen=200)}
+            for name in (GOOGLE, WHISPER)
+        }
+
+    def network_known_down(self) -> bool:
+        return time.time() < self._network_down_until
+
+    def mark_network_down(self):
+        self._network_down_until = time.time() + NETWORK_DOWN_SECONDS
+
+    def recognize(self, google_fn: Optional[Callable[[], Dict[str, Any]]],
+                  whisper_fn: Optional[Callable[[], Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        Race the engines.
+
+        Args:
+            google_fn: Returns {'text', 'confidence'}; raises on failure (None = unavailable)
+            whisper_fn: Same contract for local Whisper (None = unavailable)
+
+        Returns:
+            {'text', 'engine', 'confidence', 'latency'} for the winner, or None
+        """
+        with self._lock:
+            self.total_requests += 1
+        start = time.perf_counter()
+        futures = {}
+
+        # Without Whisper, Google is the only engine left: try it even while the network looks down
+        if google_fn and (not self.network_known_down() or not whisper_fn):
+            futures[self._submit(GOOGLE, google_fn, start)] = GOOGLE
+        if whisper_fn and (not futures):
+            futures[self._submit(WHISPER, whisper_fn, start)] = WHISPER
+
+        best = None
+        hedged = WHISPER in futures.values() or not whisper_fn
+        deadline = start + self.timeout
+        pending = set(futures)
+
+        while pending:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            wait_for = deadline - now
+            if not hedged:
+                wait_for = min(wait_for, max(0.0, start + self.hedge_delay - now))
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                outcome = future.result()
+                if outcome is None:
+                    continue
+                if outcome['confidence'] >= self.min_confidence:
+                    self._record_win(outcome['engine'])
+                    for loser in pending:
+                        loser.cancel()  # a running loser finishes in the background and is ignored
+                    return outcome
+                self.stats[outcome['engine']]['low_confidence'] += 1
+                if best is None or outcome['confidence'] > best['confidence']:
+                    best = outcome
+
+            # Hedge: Google is slow or already failed, so start Whisper too
+            if not hedged and (time.perf_counter() - start >= self.hedge_delay or not pending):
+                hedged = True
+                future = self._submit(WHISPER, whisper_fn, start)
+                futures[future] = WHISPER
+                pending.add(future)
+
+        if best:
+            self._record_win(best['engine'])
+        return best
+
+    def _submit(self, engine: str, fn: Callable[[], Dict[str, Any]], race_start: float):
+        self.stats[engine]['attempts'] += 1
+        return self._executor.submit(self._run_engine, engine, fn, race_start)
+
+    def _run_engine(self, engine: str, fn: Callable[[], Dict[str, Any]], race_start: float) -> Optional[Dict[str, Any]]:
+        engine_start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception as e:
+            self.stats[engine]['failures'] += 1
+            if engine == GOOGLE and type(e).__name__ == 'RequestError':
+                # No connectivity (not just unintelligible speech): skip Google for a while
+                self.mark_network_down()
+            print(f"[HedgedASR] {engine} failed: {e}")
+            return None
+        self.stats[engine]['latencies'].append(time.perf_counter() - engine_start)
+        if engine == GOOGLE:
+            self._network_down_until = 0.0  # Google answered, so the network is back
+        text = (result.get('text') or '').strip()
+        if not text:
+            return None
+        return {
+            'text': text,
+            'engine': engine,
+            'confidence': result.get('confidence', 1.0),
+            'latency': time.perf_counter() - race_start
+        }
+
+    def _record_win(self, engine: str):
+        with self._lock:
+            self.stats[engine]['wins'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-engine win rate and latency for monitoring"""
+        summary = {
+            'requests': self.total_requests,
+            'hedge_delay': self.hedge_delay,
+            'network_known_down': self.network_known_down(),
+            'engines': {}
+        }
+        for engine, stats in self.stats.items():
+            latencies = sorted(stats['latencies'])
+            summary['engines'][engine] = {
+                'attempts': stats['attempts'],
+                'wins': stats['wins'],
+                'win_rate': stats['wins'] / self.total_requests if self.total_requests else 0.0,
+                'failures': stats['failures'],
+                'low_confidence': stats['low_confidence'],
+                'median_latency': latencies[len(latencies) // 2] if latencies else None
+            }
+        return summary
+
+# Global instance
+hedged_recognizer = HedgedRecognizer()
@@ -0,0 +1,214 @@
+"""
+HTTP Client - Shared, connection-pooled sessions for outbound AI and API calls
+
+Stops every call from paying for a new TCP (and TLS) handshake by:
+- Keeping one requests.Session per origin (scheme://host:port) with a keep-alive pool of
+  HTTP_POOL_MAXSIZE connections, reused by every module that talks to that host
+- Applying default connect/read timeouts when a call does not pass its own
+- Sending requests for hosts in HTTP2_HOSTS (Gemini) over a multiplexed HTTP/2 httpx client
+  when httpx and h2 are installed, behind the same response interface
+- Letting tests and benchmarks point a base URL at a local stand-in server with redirect()
+"""
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    from config import HTTP_POOL_MAXSIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP2_HOSTS
+except ImportError:
+    HTTP_POOL_MAXSIZE = 10
+    HTTP_CONNECT_TIMEOUT = 5
+    HTTP_READ_TIMEOUT = 30
+    HTTP2_HOSTS = ['generativelanguage.googleapis.com']
+
+
+class HTTP2Response:
+    """An httpx response behind the parts of the requests.Response interface the engine uses"""
+
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.url = str(response.url)
+
+    @property
+    def text(self) -> str:
+        return self._response.text
+
+    @property
+    def content(self) -> bytes:
+        return self._response.content
+
+    def json(self) -> Any:
+        return self._response.json()
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+    def iter_lines(self):
+        for line in self._response.iter_lines():
+            yield line.encode('utf-8') if isinstance(line, str) else line
+
+    def close(self):
+        self._response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class HTTPClient:
+    def __init__(self, pool_maxsize: int = HTTP_POOL_MAXSIZE, connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+                 read_timeout: float = HTTP_READ_TIMEOUT, http2_hosts: Optional[List[str]] = None):
+        """
+        Args:
+            pool_maxsize: Keep-alive connections kept per origin
+            connect_timeout: Default seconds to establish a connection
+            read_timeout: Default seconds to wait for response data
+            http2_hosts: Host names to reach over HTTP/2 when httpx[http2] is available
+        """
+        self.pool_maxsize = pool_maxsize
+        self.default_timeout = (connect_timeout, read_timeout)
+        self.http2_hosts = set(HTTP2_HOSTS if http2_hosts is None else http2_hosts)
+        self._sessions: Dict[str, requests.Session] = {}
+        self._http2_clients: Dict[str, Any] = {}
+        self._redirects: List[Tuple[str, str]] = []
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    # --- Injection ---
+
+    def redirect(self, prefix: str, target: str):
+        """Send every request whose URL starts with prefix to target instead (e.g. a local stand-in server)"""
+        with self._lock:
+            self._redirects = [(p, t) for p, t in self._redirects if p != prefix]
+            self._redirects.append((prefix.rstrip('/'), target.rstrip('/')))
+
+    def clear_redirects(self):
+        with self._lock:
+            self._redirects = []
+
+    def _rewrite(self, url: str) -> str:
+        for prefix, target in self._redirects:
+            if url.startswith(prefix):
+                return target + url[len(prefix):]
+        return url
+
+    # --- Pools ---
+
+    def session(self, url: str) -> requests.Session:
+        """The pooled session for url's origin (created on first use)"""
+        origin = self._origin(url)
+        with self._lock:
+            session = self._sessions.get(origin)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[origin] = session
+            return session
+
+    def _http2_client(self, url: str):
+        """HTTP/2 client for url's origin, or None if the host is not listed or httpx/h2 is missing"""
+        host = urlsplit(url).hostname
+        if httpx is None or host not in self.http2_hosts:
+            return None
+        origin = self._origin(url)
+        with self._lock:
+            if origin not in self._http2_clients:
+                try:
+                    self._http2_clients[origin] = httpx.Client(
+                        http2=True,
+                        limits=httpx.Limits(max_keepalive_connections=self.pool_maxsize),
+                        timeout=httpx.Timeout(self.default_timeout[1], connect=self.default_timeout[0])
+                    )
+                    print(f"[HTTP] Using HTTP/2 for {origin}")
+                except ImportError:
+                    # httpx without the h2 package: stay on pooled HTTP/1.1
+                    print(f"[HTTP] h2 not installed, using HTTP/1.1 for {origin}")
+                    self._http2_clients[origin] = None
+            return self._http2_clients[origin]
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    # --- Requests ---
+
+    def request(self, method: str, url: str, **kwargs):
+        """
+        Send a request over the pooled connection for its host (same arguments as requests.request)
+
+        Raises requests.exceptions.RequestException subclasses on every transport, so callers'
+        existing except clauses keep working for HTTP/2 hosts too.
+        """
+        url = self._rewrite(url)
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.default_timeout
+        self._count(url, 'requests')
+        try:
+            client = self._http2_client(url)
+            if client is not None:
+                return self._send_http2(client, method, url, **kwargs)
+            return self.session(url).request(method, url, **kwargs)
+        except Exception:
+            self._count(url, 'errors')
+            raise
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def _send_http2(self, client, method: str, url: str, timeout=None, stream: bool = False, **kwargs) -> HTTP2Response:
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        try:
+            request = client.build_request(method, url, timeout=timeout, **kwargs)
+            response = client.send(request, stream=stream)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        self._count(url, 'http2')
+        return HTTP2Response(response)
+
+    def _count(self, url: str, key: str):
+        origin = self._origin(url)
+        with self._lock:
+            stats = self._stats.setdefault(origin, {'requests': 0, 'errors': 0, 'http2': 0})
+            stats[key] += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Requests, errors and HTTP/2 use per origin"""
+        with self._lock:
+            return {origin: dict(stats) for origin, stats in self._stats.items()}
+
+    def close(self):
+        """Close every pooled connection"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            for client in self._http2_clients.values():
+                if client is not None:
+                    client.close()
+            self._sessions.clear()
+            self._http2_clients.clear()
+
+# Global instance
+http_client = HTTPClient()
@@ -0,0 +1,288 @@
+"""
+Intent Router - Compiled routing table for direct (non-AI) commands
+
+Replaces the sequential difflib cascade in process_direct_command by:
+- Normalizing the query once and finding every literal phrase in one Aho-Corasick pass
+- Compiling each rule to bitmask tests over a single per-query match mask
+- Bucketing fuzzy keywords by the query lengths that could possibly reach their cutoff
+- Rejecting the remaining fuzzy candidates in one NumPy step with a precomputed character-count
+  (unigram) bound, before running SequenceMatcher, so results match difflib.get_close_matches exactly
+- Returning the intent and its extracted slots together
+"""
+import re
+from difflib import SequenceMatcher
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+
+class AhoCorasick:
+    """Finds which of a fixed list of phrases occur in a text in a single scan"""
+
+    def __init__(self, phrases: List[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[int] = [0]
+        for bit, phrase in enumerate(phrases):
+            self._add(phrase, 1 << bit)
+        self._build()
+
+    def _add(self, phrase: str, mask: int):
+        state = 0
+        for char in phrase:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(0)
+            state = nxt
+        self._out[state] |= mask
+
+    def _build(self):
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> int:
+        """Bitmask with bit i set if phrases[i] occurs in text"""
+        found = 0
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found |= out[state]
+        return found
+
+
+class Route:
+    """A matched intent plus the slots extracted from the query"""
+
+    def __init__(self, intent: str, slots: Dict[str, Any]):
+        self.intent = intent
+        self.slots = slots
+
+    def __repr__(self):
+        return f"Route({self.intent!r}, {self.slots!r})"
+
+
+class Clause:
+    """
+    One way a rule can match (a rule matches if any of its clauses does)
+
+    Args:
+        all: Phrases that must all occur in the query
+        any: At least one of these phrases must occur
+        none: None of these phrases may occur
+        fuzzy: The whole query must be close (difflib ratio >= cutoff) to one of these keywords
+        cutoff: Similarity cutoff for fuzzy
+    """
+
+    def __init__(self, all=(), any=(), none=(), fuzzy=(), cutoff: float = 0.8):
+        self.all = tuple(all)
+        self.any = tuple(any)
+        self.none = tuple(none)
+        self.fuzzy = tuple((keyword, cutoff) for keyword in fuzzy)
+
+    def phrases(self) -> Set[str]:
+        return set(self.all) | set(self.any) | set(self.none)
+
+    def compile(self, bits: Dict[Any, int]) -> Tuple[int, int, int, int]:
+        """(required, any-of, forbidden, fuzzy any-of) bitmasks over the router's bit assignment"""
+        def mask(items):
+            return sum(1 << bits[item] for item in set(items))
+        return mask(self.all), mask(self.any), mask(self.none), mask(self.fuzzy)
+
+
+class Rule:
+    def __init__(self, intent: str, clauses: List[Clause], slots: Optional[Callable[[str, str], Dict[str, Any]]] = None):
+        """
+        Args:
+            intent: Name handed back in the Route
+            clauses: Alternatives, checked in order
+            slots: slots(query, query_lower) -> dict, run only for the rule that is returned
+        """
+        self.intent = intent
+        self.clauses = clauses
+        self.slots = slots
+
+
+class IntentRouter:
+    def __init__(self, rules: List[Rule]):
+        """Compile the phrase automaton and fuzzy-keyword indexes for an ordered rule list"""
+        self.rules = rules
+        phrases = set()
+        fuzzy = set()
+        for rule in rules:
+            for clause in rule.clauses:
+                phrases |= clause.phrases()
+                fuzzy.update(clause.fuzzy)
+        # Every phrase and every (keyword, cutoff) fuzzy entry gets one bit, so a query
+        # becomes a single integer and each clause is a handful of mask tests
+        phrases = sorted(phrases)
+        self._fuzzy = sorted(fuzzy)
+        bits = {phrase: i for i, phrase in enumerate(phrases)}
+        bits.update({entry: len(phrases) + i for i, entry in enumerate(self._fuzzy)})
+        self._fuzzy_bit0 = len(phrases)
+        self._automaton = AhoCorasick(phrases)
+        self._compiled = [(rule, [clause.compile(bits) for clause in rule.clauses]) for rule in rules]
+
+        # Character-count matrix of the fuzzy keywords (one row each, last column = other chars)
+        self._alphabet = {ch: i for i, ch in enumerate(sorted({ch for keyword, _ in self._fuzzy for ch in keyword}))}
+        self._counts = np.zeros((len(self._fuzzy), len(self._alphabet) + 1), dtype=np.int32)
+        for row, (keyword, _) in enumerate(self._fuzzy):
+            for ch in keyword:
+                self._counts[row, self._alphabet[ch]] += 1
+        self._lengths = np.array([len(keyword) for keyword, _ in self._fuzzy], dtype=np.float64)
+        self._cutoffs = np.array([cutoff for _, cutoff in self._fuzzy], dtype=np.float64)
+
+        # difflib's ratio is 2*M/(len(a)+len(b)) with M <= min(len(a), len(b)), so each
+        # (keyword, cutoff) pair can only match queries within a fixed length range
+        by_length: Dict[int, List[int]] = {}
+        for row, (keyword, cutoff) in enumerate(self._fuzzy):
+            n = len(keyword)
+            shortest = int(cutoff * n / (2 - cutoff))
+            longest = int(n * (2 - cutoff) / cutoff) + 1
+            for length in range(max(shortest, 1), longest + 1):
+                by_length.setdefault(length, []).append(row)
+        self._fuzzy_by_length = {length: np.array(rows) for length, rows in by_length.items()}
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return query.lower().strip()
+
+    def _fuzzy_hits(self, query_lower: str) -> int:
+        """Bitmask of the fuzzy entries the whole query is close enough to"""
+        candidates = self._fuzzy_by_length.get(len(query_lower))
+        if candidates is None:
+            return 0
+        other = len(self._alphabet)
+        query_counts = np.bincount([self._alphabet.get(ch, other) for ch in query_lower], minlength=other + 1)
+        # Same upper bound as SequenceMatcher.quick_ratio(), for all candidates at once
+        common = np.minimum(self._counts[candidates], query_counts).sum(axis=1)
+        bound = 2.0 * common / (len(query_lower) + self._lengths[candidates])
+        hits = 0
+        matcher = None
+        for row in candidates[bound >= self._cutoffs[candidates]]:
+            keyword, cutoff = self._fuzzy[row]
+            if matcher is None:
+                matcher = SequenceMatcher()
+                matcher.set_seq2(query_lower)
+            matcher.set_seq1(keyword)
+            if matcher.ratio() >= cutoff:
+                hits |= 1 << (self._fuzzy_bit0 + int(row))
+        return hits
+
+    def scan(self, query_lower: str) -> int:
+        """Match mask of a normalized query: one bit per phrase present and per fuzzy keyword it is close to"""
+        return self._automaton.find(query_lower) | self._fuzzy_hits(query_lower)
+
+    def matching_rules(self, found: int) -> Iterator[Rule]:
+        """Rules satisfied by a scan() mask, in priority order"""
+        for rule, clauses in self._compiled:
+            for required, any_of, forbidden, fuzzy in clauses:
+                if (found & required == required and (not any_of or found & any_of)
+                        and not found & forbidden and (not fuzzy or found & fuzzy)):
+                    yield rule
+                    break
+
+    def routes(self, query: str) -> Iterator[Route]:
+        """Every matching route in priority order (a handler may decline and let the next one run)"""
+        query_lower = self.normalize(query)
+        for rule in self.matching_rules(self.scan(query_lower)):
+            yield Route(rule.intent, rule.slots(query, query_lower) if rule.slots else {})
+
+    def route(self, query: str) -> Optional[Route]:
+        """The highest-priority matching route, or None"""
+        return next(self.routes(query), None)
+
+
+# --- Slot extractors ---
+
+def _media_target(query, query_lower):
+    return {'target': 'youtube' if 'youtube' in query_lower else 'music'}
+
+
+def _spotify_song(query, query_lower):
+    return {'song_name': query_lower.replace('play', '').replace('on spotify', '').strip()}
+
+
+def _search_term(query, query_lower):
+    term = query_lower
+    for word in ['search', 'for', 'google', 'find', 'on', 'the', 'web']:
+        term = term.replace(word, '')
+    return {'search_term': term.strip()}
+
+
+def _math_expression(query, query_lower):
+    match = re.search(r'(\d+\s*[\+\-\*\/]\s*\d+)', query)
+    return {'expression': match.group(1) if match else None}
+
+
+def _city(query, query_lower):
+    return {'city': query_lower.replace("set my location to", "").strip()}
+
+
+def _forecast_days(query, query_lower):
+    match = re.search(r"(\d+)\s*day", query_lower)
+    if match:
+        return {'forecast_days': int(match.group(1))}
+    return {'forecast_days': 7 if "week" in query_lower else 1}
+
+
+# --- Direct command table (order is priority, as in the former if/elif chain) ---
+
+YOUTUBE_INQUIRY_KEYWORDS = [
+    'videos about', 'most-watched youtube', 'beginner tutorials', 'trending youtube shorts',
+    'recommend youtubers', 'title ideas', 'video script', 'thumbnail ideas', 'shorts concept',
+    'video description', 'ask my audience', 'call to action', 'community post', 'ideas for polls',
+    'analyze performance', 'best time to post', 'content calendar', 'seo strategies',
+    'optimize my videos', 'monetization requirements', 'passive income', 'brand sponsorships'
+]
+
+SPOTIFY_INQUIRY_KEYWORDS = [
+    'music similar to', 'trending songs', 'top 10 songs', 'top songs on spotify', 'chill music',
+    'indie rock albums', 'recommend a playlist', 'create a playlist', 'add this song',
+    'shuffle my playlist', 'remove song', 'sort my playlist', 'most played song',
+    'discover weekly', 'songs i\'ve liked', 'build a playlist', 'top genre', 'play something',
+    'feeling sad', 'i need a boost', 'motivational tracks', 'true crime podcast', 'latest episode',
+    'trending podcasts', 'podcast under', 'listening stats', 'my top 5 songs', 'most listened-to artists'
+]
+
+DIRECT_COMMAND_RULES = [
+    Rule('youtube_inquiry', [Clause(fuzzy=YOUTUBE_INQUIRY_KEYWORDS)]),
+    Rule('spotify_inquiry', [Clause(all=['spotify'], fuzzy=SPOTIFY_INQUIRY_KEYWORDS)]),
+    Rule('time', [Clause(any=['what time is it', 'current time', 'time now']),
+                  Clause(fuzzy=['time', 'what time'])]),
+    Rule('date', [Clause(fuzzy=['date', 'what date', 'today'])]),
+    Rule('youtube_play', [Clause(all=['youtube'])]),
+    Rule('spotify_play', [Clause(all=['play', 'spotify'])], _spotify_song),
+    Rule('pause', [Clause(fuzzy=['pause', 'pause the song', 'pause music', 'pause youtube'], cutoff=0.7)], _media_target),
+    Rule('resume', [Clause(fuzzy=['resume', 'continue', 'resume music', 'resume the music', 'resume youtube'], cutoff=0.7)], _media_target),
+    Rule('web_search', [Clause(all=['google']),
+                        Clause(fuzzy=['search', 'find'], none=['youtube'])], _search_term),
+    Rule('calculate', [Clause(fuzzy=['calculate', 'math', 'what is'],
+                              any=['+', '-', '*', '/', 'plus', 'minus', 'times', 'divided'])], _math_expression),
+    Rule('screenshot', [Clause(fuzzy=['screenshot', 'capture', 'screen'])]),
+    Rule('system_info', [Clause(fuzzy=['system', 'computer', 'info', 'specs', 'cpu', 'memory', 'ram']),
+                         Clause(all=['cpu usage']),
+                         Clause(all=['cpu'], any=['usage', 'use', 'percent'])]),
+    Rule('set_location', [Clause(fuzzy=['set my location to'])], _city),
+    Rule('weather', [Clause(fuzzy=['weather', 'forecast'])], _forecast_days),
+    Rule('joke', [Clause(fuzzy=['joke', 'funny', 'humor'])]),
+    Rule('help', [Clause(fuzzy=['help', 'what can you do', 'capabilities'])]),
+    Rule('open_app', [Clause(all=['open'])]),
+    Rule('whatsapp_message', [Clause(all=['whatsapp'], any=['message', 'draft', 'send'])]),
+]
+
+# Global instance
+intent_router = IntentRouter(DIRECT_COMMAND_RULES)
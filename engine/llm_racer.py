@@ -0,0 +1,337 @@
+"""
+LLM Racer - Hedged requests across the AI providers
+
+Cuts the wait for a slow provider in the Ollama → Gemini → OpenRouter chain by:
+- Starting the primary provider and, once it has taken longer than LLM_HEDGE_DELAY (or than it
+  usually takes, from its recent latencies), starting the next provider alongside it
+- Moving on to the next provider straight away when one fails or returns a malformed answer
+- Taking the first well-formed answer and cancelling the providers still generating
+- Limiting speculative (hedged) starts per provider per hour with LLM_HEDGE_QUOTAS, so paid
+  APIs are not billed twice for every request; a provider over quota is still used as a fallback
+- Racing streamed answers the same way, where the first provider to produce text wins and the
+  rest of its stream is passed through
+"""
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from engine.tracing import tracer
+
+try:
+    from config import LLM_HEDGE_DELAY, LLM_HEDGE_QUOTAS, LLM_RACE_TIMEOUT
+except ImportError:
+    LLM_HEDGE_DELAY = 2.0
+    LLM_HEDGE_QUOTAS = {'gemini': 120, 'openrouter': 0, 'openai': 0}
+    LLM_RACE_TIMEOUT = 30
+
+QUOTA_WINDOW = 3600  # seconds LLM_HEDGE_QUOTAS counts over
+MIN_LATENCY_SAMPLES = 10  # successful calls needed before a provider's own latency sets the hedge point
+
+# A contender gets a cancel event to watch and returns the answer text (raises on failure)
+Contender = Tuple[str, Callable[[threading.Event], Optional[str]]]
+# A stream contender gets a cancel event and returns an iterator of text chunks (raises on failure)
+StreamContender = Tuple[str, Callable[[threading.Event], Iterator[str]]]
+_DONE = object()
+
+
+def well_formed(text: Optional[str]) -> bool:
+    """A non-empty answer; one that looks like a JSON intent has to parse"""
+    text = (text or '').strip()
+    if not text:
+        return False
+    if text.startswith('{'):
+        try:
+            json.loads(text)
+        except ValueError:
+            return False
+    return True
+
+
+class LLMRacer:
+    def __init__(self, hedge_delay: float = LLM_HEDGE_DELAY, quotas: Optional[Dict[str, int]] = None,
+                 timeout: float = LLM_RACE_TIMEOUT):
+        """
+        Args:
+            hedge_delay: Longest wait on a running provider before the next one is started too
+            quotas: Hedged starts allowed per provider per hour (missing = unlimited, 0 = fallback only)
+            timeout: Overall time limit for one race
+        """
+        self.hedge_delay = hedge_delay
+        self.quotas = dict(LLM_HEDGE_QUOTAS if quotas is None else quotas)
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="spitch-llm-race")
+        self._lock = threading.Lock()
+        self._hedge_starts: Dict[str, deque] = {}
+        self._latencies: Dict[str, deque] = {}
+        self.stats = {'races': 0, 'hedged': 0, 'quota_blocked': 0, 'cancelled': 0, 'timeouts': 0, 'wins': {}, 'failures': {}}
+
+    def race(self, contenders: List[Contender]) -> Optional[Tuple[str, str]]:
+        """
+        Race the providers in priority order.
+
+        Args:
+            contenders: (name, fn) pairs, most preferred first
+
+        Returns:
+            (name, answer) of the first well-formed answer, or None if every provider failed
+        """
+        with self._lock:
+            self.stats['races'] += 1
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        queue = list(contenders)
+        running: Dict[Any, Tuple[str, threading.Event]] = {}
+        last_started = None
+        hedge_blocked = False
+
+        def launch(speculative: bool):
+            nonlocal last_started, hedge_blocked
+            name, fn = queue.pop(0)
+            cancel = threading.Event()
+            future = self._executor.submit(tracer.wrap(self._run), name, fn, cancel)
+            running[future] = (name, cancel)
+            last_started = name, time.perf_counter()
+            hedge_blocked = False
+            if speculative:
+                with self._lock:
+                    self.stats['hedged'] += 1
+                print(f"[LLMRace] {name} started alongside the slower provider")
+
+        try:
+            while queue or running:
+                now = time.perf_counter()
+                if now >= deadline:
+                    with self._lock:
+                        self.stats['timeouts'] += 1
+                    print("[LLMRace] No provider answered in time")
+                    return None
+                if not running:
+                    # Nothing in flight (start, or everything failed): the next provider is a plain fallback
+                    launch(speculative=False)
+                    continue
+
+                wait_for = deadline - now
+                if queue and not hedge_blocked:
+                    wait_for = min(wait_for, max(0.0, last_started[1] + self._hedge_after(last_started[0]) - now))
+                done, _ = wait(list(running), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    name, _cancel = running.pop(future)
+                    answer = future.result()
+                    if answer is not None:
+                        self._record_win(name)
+                        return name, answer
+
+                if queue and running and not hedge_blocked and \
+                        time.perf_counter() - last_started[1] >= self._hedge_after(last_started[0]):
+                    if self._take_quota(queue[0][0]):
+                        launch(speculative=True)
+                    else:
+                        hedge_blocked = True
+            return None
+        finally:
+            # Losers stop generating; a call that can't be interrupted finishes in the background and is ignored
+            for name, cancel in running.values():
+                cancel.set()
+                with self._lock:
+                    self.stats['cancelled'] += 1
+
+    def race_streams(self, contenders: List[StreamContender],
+                     cancel_event: Optional[threading.Event] = None) -> Optional[Tuple[str, Iterator[str]]]:
+        """
+        Race streaming providers in priority order; the first to produce non-blank text wins.
+
+        The next provider is started alongside once the running one has gone longer than its usual
+        time to first token (or LLM_HEDGE_DELAY) without text, subject to the same hedge quotas.
+
+        Args:
+            contenders: (name, open_stream) pairs, most preferred first
+            cancel_event: When set, every provider is cancelled
+
+        Returns:
+            (name, chunks) where chunks yields the winner's whole answer (raising if its stream fails
+            later), or None if every provider failed or cancel_event was set first
+        """
+        with self._lock:
+            self.stats['races'] += 1
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        events: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        pending = list(contenders)
+        running: Dict[str, threading.Event] = {}
+        buffered: Dict[str, List[str]] = {}
+        started: Dict[str, float] = {}
+        last_started = None
+        hedge_blocked = False
+        winner = None
+
+        def launch(speculative: bool):
+            nonlocal last_started, hedge_blocked
+            name, open_stream = pending.pop(0)
+            cancel = threading.Event()
+            running[name] = cancel
+            buffered[name] = []
+            self._executor.submit(tracer.wrap(self._pump), name, open_stream, cancel, events)
+            last_started = name, time.perf_counter()
+            started[name] = last_started[1]
+            hedge_blocked = False
+            if speculative:
+                with self._lock:
+                    self.stats['hedged'] += 1
+                print(f"[LLMRace] {name} started streaming alongside the slower provider")
+
+        try:
+            while pending or running:
+                now = time.perf_counter()
+                if cancel_event is not None and cancel_event.is_set():
+                    return None
+                if now >= deadline:
+                    with self._lock:
+                        self.stats['timeouts'] += 1
+                    print("[LLMRace] No provider started streaming in time")
+                    return None
+                if not running:
+                    launch(speculative=False)
+                    continue
+
+                wait_for = min(deadline - now, 0.1)
+                if pending and not hedge_blocked:
+                    hedge_at = last_started[1] + self._hedge_after(f"{last_started[0]}:stream")
+                    wait_for = min(wait_for, max(0.0, hedge_at - now))
+                try:
+                    name, item = events.get(timeout=wait_for)
+                except queue.Empty:
+                    name = None
+                if name in running:
+                    if isinstance(item, str):
+                        buffered[name].append(item)
+                        if ''.join(buffered[name]).strip():
+                            winner = name
+                            with self._lock:
+                                self._latencies.setdefault(f"{name}:stream", deque(maxlen=100)).append(
+                                    time.perf_counter() - started[name])
+                            self._record_win(name)
+                            return name, self._follow(name, running.pop(name), buffered[name], events, cancel_event)
+                    else:
+                        # Ended or failed before producing any text
+                        del running[name]
+                        with self._lock:
+                            self.stats['failures'][name] = self.stats['failures'].get(name, 0) + 1
+                        if isinstance(item, Exception):
+                            print(f"[LLMRace] {name} failed: {item}")
+
+                if pending and running and not hedge_blocked and \
+                        time.perf_counter() - last_started[1] >= self._hedge_after(f"{last_started[0]}:stream"):
+                    if self._take_quota(pending[0][0]):
+                        launch(speculative=True)
+                    else:
+                        hedge_blocked = True
+            return None
+        finally:
+            for name, cancel in running.items():
+                if name != winner:
+                    cancel.set()
+                    with self._lock:
+                        self.stats['cancelled'] += 1
+
+    @staticmethod
+    def _pump(name: str, open_stream: Callable[[threading.Event], Iterator[str]], cancel: threading.Event,
+              events: "queue.Queue[Tuple[str, Any]]"):
+        """Read one provider's stream into the shared event queue, ending with _DONE or the exception"""
+        try:
+            for chunk in open_stream(cancel):
+                if cancel.is_set():
+                    break
+                events.put((name, chunk))
+        except Exception as e:
+            events.put((name, e))
+            return
+        events.put((name, _DONE))
+
+    def _follow(self, name: str, cancel: threading.Event, first: List[str], events: "queue.Queue[Tuple[str, Any]]",
+                cancel_event: Optional[threading.Event]) -> Iterator[str]:
+        """The winner's text: what it produced during the race, then the rest as it arrives"""
+        try:
+            yield ''.join(first)
+            while cancel_event is None or not cancel_event.is_set():
+                try:
+                    source, item = events.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if source != name:
+                    continue  # A cancelled loser's last chunks
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Stops the provider when the reader gives up early (or the user cancelled)
+            cancel.set()
+
+    def _run(self, name: str, fn: Callable[[threading.Event], Optional[str]], cancel: threading.Event) -> Optional[str]:
+        call_start = time.perf_counter()
+        with tracer.span('provider', provider=name, raced=True) as span:
+            try:
+                answer = fn(cancel)
+            except Exception as e:
+                print(f"[LLMRace] {name} failed: {e}")
+                span.set(error=str(e))
+                answer = None
+            if cancel.is_set():
+                # Partial text from a cancelled stream never counts
+                span.set(cancelled=True)
+                return None
+            ok = well_formed(answer)
+            span.set(ok=ok)
+        if not ok:
+            with self._lock:
+                self.stats['failures'][name] = self.stats['failures'].get(name, 0) + 1
+            return None
+        with self._lock:
+            self._latencies.setdefault(name, deque(maxlen=100)).append(time.perf_counter() - call_start)
+        return answer.strip()
+
+    def _hedge_after(self, name: str) -> float:
+        """Seconds to give a running provider: the hedge delay, or sooner once it is slower than its usual p95"""
+        with self._lock:
+            latencies = sorted(self._latencies.get(name, ()))
+        if len(latencies) < MIN_LATENCY_SAMPLES:
+            return self.hedge_delay
+        return min(self.hedge_delay, latencies[int(len(latencies) * 0.95) - 1])
+
+    def _take_quota(self, name: str) -> bool:
+        """Count a hedged start against the provider's hourly quota; False if it is used up"""
+        quota = self.quotas.get(name)
+        if quota is None:
+            return True
+        now = time.time()
+        with self._lock:
+            starts = self._hedge_starts.setdefault(name, deque())
+            while starts and now - starts[0] > QUOTA_WINDOW:
+                starts.popleft()
+            if len(starts) >= quota:
+                self.stats['quota_blocked'] += 1
+                return False
+            starts.append(now)
+            return True
+
+    def _record_win(self, name: str):
+        with self._lock:
+            self.stats['wins'][name] = self.stats['wins'].get(name, 0) + 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Races, hedges, quota use and per-provider wins for monitoring"""
+        with self._lock:
+            stats = {key: dict(value) if isinstance(value, dict) else value for key, value in self.stats.items()}
+            stats['hedge_delay'] = self.hedge_delay
+            stats['quota_used'] = {name: len(starts) for name, starts in self._hedge_starts.items()}
+            stats['quotas'] = dict(self.quotas)
+        return stats
+
+# Global instance
+llm_racer = LLMRacer()
@@ -0,0 +1,167 @@
+"""
+Microphone Calibration - Persistent, adaptive ambient-noise thresholds
+
+Removes the multi-second calibration pause before every utterance by:
+- Measuring each input device's energy threshold once and saving it
+- Applying the saved threshold instantly when listening starts
+- Adapting the threshold from background noise between utterances
+"""
+import atexit
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+try:
+    from config import MIC_DEVICE_INDEX, MIC_CALIBRATION_SECONDS
+except ImportError:
+    MIC_DEVICE_INDEX = None
+    MIC_CALIBRATION_SECONDS = 2
+
+# Same adaptation constants speech_recognition uses for its dynamic threshold
+DYNAMIC_DAMPING = 0.15
+DYNAMIC_RATIO = 1.5
+MIN_THRESHOLD = 50.0
+SAVE_INTERVAL = 30.0  # seconds between writes of adapted thresholds
+
+
+class MicCalibration:
+    def __init__(self, calibration_file: str = "memory/mic_calibration.json"):
+        """Initialize calibration store and load saved thresholds"""
+        self.calibration_file = calibration_file
+        self.calibrations: Dict[str, Dict[str, Any]] = {}
+        self._device_names: Dict[Optional[int], str] = {}
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        self._dirty = False
+        self.load_calibrations()
+        # Adaptations from the last SAVE_INTERVAL before exit would otherwise be lost
+        atexit.register(self.flush)
+
+    def load_calibrations(self):
+        """Load saved per-device thresholds from file"""
+        if os.path.exists(self.calibration_file):
+            try:
+                with open(self.calibration_file, 'r', encoding='utf-8') as f:
+                    self.calibrations = json.load(f)
+                print(f"[MicCalibration] Loaded thresholds for {len(self.calibrations)} device(s)")
+            except Exception as e:
+                print(f"[MicCalibration] Error loading calibration: {e}")
+                self.calibrations = {}
+
+    def save_calibrations(self):
+        """Save per-device thresholds to file"""
+        with self._lock:
+            try:
+                # Serialized under the lock: the capture thread keeps adapting thresholds meanwhile
+                data = json.dumps(self.calibrations, indent=2)
+                os.makedirs(os.path.dirname(self.calibration_file), exist_ok=True)
+                with open(self.calibration_file, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                self._last_save = time.time()
+                self._dirty = False
+            except Exception as e:
+                print(f"[MicCalibration] Error saving calibration: {e}")
+
+    def flush(self):
+        """Save adapted thresholds not written yet (on exit or when capture stops)"""
+        if self._dirty:
+            self.save_calibrations()
+
+    def device_key(self, device_index: Optional[int] = MIC_DEVICE_INDEX) -> str:
+        """Stable key for an input device (its name, so thresholds survive index changes)"""
+        if device_index not in self._device_names:
+            name = "default"
+            if device_index is not None:
+                try:
+                    import speech_recognition as sr
+                    name = sr.Microphone.list_microphone_names()[device_index]
+                except Exception:
+                    name = f"device_{device_index}"
+            self._device_names[device_index] = name
+        return self._device_names[device_index]
+
+    def get_threshold(self, device_index: Optional[int] = MIC_DEVICE_INDEX) -> Optional[float]:
+        """Get the saved energy threshold for a device, if calibrated"""
+        entry = self.calibrations.get(self.device_key(device_index))
+        return entry['energy_threshold'] if entry else None
+
+    def apply(self, recognizer, source, device_index: Optional[int] = MIC_DEVICE_INDEX) -> float:
+        """
+        Prepare a recognizer for listening.
+
+        Uses the saved threshold when one exists (no delay); otherwise measures the
+        ambient noise once and saves it for every later utterance.
+        """
+        threshold = self.get_threshold(device_index)
+        if threshold is None:
+            return self.calibrate(recognizer, source, device_index)
+
+        recognizer.energy_threshold = threshold
+        # Let speech_recognition keep tracking background noise while it waits for speech
+        recognizer.dynamic_energy_threshold = True
+        return threshold
+
+    def calibrate(self, recognizer, source, device_index: Optional[int] = MIC_DEVICE_INDEX,
+                  duration: float = MIC_CALIBRATION_SECONDS) -> float:
+        """Measure ambient noise now and store the result for the device"""
+        print(f"[MicCalibration] Calibrating microphone for {duration}s...")
+        recognizer.adjust_for_ambient_noise(source, duration=duration)
+        recognizer.dynamic_energy_threshold = True
+        self._store(device_index, recognizer.energy_threshold, measured=True)
+        self.save_calibrations()
+        print(f"[MicCalibration] Energy threshold set to {recognizer.energy_threshold:.0f}")
+        return recognizer.energy_threshold
+
+    def update_from_recognizer(self, recognizer, device_index: Optional[int] = MIC_DEVICE_INDEX):
+        """Keep the threshold speech_recognition adapted while waiting for the last utterance"""
+        self._store(device_index, recognizer.energy_threshold)
+        self._save_if_due()
+
+    def adapt_from_energy(self, energy: float, seconds: float,
+                          device_index: Optional[int] = MIC_DEVICE_INDEX) -> float:
+        """
+        Adapt the threshold from a frame of background (non-speech) audio.
+
+        Args:
+            energy: RMS energy of the frame
+            seconds: Duration of the frame
+
+        Returns:
+            The updated threshold
+        """
+        current = self.get_threshold(device_index)
+        if current is None:
+            current = energy * DYNAMIC_RATIO
+        damping = DYNAMIC_DAMPING ** seconds
+        threshold = current * damping + energy * DYNAMIC_RATIO * (1 - damping)
+        self._store(device_index, threshold)
+        self._save_if_due()
+        return threshold
+
+    def reset(self, device_index: Optional[int] = MIC_DEVICE_INDEX):
+        """Forget a device's threshold so the next listen recalibrates"""
+        key = self.device_key(device_index)
+        with self._lock:
+            self.calibrations.pop(key, None)
+        self.save_calibrations()
+
+    def _store(self, device_index: Optional[int], threshold: float, measured: bool = False):
+        key = self.device_key(device_index)
+        with self._lock:
+            entry = self.calibrations.setdefault(key, {'energy_threshold': threshold, 'adaptations': 0})
+            entry['energy_threshold'] = max(MIN_THRESHOLD, float(threshold))
+            entry['updated'] = time.time()
+            if measured:
+                entry['measured'] = time.time()
+            else:
+                entry['adaptations'] = entry.get('adaptations', 0) + 1
+            self._dirty = True
+
+    def _save_if_due(self):
+        if self._dirty and time.time() - self._last_save > SAVE_INTERVAL:
+            self.save_calibrations()
+
+# Global instance
+mic_calibration = MicCalibration()
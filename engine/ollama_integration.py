@@ -1,8 +1,17 @@
 import requests
 import json
+import threading
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional, Tuple
 from config import OLLAMA_DEFAULT_MODEL, OLLAMA_BASE_URL, OLLAMA_TIMEOUT
+from engine.http_client import http_client
+from engine.ollama_models import ollama_models
+from engine.provider_health import provider_health
+
+try:
+    from config import OLLAMA_CHAT_MAX_MESSAGES
+except ImportError:
+    OLLAMA_CHAT_MAX_MESSAGES = 20
 
 class OllamaIntegration:
     def __init__(self, base_url: str = None, model: str = None):
@@ -17,12 +26,12 @@ class OllamaIntegration:
         self.default_model = model if model else OLLAMA_DEFAULT_MODEL
         self.available_models = []
         self.base_model_names = []
-        self._check_ollama_service()
+        self.service_running = self._check_ollama_service()
     
     def _check_ollama_service(self) -> bool:
         """Check if Ollama service is running"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = http_client.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 self.available_models = [model['name'] for model in data.get('models', [])]
@@ -39,6 +48,14 @@ class OllamaIntegration:
             print("   Make sure Ollama is running with: ollama serve")
             return False
     
+    def warm_up(self, model: str = None) -> bool:
+        """Load a model (default: the configured one) before the first query needs it"""
+        actual_model_name = self._resolve_model(model or self.default_model)
+        if not actual_model_name:
+            print(f"[WARNING] Cannot warm up '{model or self.default_model}': not installed")
+            return False
+        return ollama_models.warm_up(actual_model_name)
+
     def is_service_running(self) -> bool:
         """Check if Ollama service is currently running"""
         return self._check_ollama_service()
@@ -46,7 +63,7 @@ class OllamaIntegration:
     def get_available_models(self) -> list:
         """Get list of available models"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = http_client.get(f"{self.base_url}/api/tags", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 return [model['name'] for model in data.get('models', [])]
@@ -102,6 +119,7 @@ class OllamaIntegration:
             "model": actual_model_name,
             "prompt": prompt,
             "stream": False,
+            "keep_alive": ollama_models.keep_alive_for(actual_model_name),
             "options": {
                 "temperature": 0.7,
                 "top_p": 0.9,
@@ -117,7 +135,7 @@ class OllamaIntegration:
         
         try:
             print(f"[PROCESSING] Sending request to Ollama model: {actual_model_name}")
-            response = requests.post(
+            response = http_client.post(
                 f"{self.base_url}/api/generate",
                 json=payload,
                 timeout=timeout
@@ -126,8 +144,11 @@ class OllamaIntegration:
             if response.status_code == 200:
                 data = response.json()
                 response_text = data.get("response", "")
+                ollama_models.record(actual_model_name, data)
                 if response_text.strip():
-                    print(f"[OK] Ollama response received in {data.get('total_duration', 0):.2f}s")
+                    # Durations are reported in nanoseconds
+                    print(f"[OK] Ollama response received in {data.get('total_duration', 0) / 1e9:.2f}s "
+                          f"(load {data.get('load_duration', 0) / 1e9:.2f}s)")
                     return {
                         "success": True,
                         "response": response_text,
@@ -148,6 +169,7 @@ class OllamaIntegration:
                 return {
                     "success": False,
                     "error": f"Ollama API error: {response.status_code}",
+                    "status_code": response.status_code,
                     "response": None
                 }
                 
@@ -164,35 +186,201 @@ class OllamaIntegration:
                 "response": None
             }
     
-    def chat_with_context(self, messages: list, model: str = None) -> Dict[str, Any]:
+    def generate_stream(self, prompt: str, model: str = None, system_prompt: str = None, timeout: int = None,
+                        cancel_event: Optional[threading.Event] = None) -> Iterator[str]:
+        """
+        Generate a response using Ollama, yielding text chunks as they are produced
+
+        Args:
+            prompt: User's input prompt
+            model: Model to use (defaults to self.default_model)
+            system_prompt: Optional system prompt to set context
+            timeout: Seconds to wait for the connection and between chunks (default: OLLAMA_TIMEOUT)
+            cancel_event: When set, stop reading and close the connection, which makes Ollama stop generating
+
+        Yields:
+            Response text fragments in order
+
+        Raises:
+            ValueError: If the model is not available
+            requests.exceptions.RequestException: On connection or HTTP errors
+        """
+        if timeout is None:
+            timeout = OLLAMA_TIMEOUT
+
+        actual_model_name = self._resolve_model(model or self.default_model)
+        if not actual_model_name:
+            raise ValueError(f"Model '{model or self.default_model}' not found. Available models: {self.available_models}")
+
+        payload = {
+            "model": actual_model_name,
+            "prompt": prompt,
+            "stream": True,
+            "keep_alive": ollama_models.keep_alive_for(actual_model_name),
+            "options": {
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "top_k": 40,
+                "num_predict": 200,  # Limit response length for faster responses
+                "repeat_penalty": 1.1
+            }
+        }
+        if system_prompt:
+            payload["system"] = system_prompt
+
+        print(f"[PROCESSING] Streaming request to Ollama model: {actual_model_name}")
+        with http_client.post(f"{self.base_url}/api/generate", json=payload, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if cancel_event is not None and cancel_event.is_set():
+                    print("[AI] Ollama generation cancelled")
+                    break
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise requests.exceptions.RequestException(data["error"])
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    ollama_models.record(actual_model_name, data)
+                    break
+
+    def _resolve_model(self, model: str) -> Optional[str]:
+        """Full installed model name for an exact or base name (e.g. 'phi3' -> 'phi3:latest')"""
+        if model in self.available_models:
+            return model
+        if model in self.base_model_names:
+            for full_name in self.available_models:
+                if full_name.startswith(model + ':'):
+                    return full_name
+        return None
+
+    def chat_with_context(self, messages: list, model: str = None, timeout: int = None) -> Dict[str, Any]:
         """
         Chat with context (multiple messages)
         
+        Messages go to /api/chat as they are, so the system prompt and earlier turns form the same
+        token prefix on every call and Ollama reuses its KV cache for them instead of re-evaluating
+        the whole conversation.
+        
         Args:
             messages: List of message dictionaries with 'role' and 'content'
             model: Model to use
+            timeout: Request timeout in seconds (default: OLLAMA_TIMEOUT from config)
             
         Returns:
             Dictionary with response data
         """
-        if not model:
-            model = self.default_model
-        
-        # Convert messages to Ollama format
-        prompt = ""
-        for message in messages:
-            role = message.get('role', 'user')
-            content = message.get('content', '')
-            if role == 'system':
-                prompt = f"System: {content}\n\n{prompt}"
-            elif role == 'user':
-                prompt += f"User: {content}\n"
-            elif role == 'assistant':
-                prompt += f"Assistant: {content}\n"
-        
-        prompt += "Assistant: "
-        
-        return self.generate_response(prompt, model)
+        if timeout is None:
+            timeout = OLLAMA_TIMEOUT
+
+        actual_model_name = self._resolve_model(model or self.default_model)
+        if not actual_model_name:
+            return {
+                "success": False,
+                "error": f"Model '{model or self.default_model}' not found. Available models: {self.available_models}",
+                "response": None
+            }
+
+        try:
+            print(f"[PROCESSING] Sending chat ({len(messages)} messages) to Ollama model: {actual_model_name}")
+            response = http_client.post(
+                f"{self.base_url}/api/chat",
+                json=self._chat_payload(actual_model_name, messages, stream=False),
+                timeout=timeout
+            )
+            if response.status_code != 200:
+                return {
+                    "success": False,
+                    "error": f"Ollama API error: {response.status_code}",
+                    "status_code": response.status_code,
+                    "response": None
+                }
+            data = response.json()
+            ollama_models.record(actual_model_name, data)
+            response_text = (data.get("message") or {}).get("content", "")
+            if not response_text.strip():
+                return {
+                    "success": False,
+                    "error": "Empty response from model",
+                    "response": None
+                }
+            print(f"[OK] Ollama chat response received in {data.get('total_duration', 0) / 1e9:.2f}s "
+                  f"({data.get('prompt_eval_count', 0)} new prompt tokens)")
+            return {
+                "success": True,
+                "response": response_text,
+                "model": actual_model_name,
+                "total_duration": data.get("total_duration", 0),
+                "load_duration": data.get("load_duration", 0),
+                "prompt_eval_count": data.get("prompt_eval_count", 0),
+                "prompt_eval_duration": data.get("prompt_eval_duration", 0),
+                "eval_duration": data.get("eval_duration", 0)
+            }
+        except requests.exceptions.Timeout:
+            return {
+                "success": False,
+                "error": f"Request timed out after {timeout} seconds. The model might be too large or the system is slow.",
+                "response": None
+            }
+        except requests.exceptions.RequestException as e:
+            return {
+                "success": False,
+                "error": f"Request failed: {str(e)}",
+                "response": None
+            }
+
+    def chat_stream(self, messages: list, model: str = None, timeout: int = None,
+                    cancel_event: Optional[threading.Event] = None) -> Iterator[str]:
+        """
+        Like chat_with_context(), yielding text chunks as they are produced (see generate_stream())
+
+        Raises:
+            ValueError: If the model is not available
+            requests.exceptions.RequestException: On connection or HTTP errors
+        """
+        if timeout is None:
+            timeout = OLLAMA_TIMEOUT
+
+        actual_model_name = self._resolve_model(model or self.default_model)
+        if not actual_model_name:
+            raise ValueError(f"Model '{model or self.default_model}' not found. Available models: {self.available_models}")
+
+        print(f"[PROCESSING] Streaming chat ({len(messages)} messages) to Ollama model: {actual_model_name}")
+        with http_client.post(f"{self.base_url}/api/chat", json=self._chat_payload(actual_model_name, messages, stream=True),
+                              timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if cancel_event is not None and cancel_event.is_set():
+                    print("[AI] Ollama generation cancelled")
+                    break
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise requests.exceptions.RequestException(data["error"])
+                content = (data.get("message") or {}).get("content")
+                if content:
+                    yield content
+                if data.get("done"):
+                    ollama_models.record(actual_model_name, data)
+                    break
+
+    def _chat_payload(self, model: str, messages: list, stream: bool) -> Dict[str, Any]:
+        return {
+            "model": model,
+            "messages": messages,
+            "stream": stream,
+            "keep_alive": ollama_models.keep_alive_for(model),
+            "options": {
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "top_k": 40,
+                "num_predict": 200,  # Limit response length for faster responses
+                "repeat_penalty": 1.1
+            }
+        }
     
     def get_model_info(self, model: str = None) -> Dict[str, Any]:
         """Get information about a specific model"""
@@ -200,7 +388,7 @@ class OllamaIntegration:
             model = self.default_model
         
         try:
-            response = requests.post(
+            response = http_client.post(
                 f"{self.base_url}/api/show",
                 json={"name": model},
                 timeout=10
@@ -222,6 +410,50 @@ class OllamaIntegration:
                 "error": f"Error getting model info: {str(e)}"
             }
 
+class ChatSession:
+    """
+    One conversation with Ollama: the system prompt plus the turns so far, sent to /api/chat
+
+    Each request repeats the previous one's messages unchanged and appends to them, so Ollama
+    only evaluates the new user message against the cached prefix. Old turns are dropped in a
+    block (down to half of max_messages) rather than one per turn, because every trim changes
+    the prefix and costs one full re-evaluation.
+    """
+
+    def __init__(self, system_prompt: str, max_messages: int = OLLAMA_CHAT_MAX_MESSAGES):
+        self.system_prompt = system_prompt
+        self.max_messages = max(2, max_messages)
+        self.history = []
+        self.turns = 0
+        self.trims = 0
+        self._lock = threading.Lock()
+
+    def messages_for(self, user_input: str) -> list:
+        """Messages for the next request: system prompt, earlier turns, then user_input"""
+        with self._lock:
+            return [{"role": "system", "content": self.system_prompt}, *self.history,
+                    {"role": "user", "content": user_input}]
+
+    def add_turn(self, user_input: str, response: str):
+        """Record a finished exchange (the model's raw text, so the next prefix matches its cache)"""
+        if not response:
+            return
+        with self._lock:
+            self.history += [{"role": "user", "content": user_input}, {"role": "assistant", "content": response}]
+            self.turns += 1
+            if len(self.history) > self.max_messages:
+                keep = self.max_messages // 2
+                self.history = self.history[-(keep - keep % 2):] if keep >= 2 else []
+                self.trims += 1
+
+    def reset(self):
+        with self._lock:
+            self.history = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'messages': len(self.history), 'turns': self.turns, 'trims': self.trims, 'max_messages': self.max_messages}
+
 # Spitch-specific Ollama integration
 class SpitchOllama:
     def __init__(self):
@@ -248,6 +480,10 @@ class SpitchOllama:
     @property
     def default_model(self):
         return self.ollama.default_model
+
+    def new_session(self) -> ChatSession:
+        """A conversation that sends the Spitch system prompt once and keeps it cached across turns"""
+        return ChatSession(self.system_prompt)
     
     def process_query(self, user_input: str, model: str = None, timeout: int = None, system_prompt_override: Optional[str] = None) -> str:
         """
@@ -262,6 +498,20 @@ class SpitchOllama:
         Returns:
             The AI's response as a string, or an error message.
         """
+        return self.query(user_input, model=model, timeout=timeout, system_prompt_override=system_prompt_override)[1]
+
+    def query(self, user_input: str, model: str = None, timeout: int = None, system_prompt_override: Optional[str] = None,
+              session: Optional[ChatSession] = None) -> Tuple[bool, str]:
+        """
+        Like process_query(), but also reports whether the model actually answered
+
+        With a session, the query goes to /api/chat as the next turn of that conversation (its
+        system prompt is used and system_prompt_override is ignored); the caller records the
+        answer with session.add_turn().
+
+        Returns:
+            (True, response) on success, or (False, an error message meant for the user)
+        """
         if timeout is None:
             timeout = OLLAMA_TIMEOUT
         
@@ -271,44 +521,85 @@ class SpitchOllama:
         # Define system prompt for intent extraction
         system_prompt = system_prompt_override if system_prompt_override is not None else self.system_prompt
 
-        if not self.ollama.is_service_running():
-            return "I'm sorry, but I can't connect to my AI brain right now. Please make sure Ollama is running."
+        # Liveness comes from the shared health cache instead of a /api/tags round trip per query
+        if not provider_health.available('ollama'):
+            return False, "I'm sorry, but I can't connect to my AI brain right now. Please make sure Ollama is running."
         
         try:
             print(f"[AI] Processing with Ollama ({model_to_use})...")
-            result = self.ollama.generate_response(
-                prompt=user_input,
-                model=model_to_use,
-                system_prompt=system_prompt,
-                timeout=timeout
-            )
+            if session is not None:
+                result = self.ollama.chat_with_context(session.messages_for(user_input), model=model_to_use, timeout=timeout)
+            else:
+                result = self.ollama.generate_response(
+                    prompt=user_input,
+                    model=model_to_use,
+                    system_prompt=system_prompt,
+                    timeout=timeout
+                )
             
             if result["success"]:
+                provider_health.record_success('ollama')
                 response = result["response"].strip()
                 if response:
-                    return response
+                    return True, response
                 else:
-                    return "I received an empty response. Let me try to help you with that."
+                    return False, "I received an empty response. Let me try to help you with that."
             else:
                 error_msg = result.get('error', 'Unknown error')
+                provider_health.record_failure('ollama', error_msg, rate_limited=result.get('status_code') == 429)
                 if "timed out" in error_msg.lower():
-                    return f"I'm taking too long to respond. The model might be too large for your system. Try a smaller model or check your system resources."
+                    return False, f"I'm taking too long to respond. The model might be too large for your system. Try a smaller model or check your system resources."
                 elif "not found" in error_msg.lower():
-                    return f"I can't find the {model_to_use} model. Please make sure it's installed with: ollama pull {model_to_use}"
+                    return False, f"I can't find the {model_to_use} model. Please make sure it's installed with: ollama pull {model_to_use}"
                 else:
-                    return f"I'm having trouble processing that right now. Error: {error_msg}"
+                    return False, f"I'm having trouble processing that right now. Error: {error_msg}"
                     
         except Exception as e:
             print(f"[ERROR] Ollama processing error: {e}")
-            return "I'm sorry, I encountered an unexpected error while processing your request. Please try again."
+            provider_health.record_failure('ollama', e)
+            return False, "I'm sorry, I encountered an unexpected error while processing your request. Please try again."
     
+    def stream_query(self, user_input: str, model: str = None, timeout: int = None, system_prompt_override: Optional[str] = None,
+                     cancel_event: Optional[threading.Event] = None, session: Optional[ChatSession] = None) -> Iterator[str]:
+        """
+        Stream a response to a user query as text chunks.
+
+        Unlike process_query(), errors are raised instead of being turned into
+        apology text, so the caller can fall back to another service. A session
+        works as in query().
+        """
+        system_prompt = system_prompt_override if system_prompt_override is not None else self.system_prompt
+        print(f"[AI] Streaming with Ollama ({model or self.default_model})...")
+        try:
+            if session is not None:
+                yield from self.ollama.chat_stream(
+                    session.messages_for(user_input),
+                    model=model or self.default_model,
+                    timeout=timeout,
+                    cancel_event=cancel_event
+                )
+            else:
+                yield from self.ollama.generate_stream(
+                    prompt=user_input,
+                    model=model or self.default_model,
+                    system_prompt=system_prompt,
+                    timeout=timeout,
+                    cancel_event=cancel_event
+                )
+        except Exception as e:
+            status = getattr(getattr(e, 'response', None), 'status_code', None)
+            provider_health.record_failure('ollama', e, rate_limited=status == 429)
+            raise
+        provider_health.record_success('ollama')
+
     def get_available_models(self) -> list:
         """Get list of available Ollama models"""
         return self.ollama.get_available_models()
     
     def test_connection(self) -> bool:
-        """Test if Ollama is working"""
-        return self.ollama.is_service_running()
+        """Test if Ollama is working (cached liveness and circuit breaker, no request on the hot path)"""
+        return provider_health.available('ollama')
 
 # Create a global instance for easy access
-spitch_ollama = SpitchOllama() 
\ No newline at end of file
+spitch_ollama = SpitchOllama()
+provider_health.register('ollama', spitch_ollama.ollama.is_service_running, alive=spitch_ollama.ollama.service_running)
@@ -0,0 +1,189 @@
+"""
+Ollama Models - Warm-up, keep_alive management and load-latency metrics
+
+Keeps the first query after idle from paying for a model load by:
+- Loading the default model at startup with an empty (zero-token) generate
+- Choosing keep_alive per request from how often the model has been used recently, so busy
+  models stay resident and rarely used ones are released sooner
+- Unloading large resident models when system RAM use passes OLLAMA_RAM_PRESSURE_PERCENT
+- Recording Ollama's load, prompt-eval and eval durations per model, to show how much of the
+  latency is model loading rather than generation
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from engine.http_client import http_client
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    from config import (OLLAMA_BASE_URL, OLLAMA_WARMUP, OLLAMA_KEEP_ALIVE, OLLAMA_KEEP_ALIVE_BUSY,
+                        OLLAMA_BUSY_USES_PER_HOUR, OLLAMA_RAM_PRESSURE_PERCENT, OLLAMA_LARGE_MODEL_GB)
+except ImportError:
+    OLLAMA_BASE_URL = 'http://localhost:11434'
+    OLLAMA_WARMUP = True
+    OLLAMA_KEEP_ALIVE = '5m'
+    OLLAMA_KEEP_ALIVE_BUSY = '30m'
+    OLLAMA_BUSY_USES_PER_HOUR = 6
+    OLLAMA_RAM_PRESSURE_PERCENT = 90
+    OLLAMA_LARGE_MODEL_GB = 2.0
+
+NS = 1e9  # Ollama reports durations in nanoseconds
+PRESSURE_CHECK_INTERVAL = 30  # seconds between RAM checks
+DURATIONS = ('load_duration', 'prompt_eval_duration', 'eval_duration', 'total_duration')
+
+
+class OllamaModelManager:
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, keep_alive: str = OLLAMA_KEEP_ALIVE,
+                 keep_alive_busy: str = OLLAMA_KEEP_ALIVE_BUSY, busy_uses: int = OLLAMA_BUSY_USES_PER_HOUR,
+                 ram_pressure_percent: float = OLLAMA_RAM_PRESSURE_PERCENT, large_model_gb: float = OLLAMA_LARGE_MODEL_GB):
+        """
+        Args:
+            base_url: Ollama API base URL
+            keep_alive: How long Ollama keeps a model loaded after an occasional request
+            keep_alive_busy: Same, for a model used at least busy_uses times in the last hour
+            busy_uses: Requests per hour that make a model busy
+            ram_pressure_percent: System RAM use at which large models are unloaded (0 = never)
+            large_model_gb: Resident size from which a model counts as large
+        """
+        self.base_url = base_url
+        self.keep_alive = keep_alive
+        self.keep_alive_busy = keep_alive_busy
+        self.busy_uses = busy_uses
+        self.ram_pressure_percent = ram_pressure_percent
+        self.large_model_bytes = large_model_gb * 1024 ** 3
+        self._uses: Dict[str, deque] = {}
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._last_pressure_check = 0.0
+        self.stats = {'warmups': 0, 'cold_loads': 0, 'pressure_unloads': 0}
+
+    # --- keep_alive ---
+
+    def keep_alive_for(self, model: str) -> Any:
+        """keep_alive for the next request to model (0 unloads it right after when RAM is short)"""
+        now = time.time()
+        with self._lock:
+            uses = self._uses.setdefault(model, deque())
+            uses.append(now)
+            while uses and now - uses[0] > 3600:
+                uses.popleft()
+            busy = len(uses) >= self.busy_uses
+            size = self._metrics.get(model, {}).get('size_bytes', 0)
+        if size >= self.large_model_bytes and self.under_pressure():
+            return 0
+        return self.keep_alive_busy if busy else self.keep_alive
+
+    # --- Warm-up ---
+
+    def warm_up(self, model: str, timeout: float = 120) -> bool:
+        """Load model into memory with a zero-token generate so the first real query skips the load"""
+        try:
+            start = time.perf_counter()
+            response = http_client.post(f"{self.base_url}/api/generate",
+                                        json={'model': model, 'prompt': '', 'stream': False, 'keep_alive': self.keep_alive_for(model)},
+                                        timeout=(5, timeout))
+            response.raise_for_status()
+            data = response.json()
+        except Exception as e:
+            print(f"[Ollama] Warm-up of {model} failed: {e}")
+            return False
+        self.stats['warmups'] += 1
+        self.record(model, data)
+        print(f"[OK] Ollama model {model} loaded in {time.perf_counter() - start:.2f}s")
+        return True
+
+    # --- Memory pressure ---
+
+    def under_pressure(self) -> bool:
+        if psutil is None or not self.ram_pressure_percent:
+            return False
+        return psutil.virtual_memory().percent >= self.ram_pressure_percent
+
+    def loaded_models(self) -> List[Dict[str, Any]]:
+        """Models Ollama currently holds in memory (name, size in bytes, expiry)"""
+        response = http_client.get(f"{self.base_url}/api/ps", timeout=5)
+        response.raise_for_status()
+        return response.json().get('models', [])
+
+    def unload(self, model: str) -> bool:
+        try:
+            response = http_client.post(f"{self.base_url}/api/generate", json={'model': model, 'keep_alive': 0}, timeout=10)
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            print(f"[Ollama] Could not unload {model}: {e}")
+            return False
+
+    def relieve_pressure(self, keep: Optional[str] = None) -> List[str]:
+        """Unload large resident models (except keep) while RAM use is above the limit"""
+        unloaded = []
+        try:
+            loaded = sorted(self.loaded_models(), key=lambda m: -m.get('size', 0))
+        except Exception as e:
+            print(f"[Ollama] Could not list loaded models: {e}")
+            return unloaded
+        for info in loaded:
+            name = info.get('name') or info.get('model')
+            with self._lock:
+                self._metrics.setdefault(name, self._empty_metrics())['size_bytes'] = info.get('size', 0)
+            if name == keep or info.get('size', 0) < self.large_model_bytes or not self.under_pressure():
+                continue
+            if self.unload(name):
+                unloaded.append(name)
+                self.stats['pressure_unloads'] += 1
+                print(f"[Ollama] RAM pressure: unloaded {name} ({info.get('size', 0) / 1024 ** 3:.1f} GB)")
+        return unloaded
+
+    def _maybe_check_pressure(self, model: str):
+        now = time.time()
+        if now - self._last_pressure_check < PRESSURE_CHECK_INTERVAL or not self.under_pressure():
+            return
+        self._last_pressure_check = now
+        threading.Thread(target=self.relieve_pressure, args=(model,), name="spitch-ollama-ram", daemon=True).start()
+
+    # --- Metrics ---
+
+    @staticmethod
+    def _empty_metrics() -> Dict[str, Any]:
+        return {'requests': 0, 'cold_loads': 0, 'size_bytes': 0, **{name: deque(maxlen=200) for name in DURATIONS}}
+
+    def record(self, model: str, data: Dict[str, Any]):
+        """Record the durations from a finished /api/generate response (or its final stream chunk)"""
+        if not data.get('total_duration'):
+            return
+        load = data.get('load_duration', 0) / NS
+        with self._lock:
+            metrics = self._metrics.setdefault(model, self._empty_metrics())
+            metrics['requests'] += 1
+            for name in DURATIONS:
+                metrics[name].append(data.get(name, 0) / NS)
+            # A load of more than a fraction of a second means the model was not resident
+            if load > 0.5:
+                metrics['cold_loads'] += 1
+                self.stats['cold_loads'] += 1
+        self._maybe_check_pressure(model)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-model request counts, median durations (seconds) and the share of time spent loading"""
+        with self._lock:
+            models = {}
+            for model, metrics in self._metrics.items():
+                summary = {'requests': metrics['requests'], 'cold_loads': metrics['cold_loads'],
+                           'size_gb': round(metrics['size_bytes'] / 1024 ** 3, 2),
+                           'uses_last_hour': len(self._uses.get(model, ()))}
+                for name in DURATIONS:
+                    values = sorted(metrics[name])
+                    summary[f"median_{name.replace('_duration', '')}_s"] = round(values[len(values) // 2], 3) if values else None
+                total = sum(metrics['total_duration'])
+                summary['load_share'] = round(sum(metrics['load_duration']) / total, 3) if total else 0.0
+                models[model] = summary
+            return {**self.stats, 'under_pressure': self.under_pressure(), 'models': models}
+
+# Global instance
+ollama_models = OllamaModelManager()
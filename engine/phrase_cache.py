@@ -0,0 +1,204 @@
+"""
+Phrase Cache - Pre-rendered audio for fixed assistant phrases
+
+Skips live speech synthesis for constant responses by:
+- Keeping a registry of fixed phrases (greeting, quick responses, task success messages)
+- Rendering each phrase to a WAV file once per voice/rate combination
+- Storing renders on disk behind an index with a least-recently-used size bound
+- Playing cached renders directly through pygame (templated phrases stay on live TTS)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    from config import PHRASE_CACHE_ENABLED, PHRASE_CACHE_DIR, PHRASE_CACHE_MAX_MB
+except ImportError:
+    PHRASE_CACHE_ENABLED = True
+    PHRASE_CACHE_DIR = "memory/phrase_cache"
+    PHRASE_CACHE_MAX_MB = 50
+
+SOUNDS_IN_MEMORY = 32  # decoded renders kept loaded for instant playback
+
+
+class PhraseCache:
+    def __init__(self, cache_dir: str = PHRASE_CACHE_DIR, max_mb: float = PHRASE_CACHE_MAX_MB,
+                 enabled: bool = PHRASE_CACHE_ENABLED):
+        """
+        Initialize the cache and load its index
+
+        Args:
+            cache_dir: Directory holding rendered WAV files and index.json
+            max_mb: Size bound for all renders; least recently used files are evicted past it
+            enabled: False keeps every phrase on live TTS
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.enabled = enabled
+        self.index_file = os.path.join(cache_dir, "index.json")
+        self.index: Dict[str, Dict[str, Any]] = {}
+        self.phrases = set()
+        self._sounds: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pygame = None
+        self.stats = {'hits': 0, 'misses': 0, 'renders': 0, 'evictions': 0}
+        self.load_index()
+
+    # --- Registry ---
+
+    def register(self, phrases: Iterable[str]):
+        """Mark fixed phrases as worth pre-rendering"""
+        self.phrases.update(p for p in phrases if p)
+
+    def is_registered(self, text: str) -> bool:
+        return self.enabled and text in self.phrases
+
+    def missing(self, voice_key: str) -> List[str]:
+        """Registered phrases with no render for this voice yet"""
+        if not self.enabled:
+            return []
+        return [p for p in self.phrases if not self.has(p, voice_key)]
+
+    # --- Index ---
+
+    @staticmethod
+    def _key(text: str, voice_key: str) -> str:
+        return hashlib.sha1(f"{voice_key}\n{text}".encode('utf-8')).hexdigest()
+
+    def load_index(self):
+        """Load the render index, dropping entries whose file is gone"""
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                self.index = {k: v for k, v in index.items()
+                              if os.path.exists(os.path.join(self.cache_dir, v['file']))}
+            except Exception as e:
+                print(f"[PhraseCache] Error loading index: {e}")
+                self.index = {}
+
+    def save_index(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self.index_file, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f, indent=2)
+        except Exception as e:
+            print(f"[PhraseCache] Error saving index: {e}")
+
+    def has(self, text: str, voice_key: str) -> bool:
+        return self._key(text, voice_key) in self.index
+
+    def lookup(self, text: str, voice_key: str) -> Optional[str]:
+        """Path of a render for this phrase and voice, if cached"""
+        if not self.is_registered(text):
+            return None
+        entry = self.index.get(self._key(text, voice_key))
+        if not entry:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        entry['last_used'] = time.time()
+        return os.path.join(self.cache_dir, entry['file'])
+
+    def render_path(self, text: str, voice_key: str) -> str:
+        """Where a new render of this phrase should be written"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return os.path.join(self.cache_dir, f"{self._key(text, voice_key)}.wav")
+
+    def store(self, text: str, voice_key: str, path: str) -> bool:
+        """Record a finished render and enforce the size bound"""
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return False
+        with self._lock:
+            self.index[self._key(text, voice_key)] = {
+                'text': text,
+                'voice': voice_key,
+                'file': os.path.basename(path),
+                'bytes': os.path.getsize(path),
+                'last_used': time.time()
+            }
+            self.stats['renders'] += 1
+            self._evict()
+        self.save_index()
+        return True
+
+    def _evict(self):
+        total = sum(e['bytes'] for e in self.index.values())
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, entry['file']))
+            except OSError:
+                pass
+            self._sounds.pop(os.path.join(self.cache_dir, entry['file']), None)
+            del self.index[key]
+            total -= entry['bytes']
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        """Delete every render (e.g. after changing TTS engines)"""
+        with self._lock:
+            for entry in self.index.values():
+                try:
+                    os.remove(os.path.join(self.cache_dir, entry['file']))
+                except OSError:
+                    pass
+            self.index = {}
+            self._sounds.clear()
+        self.save_index()
+
+    # --- Playback ---
+
+    def _mixer(self):
+        if self._pygame is None:
+            import pygame
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            self._pygame = pygame
+        return self._pygame.mixer
+
+    def play(self, path: str, should_stop: Callable[[], bool]) -> bool:
+        """
+        Play a render and wait for it to finish
+
+        Args:
+            path: File returned by lookup()
+            should_stop: Polled during playback; True cuts the phrase off
+
+        Returns:
+            True if played to the end, False if stopped
+        """
+        mixer = self._mixer()
+        sound = self._sounds.get(path)
+        if sound is None:
+            sound = mixer.Sound(path)
+            self._sounds[path] = sound
+            while len(self._sounds) > SOUNDS_IN_MEMORY:
+                self._sounds.popitem(last=False)
+        else:
+            self._sounds.move_to_end(path)
+
+        channel = sound.play()
+        while channel is not None and channel.get_busy():
+            if should_stop():
+                channel.stop()
+                return False
+            time.sleep(0.02)
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['enabled'] = self.enabled
+        stats['registered_phrases'] = len(self.phrases)
+        stats['cached_renders'] = len(self.index)
+        stats['cache_bytes'] = sum(e['bytes'] for e in self.index.values())
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+# Global instance
+phrase_cache = PhraseCache()
@@ -148,11 +148,17 @@ class ProactiveAssistant:
         
         return suggestions
     
-    def get_system_status(self) -> Dict[str, Any]:
-        """Get current system status"""
+    def get_system_status(self, cpu_interval: Optional[float] = 1) -> Dict[str, Any]:
+        """
+        Get current system status
+
+        Args:
+            cpu_interval: Seconds to sample CPU usage for. None returns immediately
+                          using the usage since the previous call.
+        """
         try:
             return {
-                'cpu_percent': psutil.cpu_percent(interval=1),
+                'cpu_percent': psutil.cpu_percent(interval=cpu_interval),
                 'memory_percent': psutil.virtual_memory().percent,
                 'disk_percent': psutil.disk_usage('/').percent,
                 'time_of_day': self.get_time_of_day(),
@@ -0,0 +1,175 @@
+"""
+Provider Health - Cached liveness and circuit breakers for the AI fallback chain
+
+Keeps the Ollama → Gemini → OpenRouter chain from paying for dead providers by:
+- Caching each provider's liveness probe for PROVIDER_HEALTH_TTL seconds and refreshing
+  stale entries on a background thread instead of probing before every query
+- Counting consecutive failed calls (including HTTP 429 rate limits) per provider and
+  opening its circuit after PROVIDER_FAILURE_THRESHOLD of them
+- Skipping a provider with an open circuit instantly, then letting calls through again once
+  its cooldown has passed (half-open): the first success closes it, a failure reopens it
+- Exposing liveness, breaker state and counters for monitoring
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from config import PROVIDER_HEALTH_TTL, PROVIDER_FAILURE_THRESHOLD, PROVIDER_COOLDOWN
+except ImportError:
+    PROVIDER_HEALTH_TTL = 30
+    PROVIDER_FAILURE_THRESHOLD = 3
+    PROVIDER_COOLDOWN = 30
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ProviderHealth:
+    """Liveness cache and circuit breaker for one provider"""
+
+    def __init__(self, name: str, probe: Optional[Callable[[], bool]], alive: Optional[bool],
+                 ttl: float, threshold: int, cooldown: float):
+        self.name = name
+        self.probe = probe
+        self.alive = alive
+        self.checked_at = time.time() if alive is not None else 0.0
+        self.ttl = ttl
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.open_for = cooldown
+        self.refreshing = False
+        self.last_error = None
+        self.stats = {'calls_ok': 0, 'calls_failed': 0, 'rate_limited': 0, 'skipped': 0, 'probes': 0, 'trips': 0}
+
+    def to_dict(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            'state': self.state,
+            'alive': self.alive,
+            'checked_ago': round(now - self.checked_at, 1) if self.checked_at else None,
+            'consecutive_failures': self.consecutive_failures,
+            'retry_in': round(max(0.0, self.opened_at + self.open_for - now), 1) if self.state == OPEN else None,
+            'last_error': self.last_error,
+            **self.stats
+        }
+
+
+class ProviderHealthRegistry:
+    def __init__(self, ttl: float = PROVIDER_HEALTH_TTL, threshold: int = PROVIDER_FAILURE_THRESHOLD,
+                 cooldown: float = PROVIDER_COOLDOWN):
+        """
+        Args:
+            ttl: Seconds a liveness probe result stays fresh
+            threshold: Consecutive failed calls that open a provider's circuit
+            cooldown: Seconds an open circuit skips the provider before a trial call
+        """
+        self.ttl = ttl
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._providers: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, probe: Optional[Callable[[], bool]] = None, alive: Optional[bool] = None):
+        """
+        Track a provider.
+
+        Args:
+            name: Provider name used by the other methods (e.g. 'ollama')
+            probe: Cheap liveness check; None means liveness is judged from call results only
+            alive: Result of a check that already happened (e.g. at import), so it is not repeated
+        """
+        with self._lock:
+            self._providers[name] = ProviderHealth(name, probe, alive, self.ttl, self.threshold, self.cooldown)
+
+    def available(self, name: str) -> bool:
+        """
+        Whether a call to the provider should be attempted right now (never blocks on the network)
+
+        Unknown providers are always available. A stale or missing probe result is refreshed in the
+        background while the last known value is used (a provider never checked counts as alive).
+        """
+        provider = self._providers.get(name)
+        if provider is None:
+            return True
+        now = time.time()
+        with self._lock:
+            if provider.state == OPEN:
+                if now - provider.opened_at < provider.open_for:
+                    provider.stats['skipped'] += 1
+                    return False
+                provider.state = HALF_OPEN
+                print(f"[Health] {name} cooldown over, trying it again")
+            if provider.state == HALF_OPEN:
+                return True
+            stale = provider.probe is not None and now - provider.checked_at >= provider.ttl
+            if stale and not provider.refreshing:
+                provider.refreshing = True
+                threading.Thread(target=self._refresh, args=(provider,), name=f"spitch-health-{name}", daemon=True).start()
+            if provider.alive is False:
+                provider.stats['skipped'] += 1
+                return False
+            return True
+
+    def record_success(self, name: str):
+        provider = self._providers.get(name)
+        if provider is None:
+            return
+        with self._lock:
+            if provider.state != CLOSED:
+                print(f"[Health] {name} recovered, closing circuit")
+            provider.state = CLOSED
+            provider.consecutive_failures = 0
+            provider.alive = True
+            provider.checked_at = time.time()
+            provider.stats['calls_ok'] += 1
+
+    def record_failure(self, name: str, error: Any = None, rate_limited: bool = False,
+                       retry_after: Optional[float] = None):
+        """
+        Count a failed call; opens the circuit at the threshold, or straight away when half-open
+
+        Args:
+            rate_limited: The provider answered HTTP 429
+            retry_after: Seconds the provider asked us to wait (overrides the cooldown when longer)
+        """
+        provider = self._providers.get(name)
+        if provider is None:
+            return
+        with self._lock:
+            provider.consecutive_failures += 1
+            provider.stats['calls_failed'] += 1
+            if rate_limited:
+                provider.stats['rate_limited'] += 1
+            provider.last_error = str(error)[:200] if error is not None else ("rate limited" if rate_limited else None)
+            if provider.state == HALF_OPEN or provider.consecutive_failures >= provider.threshold:
+                provider.state = OPEN
+                provider.opened_at = time.time()
+                provider.open_for = max(provider.cooldown, retry_after or 0)
+                provider.stats['trips'] += 1
+                print(f"[Health] {name} circuit open for {provider.open_for:.0f}s "
+                      f"after {provider.consecutive_failures} failures ({provider.last_error})")
+
+    def _refresh(self, provider: ProviderHealth):
+        try:
+            alive = bool(provider.probe())
+        except Exception as e:
+            alive = False
+            provider.last_error = str(e)[:200]
+        with self._lock:
+            provider.alive = alive
+            provider.checked_at = time.time()
+            provider.refreshing = False
+            provider.stats['probes'] += 1
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Liveness, breaker state and counters per provider"""
+        with self._lock:
+            return {name: provider.to_dict() for name, provider in self._providers.items()}
+
+# Global instance
+provider_health = ProviderHealthRegistry()
@@ -0,0 +1,218 @@
+"""
+Response Cache - Exact-match cache for AI answers
+
+Skips repeat model calls for prompts the assistant has already answered by:
+- Keying answers on the normalized user input, a hash of the system prompt, the model and the language
+- Keeping recent answers in a bounded in-memory LRU, backed by a SQLite file that survives restarts
+- Expiring answers per intent (RESPONSE_CACHE_TTLS), with time-sensitive intents never cached
+- Never caching queries that mention time-sensitive things (today, news, prices, ...)
+- Leaving out follow-ups ("tell me more", "why", "what about the second one") once there is a
+  conversation, since their answer depends on what was said before
+- Counting hits, misses and skips for monitoring
+"""
+import copy
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from engine.compound_executor import refers_back
+
+try:
+    from config import (RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_FILE, RESPONSE_CACHE_MAX_ENTRIES,
+                        RESPONSE_CACHE_MAX_DISK_ENTRIES, RESPONSE_CACHE_TTLS)
+except ImportError:
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_FILE = "memory/response_cache.db"
+    RESPONSE_CACHE_MAX_ENTRIES = 500
+    RESPONSE_CACHE_MAX_DISK_ENTRIES = 5000
+    RESPONSE_CACHE_TTLS = {'conversation': 86400, 'inquiry': 7 * 86400, 'default': 3600,
+                           'weather': 0, 'time': 0, 'date': 0, 'news': 0, 'fallback': 0}
+
+# Answers to these depend on when they are asked, so they always go to the model
+TIME_SENSITIVE = re.compile(
+    r"\b(today|tonight|tomorrow|yesterday|now|current(ly)?|latest|recent|this (week|month|year)|"
+    r"news|weather|forecast|time|date|score|price|stock|trending)\b"
+)
+
+# Phrasings that continue the conversation instead of asking something self-contained
+FOLLOW_UP = re.compile(
+    r"\b(more|again|else|instead|also|too|he|she|they|him|her|his|their|this|these|those|"
+    r"what about|how about|and (the|what|how|why)|go on|the (first|second|third|last|other|next|previous) one)\b"
+)
+# Bare replies ("why", "yes please", "which one") only make sense after something else
+REPLY = re.compile(r"^(\w+|(yes|yeah|no|nope|ok|okay|sure|why|how|which|really)( \w+)?)$")
+
+
+def normalize(text: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    return re.sub(r"\s+", " ", (text or '').lower()).strip().rstrip("?!. ")
+
+
+def refers_to_conversation(text: str) -> bool:
+    """True if the query only makes sense together with the turns before it"""
+    query = normalize(text)
+    return bool(REPLY.match(query) or FOLLOW_UP.search(query)) or refers_back(query)
+
+
+class ResponseCache:
+    def __init__(self, path: str = RESPONSE_CACHE_FILE, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 max_disk_entries: int = RESPONSE_CACHE_MAX_DISK_ENTRIES, ttls: Optional[Dict[str, float]] = None,
+                 enabled: bool = RESPONSE_CACHE_ENABLED):
+        """
+        Args:
+            path: SQLite file holding the persistent copy
+            max_entries: Answers kept in memory; least recently used are dropped past it
+            max_disk_entries: Answers kept on disk; least recently used are deleted past it
+            ttls: Seconds an answer stays valid per intent type ('default' for the rest, 0 = never cache)
+            enabled: False turns every lookup into a miss and every store into a no-op
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttls = dict(RESPONSE_CACHE_TTLS if ttls is None else ttls)
+        self.enabled = enabled
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'skipped': 0, 'stores': 0, 'expired': 0, 'evictions': 0}
+
+    # --- Keys ---
+
+    @staticmethod
+    def key(user_input: str, system_prompt: Optional[str], model: Optional[str], language: str) -> str:
+        prompt_hash = hashlib.sha1((system_prompt or '').encode('utf-8')).hexdigest()
+        return hashlib.sha1(f"{normalize(user_input)}\n{prompt_hash}\n{model or ''}\n{language}".encode('utf-8')).hexdigest()
+
+    def cacheable(self, user_input: str) -> bool:
+        """False for queries whose answer changes with the time they are asked"""
+        return self.enabled and bool(normalize(user_input)) and not TIME_SENSITIVE.search(normalize(user_input))
+
+    def ttl_for(self, intent_type: str) -> float:
+        return self.ttls.get(intent_type, self.ttls.get('default', 0))
+
+    # --- Storage ---
+
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Autocommit, so a hit's last_used update never leaves a write lock open for other processes
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses ("
+                             "key TEXT PRIMARY KEY, intent TEXT, value TEXT, expires REAL, last_used REAL)")
+            self._db.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+        return self._db
+
+    def get(self, user_input: str, system_prompt: Optional[str], model: Optional[str],
+            language: str = 'en-US') -> Optional[Dict[str, Any]]:
+        """The cached process_command() result for this prompt, or None"""
+        if not self.cacheable(user_input):
+            self.stats['skipped'] += 1
+            return None
+        key = self.key(user_input, system_prompt, model, language)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                try:
+                    row = self._conn().execute("SELECT value, expires FROM responses WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error as e:
+                    print(f"[ResponseCache] Error reading cache: {e}")
+                    row = None
+                if row:
+                    entry = {'value': json.loads(row[0]), 'expires': row[1]}
+                    self._remember(key, entry)
+                    self.stats['disk_hits'] += 1
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            if entry['expires'] <= now:
+                self._memory.pop(key, None)
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            self._memory.move_to_end(key)
+            self.stats['hits'] += 1
+            try:
+                self._conn().execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            except sqlite3.Error:
+                pass
+            return copy.deepcopy(entry['value'])
+
+    def put(self, user_input: str, system_prompt: Optional[str], model: Optional[str], language: str,
+            result: Dict[str, Any], intent_type: Optional[str] = None):
+        """
+        Remember a process_command() result
+
+        Args:
+            intent_type: TTL class (key of RESPONSE_CACHE_TTLS); defaults to the result's intent type
+        """
+        if not self.cacheable(user_input):
+            return
+        if intent_type is None:
+            intent_type = (result.get('intent') or {}).get('type', 'default')
+        ttl = self.ttl_for(intent_type)
+        if ttl <= 0 or not result.get('response'):
+            return
+        key = self.key(user_input, system_prompt, model, language)
+        value = {k: result[k] for k in ('intent', 'response', 'ai_source') if k in result}
+        now = time.time()
+        with self._lock:
+            self._remember(key, {'value': value, 'expires': now + ttl})
+            self.stats['stores'] += 1
+            try:
+                db = self._conn()
+                db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                           (key, intent_type, json.dumps(value), now + ttl, now))
+                self._prune(db)
+            except sqlite3.Error as e:
+                print(f"[ResponseCache] Error writing cache: {e}")
+
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _prune(self, db: sqlite3.Connection):
+        count = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_disk_entries:
+            db.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+            db.execute("DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                       (max(0, count - self.max_disk_entries),))
+
+    def clear(self):
+        """Forget every cached answer"""
+        with self._lock:
+            self._memory.clear()
+            try:
+                db = self._conn()
+                db.execute("DELETE FROM responses")
+            except sqlite3.Error as e:
+                print(f"[ResponseCache] Error clearing cache: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['enabled'] = self.enabled
+        stats['in_memory'] = len(self._memory)
+        try:
+            with self._lock:
+                stats['on_disk'] = self._conn().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        except sqlite3.Error:
+            stats['on_disk'] = None
+        return stats
+
+# Global instance
+response_cache = ResponseCache()
@@ -0,0 +1,332 @@
+"""
+Semantic Cache - Reuse intents and answers for differently worded repeats
+
+Catches the repeats the exact-match response cache misses ("open notepad" / "launch notepad please") by:
+- Embedding each query with Ollama's embeddings endpoint, or a built-in hashed bag-of-words
+  embedder (word and character-trigram features, common synonyms folded) when Ollama has no
+  embedding model
+- Keeping unit-length vectors in a fixed-size NumPy matrix per namespace ('intent' plans from the
+  AI intent parser, 'answer' results from SpitchAI) and finding the nearest one with a single matmul
+- Reusing the cached entry only above a cosine-similarity threshold, within the same context
+  (system prompt, model, language) and when both queries ask for the same action, numbers and
+  slots (from/to/into targets, quoted text, file names) in the same order, so "move a from x to y"
+  never reuses the plan for "move a from y to x"
+- With the hashed embedder, which barely sees word order, reusing an answer only when the content
+  words match in order, and a plan only when the words both queries share come in the same order
+  ("is python better than java" never reuses what was stored for "is java better than python")
+- Evicting the least recently used entry once a namespace is full, and expiring old entries
+"""
+import hashlib
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from engine.http_client import http_client
+from engine.response_cache import TIME_SENSITIVE, normalize
+
+try:
+    from config import (SEMANTIC_CACHE_ENABLED, SEMANTIC_CACHE_EMBEDDER, SEMANTIC_CACHE_EMBED_MODEL,
+                        SEMANTIC_CACHE_THRESHOLDS, SEMANTIC_CACHE_MAX_ENTRIES, SEMANTIC_CACHE_TTL)
+except ImportError:
+    SEMANTIC_CACHE_ENABLED = True
+    SEMANTIC_CACHE_EMBEDDER = 'ollama'
+    SEMANTIC_CACHE_EMBED_MODEL = 'nomic-embed-text'
+    SEMANTIC_CACHE_THRESHOLDS = {'intent': 0.93, 'answer': 0.9}
+    SEMANTIC_CACHE_MAX_ENTRIES = 1000
+    SEMANTIC_CACHE_TTL = 86400
+
+try:
+    from config import OLLAMA_BASE_URL
+except ImportError:
+    OLLAMA_BASE_URL = "http://localhost:11434"
+
+HASHED_DIMENSIONS = 512
+VECTORS_REMEMBERED = 64  # recent query embeddings kept so a miss followed by a store embeds once
+
+# Filler that doesn't change what is being asked
+STOPWORDS = {'a', 'an', 'the', 'please', 'can', 'could', 'would', 'you', 'me', 'for', 'i', 'want', 'to',
+             'will', 'kindly', 'just', 'hey', 'spitch', 'my', 'some', 'go', 'ahead', 'and'}
+# Verbs folded onto one canonical action; two queries with different actions never share an entry
+SYNONYMS = {
+    'launch': 'open', 'start': 'open', 'run': 'open', 'fire': 'open', 'load': 'open',
+    'close': 'close', 'quit': 'close', 'exit': 'close', 'kill': 'close', 'stop': 'close', 'terminate': 'close',
+    'find': 'search', 'google': 'search', 'lookup': 'search', 'look': 'search',
+    'write': 'type', 'enter': 'type',
+    'tell': 'explain', 'describe': 'explain', 'what': 'explain', 'whats': 'explain',
+    'increase': 'raise', 'turn': 'set', 'decrease': 'lower', 'reduce': 'lower',
+}
+ACTIONS = set(SYNONYMS.values()) | {'play', 'pause', 'mute', 'delete', 'create', 'save', 'send', 'calculate', 'raise'}
+# Direction words and the value after them, quoted text and file names: what the action applies to
+SLOTS = re.compile(r"""\b(from|to|into|onto|in)\s+([a-z0-9_\-]+(?:\.[a-z0-9]+)?)|"([^"]+)"|\b([\w\-]+\.[a-z0-9]{1,5})\b""")
+
+
+def _words(text: str) -> List[str]:
+    words = re.findall(r"[a-z0-9']+", normalize(text).replace("'", ""))
+    return [SYNONYMS.get(w, w) for w in words if w not in STOPWORDS]
+
+
+def _slots(text: str) -> Tuple[str, ...]:
+    """Ordered slot values; "want to open" and the like are filler, not a target"""
+    slots = []
+    for direction, value, quoted, filename in SLOTS.findall(normalize(text)):
+        if quoted or filename:
+            slots.append(quoted or filename)
+        elif value not in STOPWORDS and SYNONYMS.get(value, value) not in ACTIONS:
+            slots.append(f"{direction} {value}")
+    return tuple(slots)
+
+
+def _same_order(a: Tuple[str, ...], b: Tuple[str, ...]) -> bool:
+    """True if the words a and b have in common appear in the same order in both"""
+    common = set(a) & set(b)
+    return [w for w in dict.fromkeys(a) if w in common] == [w for w in dict.fromkeys(b) if w in common]
+
+
+def _signature(text: str) -> Tuple[Optional[str], Tuple[str, ...], Tuple[str, ...]]:
+    """(first action verb, numbers, ordered slots) - all must agree before an entry is reused"""
+    words = _words(text)
+    action = next((w for w in words if w in ACTIONS), None)
+    return action, tuple(w for w in words if w.isdigit()), _slots(text)
+
+
+class HashedEmbedder:
+    """Dependency-free embedding: signed feature hashing of words, word pairs and character trigrams"""
+
+    name = 'hashed'
+    order_sensitive = False
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(HASHED_DIMENSIONS, dtype=np.float32)
+        words = _words(text)
+        features = [(w, 1.0) for w in words]
+        features += [(f"{a} {b}", 0.5) for a, b in zip(words, words[1:])]
+        for w in words:
+            padded = f"#{w}#"
+            features += [(padded[i:i + 3], 0.3) for i in range(len(padded) - 2)]
+        for feature, weight in features:
+            h = zlib.crc32(feature.encode('utf-8'))
+            vector[h % HASHED_DIMENSIONS] += weight if h & 0x80000000 else -weight
+        return vector
+
+
+class OllamaEmbedder:
+    """Embeddings from a local Ollama embedding model (e.g. nomic-embed-text)"""
+
+    def __init__(self, model: str = SEMANTIC_CACHE_EMBED_MODEL, base_url: str = OLLAMA_BASE_URL):
+        self.model = model
+        self.base_url = base_url
+        self.name = f"ollama:{model}"
+        self.order_sensitive = True
+
+    def embed(self, text: str) -> np.ndarray:
+        response = http_client.post(f"{self.base_url}/api/embeddings", json={'model': self.model, 'prompt': text}, timeout=(2, 5))
+        response.raise_for_status()
+        embedding = response.json().get('embedding')
+        if not embedding:
+            raise ValueError(f"No embedding returned by {self.model}")
+        return np.asarray(embedding, dtype=np.float32)
+
+
+class SemanticIndex:
+    """Fixed-capacity matrix of unit vectors with brute-force top-k search and LRU replacement"""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, capacity)
+        self.vectors: Optional[np.ndarray] = None
+        self.entries: List[Optional[Dict[str, Any]]] = [None] * self.capacity
+        self.last_used = np.zeros(self.capacity)
+        self.size = 0
+
+    def search(self, vector: np.ndarray, k: int = 3) -> List[Tuple[int, float]]:
+        """(slot, cosine similarity) of the k nearest entries, best first"""
+        if self.vectors is None or not self.size:
+            return []
+        scores = self.vectors[:self.size] @ vector
+        k = min(k, self.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return sorted(((int(i), float(scores[i])) for i in top), key=lambda item: -item[1])
+
+    def add(self, vector: np.ndarray, entry: Dict[str, Any]) -> bool:
+        """Store an entry; True if it replaced the least recently used one"""
+        if self.vectors is None or self.vectors.shape[1] != vector.shape[0]:
+            self.vectors = np.zeros((self.capacity, vector.shape[0]), dtype=np.float32)
+            self.entries = [None] * self.capacity
+            self.size = 0
+        evicted = self.size >= self.capacity
+        slot = int(np.argmin(self.last_used)) if evicted else self.size
+        self.vectors[slot] = vector
+        self.entries[slot] = entry
+        self.last_used[slot] = time.time()
+        if not evicted:
+            self.size += 1
+        return evicted
+
+    def remove(self, slot: int):
+        """Drop an entry by moving the last one into its slot"""
+        last = self.size - 1
+        self.vectors[slot] = self.vectors[last]
+        self.entries[slot] = self.entries[last]
+        self.last_used[slot] = self.last_used[last]
+        self.entries[last] = None
+        self.last_used[last] = 0
+        self.size = last
+
+
+class SemanticCache:
+    def __init__(self, embedder: str = SEMANTIC_CACHE_EMBEDDER, thresholds: Optional[Dict[str, float]] = None,
+                 max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES, ttl: float = SEMANTIC_CACHE_TTL,
+                 enabled: bool = SEMANTIC_CACHE_ENABLED):
+        """
+        Args:
+            embedder: 'ollama' (falls back to 'hashed' if no embedding model answers) or 'hashed'
+            thresholds: Minimum cosine similarity for a reuse, per namespace
+            max_entries: Entries kept per namespace; the least recently used is replaced past it
+            ttl: Seconds an entry can be reused
+            enabled: False turns every lookup into a miss and every store into a no-op
+        """
+        self.preferred_embedder = embedder
+        self.thresholds = dict(SEMANTIC_CACHE_THRESHOLDS if thresholds is None else thresholds)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._embedder = None
+        self._indexes: Dict[str, SemanticIndex] = {}
+        self._vectors: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'skipped': 0, 'rejected': 0, 'expired': 0, 'stores': 0, 'evictions': 0, 'embed_errors': 0}
+
+    @staticmethod
+    def context_key(*parts: Any) -> str:
+        """Stable key for everything besides the query that the cached value depends on"""
+        return hashlib.sha1("\n".join(str(p) for p in parts).encode('utf-8')).hexdigest()
+
+    # --- Embedding ---
+
+    def _get_embedder(self):
+        if self._embedder is None:
+            embedder = HashedEmbedder()
+            if self.preferred_embedder == 'ollama':
+                candidate = OllamaEmbedder()
+                try:
+                    candidate.embed("warm up")
+                    embedder = candidate
+                except Exception as e:
+                    print(f"[SemanticCache] Ollama embeddings unavailable ({e}), using hashed embeddings")
+            self._embedder = embedder
+            print(f"[SemanticCache] Using {embedder.name} embeddings")
+        return self._embedder
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """Unit-length embedding of the normalized text (remembered for the next call with the same text)"""
+        key = normalize(text)
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is not None:
+                self._vectors.move_to_end(key)
+                return vector
+        try:
+            vector = self._get_embedder().embed(key)
+        except Exception as e:
+            self.stats['embed_errors'] += 1
+            print(f"[SemanticCache] Embedding failed: {e}")
+            return None
+        norm = float(np.linalg.norm(vector))
+        if norm == 0:
+            return None
+        vector = vector / norm
+        with self._lock:
+            self._vectors[key] = vector
+            while len(self._vectors) > VECTORS_REMEMBERED:
+                self._vectors.popitem(last=False)
+        return vector
+
+    # --- Lookups ---
+
+    def cacheable(self, text: str) -> bool:
+        return self.enabled and bool(_words(text)) and not TIME_SENSITIVE.search(normalize(text))
+
+    def lookup(self, namespace: str, text: str, context: str = '') -> Optional[Any]:
+        """
+        The value stored for the most similar earlier query, or None
+
+        Args:
+            namespace: 'intent' or 'answer'
+            text: The new query
+            context: context_key() of everything else the value depends on
+        """
+        if not self.cacheable(text):
+            self.stats['skipped'] += 1
+            return None
+        vector = self.embed(text)
+        if vector is None:
+            return None
+        threshold = self.thresholds.get(namespace, 0.95)
+        signature = _signature(text)
+        words = tuple(_words(text))
+        # The hashed embedder can't tell "a better than b" from "b better than a", so word order is checked here
+        order_blind = not self._get_embedder().order_sensitive
+        now = time.time()
+        with self._lock:
+            index = self._indexes.get(namespace)
+            expired = []
+            value = None
+            for slot, score in (index.search(vector) if index else []):
+                if score < threshold:
+                    break
+                entry = index.entries[slot]
+                if now - entry['created'] > entry['ttl']:
+                    expired.append(slot)
+                    continue
+                if entry['context'] != context or entry['signature'] != signature or \
+                        (order_blind and not self._order_matches(namespace, entry['words'], words)):
+                    self.stats['rejected'] += 1
+                    continue
+                index.last_used[slot] = now
+                print(f"[SemanticCache] '{text}' matched '{entry['text']}' ({score:.2f})")
+                value = entry['value']
+                break
+            # Highest slot first: remove() moves the last entry into the freed slot
+            for slot in sorted(expired, reverse=True):
+                index.remove(slot)
+            self.stats['expired'] += len(expired)
+            self.stats['hits' if value is not None else 'misses'] += 1
+            return value
+
+    @staticmethod
+    def _order_matches(namespace: str, stored: Tuple[str, ...], query: Tuple[str, ...]) -> bool:
+        # Answers are reused only for the same content words; plans tolerate extra filler words
+        return stored == query if namespace == 'answer' else _same_order(stored, query)
+
+    def store(self, namespace: str, text: str, value: Any, context: str = '', ttl: Optional[float] = None):
+        """Remember value for text; ttl (seconds, default SEMANTIC_CACHE_TTL) is capped at the cache's ttl"""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if not self.cacheable(text) or ttl <= 0:
+            return
+        vector = self.embed(text)
+        if vector is None:
+            return
+        with self._lock:
+            index = self._indexes.setdefault(namespace, SemanticIndex(self.max_entries))
+            if index.add(vector, {'text': text, 'value': value, 'context': context,
+                                  'signature': _signature(text), 'words': tuple(_words(text)),
+                                  'created': time.time(), 'ttl': ttl}):
+                self.stats['evictions'] += 1
+            self.stats['stores'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        stats['enabled'] = self.enabled
+        stats['embedder'] = self._embedder.name if self._embedder else None
+        stats['entries'] = {name: index.size for name, index in self._indexes.items()}
+        stats['thresholds'] = dict(self.thresholds)
+        return stats
+
+# Global instance
+semantic_cache = SemanticCache()
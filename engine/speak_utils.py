@@ -1,49 +1,59 @@
-import pyttsx3
 import eel
-from engine.user_prefs import load_setting
+import time
+from engine.tts_worker import tts_worker, PRIORITY_NORMAL
+from engine.phrase_cache import phrase_cache
+from engine.speech_stream import speech_metrics
+from engine.tracing import tracer
 
-def speak(text):
+# Brief window after speech ends in which the microphone capture still ignores its own voice
+ECHO_TAIL_SECONDS = 0.3
+
+def is_speaking() -> bool:
+    """True while speech is playing and briefly after it ends"""
+    return tts_worker.is_speaking() or time.time() - tts_worker.last_spoke_at < ECHO_TAIL_SECONDS
+
+def _display(text):
     try:
-        engine = pyttsx3.init()
-        voices = engine.getProperty('voices')
-        
-        # Load settings
-        voice_id_pref = load_setting('voice_id')
-        voice_rate_pref = load_setting('voice_rate', 170)
-        
-        # Select voice
-        if voice_id_pref:
-            engine.setProperty('voice', voice_id_pref)
-        else:
-            # Default fallback
-            engine.setProperty('voice', voices[1].id if len(voices) > 1 else voices[0].id)
-            
-        engine.setProperty('rate', int(voice_rate_pref))
-        
-        try:
-            eel.DisplayMessage(text)  # Show text in UI if available
-        except (AttributeError, Exception):
-            print(f"[Spitch] {text}")  # Fallback to console output
-            
-        engine.say(text)
-        engine.runAndWait()
-    except Exception as e:
-        print(f"Text-to-speech error: {e}")
+        eel.DisplayMessage(text)  # Show text in UI if available
+    except (AttributeError, Exception):
+        print(f"[Spitch] {text}")  # Fallback to console output
+
+def speak_async(text, priority=PRIORITY_NORMAL):
+    """Queue text on the TTS worker and return immediately (call .wait() on the result to block)"""
+    _display(text)
+    return tts_worker.say(text, priority)
+
+def speak(text):
+    """Speak text and wait until it has been spoken (or interrupted)"""
+    with tracer.span('tts', chars=len(text)) as span:
+        utterance = speak_async(text)
+        # Generous bound so a wedged audio device can't hang the caller forever
+        utterance.wait(timeout=30 + len(text) / 5)
+        if utterance.started_at is not None:
+            span.set(queue_wait_ms=round((utterance.started_at - utterance.queued_at) * 1000, 1))
+        span.set(spoken=utterance.spoken)
+
+def interrupt_speech():
+    """Cut off current speech and drop anything still queued (e.g. when a new command starts)"""
+    tts_worker.interrupt()
+
+def reload_voice_settings():
+    """Apply changed voice/rate settings to the next utterance"""
+    tts_worker.reload_settings()
 
 @eel.expose
 def get_voice_options():
     """Return list of available voices for the UI"""
     try:
-        engine = pyttsx3.init()
-        voices = engine.getProperty('voices')
-        voice_list = []
-        for v in voices:
-            voice_list.append({
-                'id': v.id,
-                'name': v.name,
-                'lang': v.languages
-            })
-        return voice_list
+        return tts_worker.get_voices()
     except Exception as e:
         print(f"Error getting voices: {e}")
-        return [] 
\ No newline at end of file
+        return []
+
+@eel.expose
+def get_tts_stats():
+    """Return spoken/interrupted counts, engine start-up time, queue wait, phrase-cache hits and time-to-first-audio"""
+    stats = tts_worker.get_stats()
+    stats['phrase_cache'] = phrase_cache.get_stats()
+    stats['streaming'] = speech_metrics.get_stats()
+    return stats
@@ -0,0 +1,136 @@
+"""
+Speech Stream - Speak LLM answers sentence by sentence while they generate
+
+Cuts time-to-first-audio from the full generation time to the first sentence by:
+- Segmenting streamed text chunks into complete sentences as soon as their boundary arrives
+- Queueing each sentence on the TTS worker while later tokens are still being generated
+- Recording time-to-first-audio for every streamed answer
+"""
+import re
+import statistics
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from engine.tts_worker import tts_worker, PRIORITY_NORMAL, Utterance
+
+try:
+    from config import STREAMING_TTS
+except ImportError:
+    STREAMING_TTS = True
+
+# Words whose trailing period does not end a sentence
+ABBREVIATIONS = {'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc', 'e.g', 'i.e', 'approx', 'no'}
+
+# Sentence end: terminal punctuation (plus closing quotes/brackets) followed by whitespace, or a line break
+_BOUNDARY = re.compile(r'[.!?]+["\')\]]*\s+|\n+')
+_LIST_MARKER = re.compile(r'^\s*(?:[-*+]|\d+[.)])\s+')
+_LIST_NUMBER = re.compile(r'\d+[.)]')
+
+
+class SentenceSegmenter:
+    """Buffers streamed text and hands back sentences once they are complete"""
+
+    def __init__(self, min_chars: int = 2):
+        """
+        Args:
+            min_chars: Shorter fragments (stray punctuation, list numbers) are merged into the next sentence
+        """
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add a chunk and return the sentences it completed"""
+        self._buffer += chunk
+        sentences = []
+        start = 0
+        for match in _BOUNDARY.finditer(self._buffer):
+            end = match.end()
+            if match.group().strip() == '.' and self._is_abbreviation(self._buffer[start:match.start()]):
+                continue
+            sentence = self._buffer[start:end].strip()
+            if len(sentence) < self.min_chars or _LIST_NUMBER.fullmatch(sentence):
+                continue
+            sentences.append(sentence)
+            start = end
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Return whatever is left once the stream has ended"""
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return rest or None
+
+    @staticmethod
+    def _is_abbreviation(text: str) -> bool:
+        words = text.split()
+        return bool(words) and words[-1].lower().rstrip('.') in ABBREVIATIONS
+
+
+def strip_list_marker(sentence: str) -> str:
+    """Drop a leading bullet or list number (a single line never trips _clean_response's list rules)"""
+    return _LIST_MARKER.sub('', sentence)
+
+
+class SentenceSpeaker:
+    """Queues streamed sentences for speech and measures time-to-first-audio"""
+
+    def __init__(self, started_at: Optional[float] = None, priority: int = PRIORITY_NORMAL):
+        """
+        Args:
+            started_at: perf_counter() when the command started (default: now)
+            priority: TTS queue priority for the sentences
+        """
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.priority = priority
+        self.utterances: List[Utterance] = []
+
+    def say(self, sentence: str):
+        """Queue one sentence and return immediately"""
+        self.utterances.append(tts_worker.say(sentence, self.priority))
+
+    def finish(self, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        Wait for the last sentence and record the answer's time-to-first-audio
+
+        Returns:
+            Seconds from command start until the first sentence started playing, or None
+        """
+        if not self.utterances:
+            return None
+        if timeout is None:
+            timeout = 30 + sum(len(u.text) for u in self.utterances) / 5
+        self.utterances[-1].wait(timeout)
+        first = self.utterances[0]
+        if first.started_at is None:
+            return None
+        ttfa = first.started_at - self.started_at
+        speech_metrics.record(ttfa, len(self.utterances))
+        return ttfa
+
+
+class SpeechMetrics:
+    def __init__(self, window: int = 100):
+        self._ttfa = deque(maxlen=window)
+        self.answers = 0
+        self.sentences = 0
+
+    def record(self, ttfa: float, sentences: int):
+        self._ttfa.append(ttfa)
+        self.answers += 1
+        self.sentences += sentences
+
+    def get_stats(self) -> Dict[str, Any]:
+        values = sorted(self._ttfa)
+        return {
+            'streaming_enabled': STREAMING_TTS,
+            'streamed_answers': self.answers,
+            'avg_sentences_per_answer': self.sentences / self.answers if self.answers else None,
+            'time_to_first_audio_median': statistics.median(values) if values else None,
+            'time_to_first_audio_p95': values[min(len(values) - 1, int(len(values) * 0.95))] if values else None,
+            'time_to_first_audio_last': self._ttfa[-1] if self._ttfa else None
+        }
+
+# Global instance
+speech_metrics = SpeechMetrics()
@@ -0,0 +1,133 @@
+"""
+Startup Manager - Staged, deferred initialization of heavy subsystems
+
+Keeps cold start fast by:
+- Registering heavy subsystems (Whisper, task agent, memory, MCP) as named warm-up tasks
+- Loading them on a background warm-up thread once the UI is up
+- Loading a subsystem on demand if it is needed before warm-up reaches it
+- Exposing readiness flags the UI can poll
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class StartupManager:
+    def __init__(self):
+        """Initialize an empty warm-up registry"""
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._order: List[str] = []
+        self._lock = threading.Lock()
+        self._warmup_thread = None
+        self.started_at = time.time()
+
+    def register(self, name: str, loader: Callable[[], Any], description: str = ""):
+        """
+        Register a subsystem loader.
+
+        Args:
+            name: Unique subsystem name (e.g., 'whisper')
+            loader: Zero-argument callable returning the loaded object
+            description: Human readable label for the UI
+        """
+        with self._lock:
+            if name not in self._tasks:
+                self._order.append(name)
+            self._tasks[name] = {
+                'loader': loader,
+                'description': description or name,
+                'state': PENDING,
+                'value': None,
+                'error': None,
+                'duration': None,
+                'done': threading.Event()
+            }
+
+    def get(self, name: str, timeout: Optional[float] = None) -> Any:
+        """
+        Return a loaded subsystem, loading it on this thread if nobody has started it yet.
+
+        Returns None if the subsystem failed to load or is unknown.
+        """
+        task = self._tasks.get(name)
+        if task is None:
+            return None
+
+        if self._claim(name):
+            self._run(name)
+        else:
+            task['done'].wait(timeout)
+
+        return task['value'] if task['state'] == READY else None
+
+    def is_ready(self, name: str) -> bool:
+        """Check whether a subsystem finished loading successfully"""
+        task = self._tasks.get(name)
+        return bool(task and task['state'] == READY)
+
+    def start_warmup(self):
+        """Load every registered subsystem on a background thread (idempotent)"""
+        with self._lock:
+            if self._warmup_thread and self._warmup_thread.is_alive():
+                return
+            self._warmup_thread = threading.Thread(target=self.load_all, name="spitch-warmup", daemon=True)
+            self._warmup_thread.start()
+
+    def load_all(self):
+        """Load every registered subsystem in registration order on the calling thread"""
+        for name in list(self._order):
+            self.get(name)
+        elapsed = time.time() - self.started_at
+        print(f"[Startup] Warm-up finished {elapsed:.1f}s after launch")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get readiness flags for the UI"""
+        subsystems = {}
+        for name in self._order:
+            task = self._tasks[name]
+            subsystems[name] = {
+                'description': task['description'],
+                'state': task['state'],
+                'ready': task['state'] == READY,
+                'duration': task['duration'],
+                'error': task['error']
+            }
+        return {
+            'all_ready': all(t['state'] in (READY, FAILED) for t in self._tasks.values()),
+            'uptime': time.time() - self.started_at,
+            'subsystems': subsystems
+        }
+
+    def _claim(self, name: str) -> bool:
+        """Atomically move a task from pending to loading; returns True for the winner"""
+        with self._lock:
+            task = self._tasks[name]
+            if task['state'] != PENDING:
+                return False
+            task['state'] = LOADING
+            return True
+
+    def _run(self, name: str):
+        """Execute a claimed loader and record the outcome"""
+        task = self._tasks[name]
+        start = time.perf_counter()
+        try:
+            task['value'] = task['loader']()
+            task['state'] = READY
+            task['duration'] = time.perf_counter() - start
+            print(f"[Startup] {task['description']} ready in {task['duration']:.2f}s")
+        except Exception as e:
+            task['error'] = str(e)
+            task['state'] = FAILED
+            task['duration'] = time.perf_counter() - start
+            print(f"[Startup] {task['description']} failed to load: {e}")
+        finally:
+            task['done'].set()
+
+# Global instance
+startup_manager = StartupManager()
@@ -0,0 +1,235 @@
+"""
+Tracing - Per-request spans across the command pipeline
+
+Shows where the time of a slow command went by:
+- Opening a trace per command and a span per stage (capture, ASR, routing, task parsing,
+  each AI provider attempt, skill execution, TTS) with attributes such as provider and model
+- Following the active span through contextvars, including into worker threads via wrap()
+- Writing finished traces to a size-rotated JSONL file and keeping the last few in memory
+  for the /traces waterfall page
+"""
+import contextvars
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from config import TRACING_ENABLED, TRACE_FILE, TRACE_FILE_MAX_MB, TRACE_FILE_BACKUPS, TRACE_KEEP
+except ImportError:
+    TRACING_ENABLED = True
+    TRACE_FILE = "memory/traces.jsonl"
+    TRACE_FILE_MAX_MB = 5
+    TRACE_FILE_BACKUPS = 3
+    TRACE_KEEP = 50
+
+_ids = itertools.count(1)
+
+
+class Span:
+    """One timed stage; attributes can be added while it runs with set()"""
+
+    def __init__(self, name: str, trace: "Trace", parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.trace = trace
+        self.span_id = next(_ids)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes)
+        self.start = time.time()
+        self.end = None
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def finish(self, error: Optional[BaseException] = None):
+        if self.end is not None:
+            return
+        self.end = time.time()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.trace.spans.append(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        end = self.end if self.end is not None else time.time()
+        return {
+            'name': self.name,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'offset_ms': round((self.start - self.trace.root.start) * 1000, 2),
+            'duration_ms': round((end - self.start) * 1000, 2),
+            'attributes': self.attributes,
+            'error': self.error
+        }
+
+
+class _NullSpan:
+    """Stands in for a span when no trace is active, so call sites never need to check"""
+
+    def set(self, **attributes):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Trace:
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.trace_id = f"{int(time.time() * 1000):x}-{next(_ids)}"
+        self.spans: List[Span] = []
+        self.root = Span(name, self, None, attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        root = self.root
+        return {
+            'trace_id': self.trace_id,
+            'name': root.name,
+            'start': root.start,
+            'duration_ms': round(((root.end or time.time()) - root.start) * 1000, 2),
+            'attributes': root.attributes,
+            'error': root.error,
+            'spans': [s.to_dict() for s in sorted(self.spans, key=lambda s: s.start) if s is not root]
+        }
+
+
+class Tracer:
+    def __init__(self, enabled: bool = TRACING_ENABLED, path: str = TRACE_FILE,
+                 max_mb: float = TRACE_FILE_MAX_MB, backups: int = TRACE_FILE_BACKUPS, keep: int = TRACE_KEEP):
+        """
+        Args:
+            enabled: False turns every call into a no-op
+            path: JSONL file receiving one finished trace per line
+            max_mb: Size at which the file is rotated
+            backups: Rotated files kept (path.1 ... path.N)
+            keep: Finished traces kept in memory for get_recent()
+        """
+        self.enabled = enabled
+        self.path = path
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.backups = backups
+        self.recent = deque(maxlen=keep)
+        self._current: contextvars.ContextVar = contextvars.ContextVar("spitch_span", default=None)
+        self._logger = None
+        self._lock = threading.Lock()
+
+    # --- Starting and ending traces ---
+
+    def begin(self, name: str, **attributes) -> Optional[Span]:
+        """Start a new trace without activating it (hand it to activate() / finish() later)"""
+        if not self.enabled:
+            return None
+        return Trace(name, attributes).root
+
+    def finish(self, root: Optional[Span], error: Optional[BaseException] = None):
+        """End a trace started with begin() and export it"""
+        if root is None:
+            return
+        root.finish(error)
+        self._export(root.trace)
+
+    @contextmanager
+    def activate(self, span: Optional[Span]):
+        """Make span the parent of spans opened in this block (e.g. on another thread)"""
+        if span is None:
+            yield
+            return
+        token = self._current.set(span)
+        try:
+            yield
+        finally:
+            self._current.reset(token)
+
+    @contextmanager
+    def trace(self, name: str, **attributes):
+        """A span under the active trace, or a new trace if none is active"""
+        if not self.enabled:
+            yield NULL_SPAN
+            return
+        if self._current.get() is not None:
+            with self.span(name, **attributes) as span:
+                yield span
+            return
+        root = self.begin(name, **attributes)
+        token = self._current.set(root)
+        try:
+            yield root
+        except BaseException as e:
+            self._current.reset(token)
+            self.finish(root, e)
+            raise
+        self._current.reset(token)
+        self.finish(root)
+
+    # --- Spans ---
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time a stage of the active trace (does nothing outside a trace)"""
+        parent = self._current.get()
+        if parent is None:
+            yield NULL_SPAN
+            return
+        span = Span(name, parent.trace, parent, attributes)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.finish(e)
+            raise
+        finally:
+            self._current.reset(token)
+        span.finish()
+
+    def record(self, name: str, start: float, end: float, **attributes):
+        """Add an already finished stage (wall-clock times) to the active trace"""
+        parent = self._current.get()
+        if parent is None:
+            return
+        span = Span(name, parent.trace, parent, attributes)
+        span.start = start
+        span.end = end
+        parent.trace.spans.append(span)
+
+    def current(self) -> Optional[Span]:
+        return self._current.get()
+
+    def wrap(self, fn: Callable) -> Callable:
+        """fn bound to a copy of the caller's context, so a worker thread stays inside the trace"""
+        context = contextvars.copy_context()
+        return lambda *args, **kwargs: context.run(fn, *args, **kwargs)
+
+    # --- Export ---
+
+    def _get_logger(self) -> logging.Logger:
+        if self._logger is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            logger = logging.getLogger("spitch.traces")
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            handler = RotatingFileHandler(self.path, maxBytes=self.max_bytes, backupCount=self.backups, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            self._logger = logger
+        return self._logger
+
+    def _export(self, trace: Trace):
+        data = trace.to_dict()
+        self.recent.append(data)
+        try:
+            with self._lock:
+                self._get_logger().info(json.dumps(data, default=str))
+        except Exception as e:
+            print(f"[Tracing] Could not write trace: {e}")
+
+    def get_recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Last finished traces, newest first"""
+        return list(self.recent)[-limit:][::-1]
+
+# Global instance
+tracer = Tracer()
@@ -0,0 +1,249 @@
+"""
+TTS Worker - One long-lived text-to-speech engine fed by an utterance queue
+
+Takes engine start-up off every response by:
+- Creating the pyttsx3 engine once on a dedicated thread and reusing it
+- Caching voice and rate settings and re-applying them only when the settings store reports a change
+- Serving utterances from a priority queue, so callers can return immediately
+- Interrupting stale speech when a new command starts
+- Playing pre-rendered fixed phrases from the phrase cache and rendering missing ones while idle
+"""
+import itertools
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from engine.user_prefs import load_setting, settings_store
+from engine.phrase_cache import phrase_cache
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+PRIORITY_RENDER = 9  # phrase-cache renders run only when nothing else is queued
+
+DEFAULT_RATE = 170
+VOICE_SETTINGS = ('voice_id', 'voice_rate')
+
+
+class Utterance:
+    """A queued piece of speech; wait() blocks until it was spoken or dropped"""
+
+    def __init__(self, text: str, priority: int, generation: int, kind: str = 'speak'):
+        self.text = text
+        self.kind = kind
+        self.priority = priority
+        self.generation = generation
+        self.spoken = False
+        self.cancelled = False
+        self.queued_at = time.perf_counter()
+        self.started_at = None
+        self._done = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def finish(self, spoken: bool):
+        self.spoken = spoken
+        self.cancelled = not spoken
+        self._done.set()
+
+
+class TTSWorker:
+    def __init__(self):
+        """Initialize the worker (the engine and thread start on first use)"""
+        self._queue: "queue.PriorityQueue" = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._generation = 0
+        self._current: Optional[Utterance] = None
+        self._engine = None
+        self._voices: List[Dict[str, Any]] = []
+        self._thread = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._settings_dirty = True
+        self._voice_key = None
+        self.speaking = threading.Event()
+        self.last_spoke_at = 0.0
+        self.stats = {'spoken': 0, 'from_cache': 0, 'interrupted': 0, 'dropped_stale': 0,
+                      'engine_init_seconds': None, 'avg_queue_wait_seconds': None}
+        self._queue_waits: List[float] = []
+        settings_store.subscribe(self._on_settings_changed)
+
+    # --- Public API ---
+
+    def say(self, text: str, priority: int = PRIORITY_NORMAL) -> Utterance:
+        """Queue text and return immediately"""
+        self._ensure_thread()
+        utterance = Utterance(text, priority, self._generation)
+        self._queue.put((priority, next(self._sequence), utterance))
+        return utterance
+
+    def render(self, text: str):
+        """Queue a phrase-cache render for when the worker is idle"""
+        self._ensure_thread()
+        self._queue.put((PRIORITY_RENDER, next(self._sequence), Utterance(text, PRIORITY_RENDER, 0, kind='render')))
+
+    def interrupt(self):
+        """Drop everything queued and cut off the utterance being spoken"""
+        with self._lock:
+            self._generation += 1
+            current = self._current
+        if current is not None:
+            self.stats['interrupted'] += 1
+
+    def reload_settings(self):
+        """Pick up changed voice/rate settings before the next utterance"""
+        self._settings_dirty = True
+
+    def get_voices(self, timeout: float = 10.0) -> List[Dict[str, Any]]:
+        """Voices reported by the engine (waits for the engine to start)"""
+        self._ensure_thread()
+        self._ready.wait(timeout)
+        return list(self._voices)
+
+    def is_speaking(self) -> bool:
+        return self.speaking.is_set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['queued'] = self._queue.qsize()
+        stats['speaking'] = self.is_speaking()
+        return stats
+
+    # --- Worker thread ---
+
+    def _ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="spitch-tts", daemon=True)
+            self._thread.start()
+
+    def _init_engine(self):
+        # The engine must be created on the thread that drives it (SAPI5 is COM-apartment bound)
+        import pyttsx3
+        start = time.perf_counter()
+        self._engine = pyttsx3.init()
+        self._voices = [{'id': v.id, 'name': v.name, 'lang': v.languages}
+                        for v in self._engine.getProperty('voices')]
+        self._engine.connect('started-word', self._on_word)
+        self.stats['engine_init_seconds'] = time.perf_counter() - start
+        print(f"[TTS] Speech engine ready in {self.stats['engine_init_seconds']:.2f}s")
+
+    def _apply_settings(self):
+        voice_id = load_setting('voice_id')
+        rate = load_setting('voice_rate', DEFAULT_RATE)
+        if not voice_id and self._voices:
+            # Default fallback
+            voice_id = self._voices[1]['id'] if len(self._voices) > 1 else self._voices[0]['id']
+        if voice_id:
+            self._engine.setProperty('voice', voice_id)
+        self._engine.setProperty('rate', int(rate))
+        self._settings_dirty = False
+        # Renders are only valid for the voice and rate they were made with
+        self._voice_key = f"{voice_id}|{int(rate)}"
+        for text in phrase_cache.missing(self._voice_key):
+            self.render(text)
+
+    def _on_settings_changed(self, changed: Dict[str, Any]):
+        """Settings-store subscriber: re-apply voice and rate before the next utterance"""
+        if any(key in changed for key in VOICE_SETTINGS):
+            self.reload_settings()
+
+    def _on_word(self, name, location, length):
+        """Called by the engine between words: stop if this utterance went stale"""
+        current = self._current
+        if current is not None and current.generation != self._generation:
+            self._engine.stop()
+
+    def _run(self):
+        try:
+            self._init_engine()
+        except Exception as e:
+            print(f"Text-to-speech error: {e}")
+            self._ready.set()
+            self._drain(spoken=False)
+            return
+        self._ready.set()
+
+        while True:
+            _, _, utterance = self._queue.get()
+            if utterance.kind == 'render':
+                self._render(utterance.text)
+                continue
+            if utterance.generation != self._generation:
+                self.stats['dropped_stale'] += 1
+                utterance.finish(spoken=False)
+                continue
+
+            self._record_queue_wait(utterance)
+            try:
+                if self._settings_dirty:
+                    self._apply_settings()
+                with self._lock:
+                    self._current = utterance
+                utterance.started_at = time.perf_counter()
+                self.speaking.set()
+                try:
+                    self._speak(utterance)
+                finally:
+                    self.speaking.clear()
+                    self.last_spoke_at = time.time()
+                spoken = utterance.generation == self._generation
+                if spoken:
+                    self.stats['spoken'] += 1
+                utterance.finish(spoken=spoken)
+            except Exception as e:
+                print(f"Text-to-speech error: {e}")
+                utterance.finish(spoken=False)
+            finally:
+                with self._lock:
+                    self._current = None
+
+    def _speak(self, utterance: Utterance):
+        """Play the cached render if there is one, otherwise synthesize live"""
+        cached = phrase_cache.lookup(utterance.text, self._voice_key)
+        if cached:
+            try:
+                phrase_cache.play(cached, lambda: utterance.generation != self._generation)
+                self.stats['from_cache'] += 1
+                return
+            except Exception as e:
+                print(f"[TTS] Cached phrase playback failed, speaking live: {e}")
+
+        self._engine.say(utterance.text)
+        self._engine.runAndWait()
+        if phrase_cache.is_registered(utterance.text) and not phrase_cache.has(utterance.text, self._voice_key):
+            self.render(utterance.text)
+
+    def _render(self, text: str):
+        """Synthesize a registered phrase to the phrase cache"""
+        try:
+            if self._settings_dirty:
+                self._apply_settings()
+            if phrase_cache.has(text, self._voice_key):
+                return
+            path = phrase_cache.render_path(text, self._voice_key)
+            self._engine.save_to_file(text, path)
+            self._engine.runAndWait()
+            phrase_cache.store(text, self._voice_key, path)
+        except Exception as e:
+            print(f"[TTS] Could not render phrase for the cache: {e}")
+
+    def _record_queue_wait(self, utterance: Utterance):
+        self._queue_waits = (self._queue_waits + [time.perf_counter() - utterance.queued_at])[-100:]
+        self.stats['avg_queue_wait_seconds'] = sum(self._queue_waits) / len(self._queue_waits)
+
+    def _drain(self, spoken: bool):
+        while True:
+            try:
+                _, _, utterance = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            utterance.finish(spoken=spoken)
+
+# Global instance
+tts_worker = TTSWorker()
@@ -1,34 +1,118 @@
 import json
 import os
+import tempfile
+import threading
+from typing import Any, Callable, Dict, List
 
 SETTINGS_FILE = 'user_settings.json'
 
+class SettingsStore:
+    """Process-wide copy of the settings file, re-read only when the file changes on disk."""
+
+    def __init__(self, path: str = SETTINGS_FILE):
+        self.path = path
+        self._settings: Dict[str, Any] = {}
+        self._mtime = None
+        self._lock = threading.RLock()
+        self._subscribers: List[Callable[[Dict[str, Any]], None]] = []
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]):
+        """Call callback(changed) with the changed keys and new values after every change."""
+        self._subscribers.append(callback)
+
+    def all(self) -> dict:
+        """Returns a copy of every setting."""
+        with self._lock:
+            self._refresh()
+            return dict(self._settings)
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            self._refresh()
+            return self._settings.get(key, default)
+
+    def update(self, values: Dict[str, Any]) -> bool:
+        """Sets several keys with a single write of the file."""
+        with self._lock:
+            self._refresh()
+            changed = {k: v for k, v in values.items() if self._settings.get(k) != v or k not in self._settings}
+            if not changed:
+                return True
+            settings = dict(self._settings)
+            settings.update(changed)
+            try:
+                self._write(settings)
+            except (IOError, OSError, TypeError) as e:
+                print(f"Error saving settings: {e}")
+                return False
+            self._settings = settings
+        self._notify(changed)
+        return True
+
+    def _refresh(self):
+        """Reload if the file was created, changed or removed since it was last read."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        old = self._settings
+        self._settings = self._read() if mtime is not None else {}
+        self._mtime = mtime
+        changed = {k: v for k, v in self._settings.items() if old.get(k) != v}
+        changed.update({k: None for k in old if k not in self._settings})
+        if changed and old:
+            self._notify(changed)
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (IOError, json.JSONDecodeError):
+            return {}
+
+    def _write(self, settings: dict):
+        # Write a temp file next to the target and rename it over, so readers never see half a file
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.settings-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(settings, f, indent=4)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def _notify(self, changed: Dict[str, Any]):
+        for callback in list(self._subscribers):
+            try:
+                callback(changed)
+            except Exception as e:
+                print(f"Error in settings subscriber: {e}")
+
+# Global instance
+settings_store = SettingsStore()
+
 def save_setting(key: str, value):
     """Saves a key-value pair to the settings file."""
-    settings = load_settings()
-    settings[key] = value
-    try:
-        with open(SETTINGS_FILE, 'w') as f:
-            json.dump(settings, f, indent=4)
-        return True
-    except IOError as e:
-        print(f"Error saving settings: {e}")
-        return False
+    return settings_store.update({key: value})
+
+def save_settings(values: dict):
+    """Saves several key-value pairs with a single write."""
+    return settings_store.update(values)
 
 def load_setting(key: str, default=None):
     """Loads a specific key from the settings file."""
-    settings = load_settings()
-    return settings.get(key, default)
+    return settings_store.get(key, default)
 
 def load_settings() -> dict:
     """Loads the entire settings dictionary from the file."""
-    if not os.path.exists(SETTINGS_FILE):
-        return {}
-    try:
-        with open(SETTINGS_FILE, 'r') as f:
-            return json.load(f)
-    except (IOError, json.JSONDecodeError):
-        return {}
+    return settings_store.all()
 
 def set_user_location(city: str, speak_func=None):
     """Saves the user's preferred location."""
@@ -43,4 +127,4 @@ def set_user_location(city: str, speak_func=None):
 
 def get_user_location():
     """Retrieves the user's saved location."""
-    return load_setting('user_location') 
\ No newline at end of file
+    return load_setting('user_location')
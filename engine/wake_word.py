@@ -0,0 +1,344 @@
+"""
+Wake Word Spotter - On-device keyword spotting for "Spitch"
+
+Keeps background chatter away from Google/Whisper by:
+- Computing MFCC features with NumPy (no extra dependencies)
+- Matching the start of each captured utterance against enrolled templates with
+  subsequence dynamic time warping
+- Running on the capture thread, so only utterances that start with the wake word
+  (or follow a bare wake word) reach full speech recognition
+- Deriving the match threshold from the enrolled templates and a sensitivity setting
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from config import WAKE_WORD, WAKE_WORD_SENSITIVITY, WAKE_WORD_ARMED_SECONDS
+except ImportError:
+    WAKE_WORD = "spitch"
+    WAKE_WORD_SENSITIVITY = 0.5
+    WAKE_WORD_ARMED_SECONDS = 5
+
+SAMPLE_RATE = 16000
+FRAME_LEN = 400   # 25 ms analysis window
+HOP = 160         # 10 ms hop
+NFFT = 512
+NUM_MEL = 26
+NUM_CEPS = 13
+SEARCH_SECONDS = 2.0        # only the start of an utterance is searched for the wake word
+MIN_COMMAND_SECONDS = 0.4   # voiced audio after the wake word that counts as a command
+MIN_TEMPLATES = 3
+
+
+def _frame_energy(samples: np.ndarray) -> np.ndarray:
+    """RMS energy of each analysis frame"""
+    if len(samples) < FRAME_LEN:
+        return np.zeros(0, dtype=np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(samples.astype(np.float32), FRAME_LEN)[::HOP]
+    return np.sqrt(np.mean(frames ** 2, axis=1))
+
+
+class MFCCFrontEnd:
+    """Mel-frequency cepstral coefficients computed with NumPy"""
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, num_mel: int = NUM_MEL, num_ceps: int = NUM_CEPS):
+        self.window = np.hamming(FRAME_LEN).astype(np.float32)
+        self.filterbank = self._mel_filterbank(sample_rate, num_mel)
+        # Orthonormal DCT-II matrix: cepstra = log_mel @ dct.T
+        k = np.arange(num_ceps)[:, None]
+        n = np.arange(num_mel)[None, :]
+        dct = np.cos(np.pi * k * (2 * n + 1) / (2 * num_mel)) * np.sqrt(2.0 / num_mel)
+        dct[0] /= np.sqrt(2.0)
+        self.dct = dct.astype(np.float32)
+
+    @staticmethod
+    def _mel_filterbank(sample_rate: int, num_mel: int) -> np.ndarray:
+        def hz_to_mel(hz):
+            return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+        def mel_to_hz(mel):
+            return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+        mel_points = np.linspace(hz_to_mel(20.0), hz_to_mel(sample_rate / 2.0), num_mel + 2)
+        bins = np.floor((NFFT + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+        bank = np.zeros((num_mel, NFFT // 2 + 1), dtype=np.float32)
+        for m in range(1, num_mel + 1):
+            left, center, right = bins[m - 1], bins[m], bins[m + 1]
+            if center > left:
+                bank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+            if right > center:
+                bank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+        return bank
+
+    def frames(self, samples: np.ndarray) -> np.ndarray:
+        """Pre-emphasized, windowed analysis frames (num_frames x FRAME_LEN)"""
+        x = samples.astype(np.float32) / 32768.0
+        if len(x) < FRAME_LEN:
+            x = np.pad(x, (0, FRAME_LEN - len(x)))
+        x = np.append(x[0], x[1:] - 0.97 * x[:-1])
+        return np.lib.stride_tricks.sliding_window_view(x, FRAME_LEN)[::HOP] * self.window
+
+    def compute(self, samples: np.ndarray) -> np.ndarray:
+        """MFCCs without c0 (num_frames x NUM_CEPS - 1)
+
+        Loudness only shifts the log-mel energies by a constant, which lands entirely
+        in c0; dropping it makes matching gain-invariant without per-utterance mean
+        normalization (that would differ between a bare template and a longer query).
+        """
+        power = np.abs(np.fft.rfft(self.frames(samples), NFFT)) ** 2 / NFFT
+        log_mel = np.log(np.maximum(power @ self.filterbank.T, 1e-10))
+        return (log_mel @ self.dct.T)[:, 1:]
+
+
+def subsequence_dtw(template: np.ndarray, query: np.ndarray) -> Tuple[float, int]:
+    """
+    Best alignment of a template anywhere inside a query sequence.
+
+    Uses the slope-constrained step pattern (1,1), (1,2), (2,1) so each template row
+    depends only on the two rows before it and can be computed with vector operations.
+
+    Returns:
+        (path-length-normalized cost, query frame where the match ends)
+    """
+    n, m = len(template), len(query)
+    if n == 0 or m == 0:
+        return float('inf'), 0
+    cost = np.sqrt(((template[:, None, :] - query[None, :, :]) ** 2).sum(axis=2))
+    acc = np.full((n, m), np.inf)
+    length = np.zeros((n, m))
+    acc[0] = cost[0]  # the match may start at any query frame
+    length[0] = 1
+    columns = np.arange(m)
+
+    for i in range(1, n):
+        steps = np.full((3, m), np.inf)
+        step_len = np.zeros((3, m))
+        steps[0, 1:] = acc[i - 1, :-1]
+        step_len[0, 1:] = length[i - 1, :-1]
+        if m > 2:
+            steps[1, 2:] = acc[i - 1, :-2] + cost[i, 1:-1]
+            step_len[1, 2:] = length[i - 1, :-2] + 1
+        if i >= 2:
+            steps[2, 1:] = acc[i - 2, :-1] + cost[i - 1, 1:]
+            step_len[2, 1:] = length[i - 2, :-1] + 1
+        best = np.argmin(steps, axis=0)
+        acc[i] = steps[best, columns] + cost[i]
+        length[i] = step_len[best, columns] + 1
+
+    normalized = acc[-1] / np.maximum(length[-1], 1)
+    end = int(np.argmin(normalized))
+    return float(normalized[end]), end
+
+
+class WakeWordSpotter:
+    def __init__(self, keyword: str = WAKE_WORD, sensitivity: float = WAKE_WORD_SENSITIVITY,
+                 armed_seconds: float = WAKE_WORD_ARMED_SECONDS,
+                 templates_file: str = "memory/wake_word.json"):
+        """
+        Initialize the spotter and load enrolled templates
+
+        Args:
+            keyword: Wake word the templates were recorded for
+            sensitivity: 0 (strict, fewer false wakes) to 1 (lenient, fewer misses)
+            armed_seconds: After a bare wake word, how long the next utterance is accepted without one
+            templates_file: Where enrolled templates are stored
+        """
+        self.keyword = keyword
+        self.sensitivity = sensitivity
+        self.armed_seconds = armed_seconds
+        self.templates_file = templates_file
+        self.front_end = MFCCFrontEnd()
+        self.templates: List[np.ndarray] = []
+        self.reference = None  # mean DTW distance between enrolled templates
+        self.on_detect: Optional[Callable[[float], None]] = None
+        self._armed_until = 0.0
+        self._lock = threading.Lock()
+        self.stats = {'utterances': 0, 'detections': 0, 'rejections': 0, 'armed_passes': 0,
+                      'cpu_seconds': 0.0, 'audio_seconds': 0.0}
+        self.load_templates()
+
+    # --- Templates ---
+
+    def load_templates(self):
+        """Load enrolled templates from file"""
+        if os.path.exists(self.templates_file):
+            try:
+                with open(self.templates_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.templates = [np.array(t, dtype=np.float32) for t in data.get('templates', [])]
+                self.reference = data.get('reference')
+                print(f"[WakeWord] Loaded {len(self.templates)} template(s) for '{data.get('keyword', self.keyword)}'")
+            except Exception as e:
+                print(f"[WakeWord] Error loading templates: {e}")
+                self.templates = []
+
+    def save_templates(self):
+        """Save enrolled templates to file"""
+        try:
+            os.makedirs(os.path.dirname(self.templates_file), exist_ok=True)
+            with open(self.templates_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'keyword': self.keyword,
+                    'reference': self.reference,
+                    'templates': [np.round(t, 3).tolist() for t in self.templates]
+                }, f)
+        except Exception as e:
+            print(f"[WakeWord] Error saving templates: {e}")
+
+    def is_enrolled(self) -> bool:
+        return len(self.templates) >= MIN_TEMPLATES and self.reference is not None
+
+    def enroll(self, samples: np.ndarray) -> bool:
+        """Add one recording of the wake word (16 kHz int16) as a template"""
+        samples = self._trim_silence(samples)
+        if len(samples) < 0.2 * SAMPLE_RATE:
+            print("[WakeWord] Enrollment sample too short, ignored")
+            return False
+        with self._lock:
+            self.templates.append(self.front_end.compute(samples))
+            self._update_reference()
+        self.save_templates()
+        return True
+
+    def enroll_from_microphone(self, count: int = MIN_TEMPLATES, prompt: Optional[Callable[[str], None]] = None,
+                               device_index: Optional[int] = None) -> int:
+        """Record the wake word `count` times from the microphone; returns templates added"""
+        import speech_recognition as sr
+        from engine.mic_calibration import mic_calibration, MIC_DEVICE_INDEX
+
+        device_index = MIC_DEVICE_INDEX if device_index is None else device_index
+        recognizer = sr.Recognizer()
+        added = 0
+        with sr.Microphone(device_index=device_index, sample_rate=SAMPLE_RATE) as source:
+            mic_calibration.apply(recognizer, source, device_index)
+            for attempt in range(count):
+                if prompt:
+                    prompt(f"Say '{self.keyword}' ({attempt + 1} of {count})")
+                try:
+                    audio = recognizer.listen(source, timeout=5, phrase_time_limit=2)
+                except sr.WaitTimeoutError:
+                    continue
+                raw = audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=2)
+                if self.enroll(np.frombuffer(raw, dtype=np.int16)):
+                    added += 1
+        return added
+
+    def reset(self):
+        """Forget all enrolled templates"""
+        with self._lock:
+            self.templates = []
+            self.reference = None
+        self.save_templates()
+
+    def _update_reference(self):
+        if len(self.templates) < 2:
+            self.reference = None
+            return
+        distances = [subsequence_dtw(a, b)[0]
+                     for i, a in enumerate(self.templates)
+                     for j, b in enumerate(self.templates) if i != j]
+        self.reference = float(np.mean(distances))
+
+    @staticmethod
+    def _trim_silence(samples: np.ndarray) -> np.ndarray:
+        """Cut leading/trailing frames more than 30 dB below the loudest frame"""
+        if len(samples) < FRAME_LEN:
+            return samples
+        energy = _frame_energy(samples) + 1e-6
+        voiced = np.nonzero(energy > energy.max() * 10 ** (-30 / 20))[0]
+        if not len(voiced):
+            return samples[:0]
+        return samples[voiced[0] * HOP:voiced[-1] * HOP + FRAME_LEN]
+
+    # --- Detection ---
+
+    @property
+    def threshold(self) -> float:
+        """Match cost below which the wake word is accepted"""
+        return self.reference * (0.9 + 0.6 * self.sensitivity)
+
+    def detect(self, samples: np.ndarray) -> Tuple[bool, float, int]:
+        """
+        Look for the wake word at the start of an utterance
+
+        Returns:
+            (detected, best match cost, sample index where the wake word ends)
+        """
+        if not self.is_enrolled():
+            return False, float('inf'), 0
+        window = samples[:int(SEARCH_SECONDS * SAMPLE_RATE)]
+        features = self.front_end.compute(window)
+        best_cost, best_end = float('inf'), 0
+        for template in self.templates:
+            cost, end = subsequence_dtw(template, features)
+            if cost < best_cost:
+                best_cost, best_end = cost, end
+        return best_cost <= self.threshold, best_cost, min(len(samples), best_end * HOP + FRAME_LEN)
+
+    def filter(self, samples: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Capture-stream utterance filter.
+
+        Returns the audio that should go to speech recognition (the command after
+        the wake word), or None when the utterance should be dropped.
+        """
+        start = time.thread_time()
+        self.stats['utterances'] += 1
+        self.stats['audio_seconds'] += len(samples) / SAMPLE_RATE
+        try:
+            now = time.time()
+            if now < self._armed_until:
+                # Follow-up to a bare "Spitch": this utterance is the command
+                self._armed_until = 0.0
+                self.stats['armed_passes'] += 1
+                return samples
+
+            detected, cost, end = self.detect(samples)
+            if not detected:
+                self.stats['rejections'] += 1
+                return None
+
+            self.stats['detections'] += 1
+            print(f"[WakeWord] Detected '{self.keyword}' (cost {cost:.2f}, threshold {self.threshold:.2f})")
+            if self.on_detect:
+                try:
+                    self.on_detect(cost)
+                except Exception as e:
+                    print(f"[WakeWord] on_detect callback failed: {e}")
+
+            command = samples[end:]
+            if self._voiced_seconds(samples, end) < MIN_COMMAND_SECONDS:
+                # Only the wake word was said: accept the next utterance without it
+                self._armed_until = now + self.armed_seconds
+                return None
+            return command
+        finally:
+            self.stats['cpu_seconds'] += time.thread_time() - start
+
+    @staticmethod
+    def _voiced_seconds(samples: np.ndarray, start: int) -> float:
+        """Speech after `start`, counting frames within 20 dB of the utterance's loudest frame"""
+        energy = _frame_energy(samples)
+        if not len(energy):
+            return 0.0
+        after = energy[start // HOP:]
+        return float(np.count_nonzero(after > energy.max() * 0.1)) * HOP / SAMPLE_RATE
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats['keyword'] = self.keyword
+        stats['enrolled_templates'] = len(self.templates)
+        stats['sensitivity'] = self.sensitivity
+        stats['threshold'] = self.threshold if self.reference is not None else None
+        stats['armed'] = time.time() < self._armed_until
+        audio_hours = stats['audio_seconds'] / 3600.0
+        stats['cpu_seconds_per_audio_hour'] = stats['cpu_seconds'] / audio_hours if audio_hours else None
+        return stats
+
+# Global instance
+wake_word_spotter = WakeWordSpotter()
@@ -2,6 +2,7 @@ import requests
 import re
 from datetime import datetime, timedelta
 from engine.user_prefs import get_user_location
+from engine.http_client import http_client
 
 GEOCODING_API_URL = "https://geocoding-api.open-meteo.com/v1/search"
 WEATHER_API_URL = "https://api.open-meteo.com/v1/forecast"
@@ -59,7 +60,7 @@ def get_weather(city: str = None, speak_func=None, query: str = "", forecast_day
                 # Fallback to IP-based geolocation
                 try:
                     print("[Weather] No saved location. Detecting via IP address...")
-                    ip_info_response = requests.get('https://ipinfo.io/json', timeout=5)
+                    ip_info_response = http_client.get('https://ipinfo.io/json', timeout=5)
                     ip_info_response.raise_for_status()
                     city = ip_info_response.json().get('city')
                     if not city:
@@ -82,7 +83,7 @@ def get_weather(city: str = None, speak_func=None, query: str = "", forecast_day
 
     # Step 1: Geocoding
     try:
-        geo_response = requests.get(GEOCODING_API_URL, params={"name": city, "count": 1})
+        geo_response = http_client.get(GEOCODING_API_URL, params={"name": city, "count": 1})
         geo_response.raise_for_status()
         geo_data = geo_response.json().get("results")
         if not geo_data:
@@ -105,7 +106,7 @@ def get_weather(city: str = None, speak_func=None, query: str = "", forecast_day
         "forecast_days": min(forecast_days, 16) # API supports up to 16 days
     }
     try:
-        weather_response = requests.get(WEATHER_API_URL, params=weather_params)
+        weather_response = http_client.get(WEATHER_API_URL, params=weather_params)
         weather_response.raise_for_status()
         weather_data = weather_response.json()
 
@@ -0,0 +1,223 @@
+"""
+Whisper Model Manager - Keeps speech models resident between utterances
+
+Takes Whisper model loading off the recognition hot path by:
+- Caching loaded models by name so each is read from disk once
+- Preloading the fallback model on a background thread after startup
+- Evicting models that sit idle longer than a configurable TTL to reclaim RAM
+- Recording load and transcription timings
+"""
+import gc
+import importlib.util
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+try:
+    from config import WHISPER_MODEL_DIR, WHISPER_FALLBACK_MODEL, WHISPER_IDLE_TTL
+except ImportError:
+    WHISPER_MODEL_DIR = "whisper_models"
+    WHISPER_FALLBACK_MODEL = "small"
+    WHISPER_IDLE_TTL = 900
+
+
+def _module_available(name: str) -> bool:
+    """Check that a package can be imported without importing it"""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class WhisperModelManager:
+    def __init__(self, download_root: str = WHISPER_MODEL_DIR, idle_ttl: float = WHISPER_IDLE_TTL,
+                 default_model: str = WHISPER_FALLBACK_MODEL):
+        """
+        Initialize the model cache (nothing is imported or loaded yet)
+
+        Args:
+            download_root: Directory Whisper downloads/reads weights from
+            idle_ttl: Seconds a model may stay unused before it is evicted (0 disables eviction)
+            default_model: Model used when transcribe() is called without a name
+        """
+        self.download_root = download_root
+        self.idle_ttl = idle_ttl
+        self.default_model = default_model
+        self.available = all(_module_available(name) for name in ('whisper', 'torch', 'numpy'))
+        self.device = "cpu"
+        self._whisper = None
+        self._torch = None
+        self._np = None
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._janitor = None
+        self.load_timings = deque(maxlen=50)
+        self.transcribe_timings = deque(maxlen=200)
+
+    def _import_backend(self):
+        """Import whisper/torch/numpy on first use (torch alone costs seconds)"""
+        if self._whisper is not None:
+            return
+        if not self.available:
+            raise ImportError("whisper, torch or numpy is not installed")
+        import whisper
+        import torch
+        import numpy as np
+        self._whisper, self._torch, self._np = whisper, torch, np
+        # Check if a CUDA-enabled GPU is available, otherwise use CPU
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        print(f"[WhisperManager] Using device: {self.device}")
+
+    def get_model(self, name: Optional[str] = None):
+        """Return a resident model, loading it (once) if needed"""
+        name = name or self.default_model
+        entry = self._models.get(name)
+        if entry:
+            entry['last_used'] = time.time()
+            return entry['model']
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        with load_lock:
+            entry = self._models.get(name)
+            if entry:
+                entry['last_used'] = time.time()
+                return entry['model']
+
+            self._import_backend()
+            print(f"[WhisperManager] Loading Whisper model ({name})...")
+            start = time.perf_counter()
+            model = self._whisper.load_model(name, device=self.device, download_root=self.download_root)
+            load_seconds = time.perf_counter() - start
+            self.load_timings.append({'model': name, 'seconds': load_seconds, 'timestamp': time.time()})
+            print(f"[WhisperManager] Model {name} loaded in {load_seconds:.2f}s")
+
+            self._models[name] = {
+                'model': model,
+                'loaded_at': time.time(),
+                'last_used': time.time(),
+                'in_use': 0
+            }
+            self._start_janitor()
+            return model
+
+    def preload(self, name: Optional[str] = None) -> threading.Thread:
+        """Load a model on a background thread so the first utterance doesn't pay for it"""
+        def _preload():
+            try:
+                self.get_model(name)
+            except Exception as e:
+                print(f"[WhisperManager] Preload of {name or self.default_model} failed: {e}")
+
+        thread = threading.Thread(target=_preload, name="whisper-preload", daemon=True)
+        thread.start()
+        return thread
+
+    def transcribe(self, audio, model_name: Optional[str] = None, language: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Transcribe audio with a resident model
+
+        Args:
+            audio: Raw 16 kHz mono int16 PCM bytes, or a float32 NumPy array in [-1, 1]
+            model_name: Model to use (default: the fallback model)
+            language: Whisper language code (e.g., 'en')
+
+        Returns:
+            Whisper's result dict plus 'model' and 'transcribe_seconds'
+        """
+        name = model_name or self.default_model
+        model = self.get_model(name)
+        with self._lock:
+            entry = self._models.get(name)
+            if entry:
+                entry['in_use'] += 1
+        try:
+            np = self._np
+            if isinstance(audio, (bytes, bytearray, memoryview)):
+                audio = np.frombuffer(audio, dtype=np.int16).astype(np.float32) / 32768.0
+
+            start = time.perf_counter()
+            result = model.transcribe(audio, fp16=(self.device == "cuda"), language=language)
+            seconds = time.perf_counter() - start
+        finally:
+            if entry:
+                entry['in_use'] -= 1
+                entry['last_used'] = time.time()
+
+        audio_seconds = len(audio) / 16000.0
+        self.transcribe_timings.append({
+            'model': name,
+            'seconds': seconds,
+            'audio_seconds': audio_seconds,
+            'timestamp': time.time()
+        })
+        result['model'] = name
+        result['transcribe_seconds'] = seconds
+        return result
+
+    def is_loaded(self, name: Optional[str] = None) -> bool:
+        """Check whether a model is currently resident"""
+        return (name or self.default_model) in self._models
+
+    def unload(self, name: str) -> bool:
+        """Drop a resident model and release its memory"""
+        with self._lock:
+            entry = self._models.get(name)
+            if not entry or entry['in_use'] > 0:
+                return False
+            del self._models[name]
+        del entry
+        gc.collect()
+        if self._torch is not None and self.device == "cuda":
+            self._torch.cuda.empty_cache()
+        print(f"[WhisperManager] Unloaded idle model {name}")
+        return True
+
+    def evict_idle(self) -> int:
+        """Unload every model idle for longer than the TTL; returns the number evicted"""
+        if not self.idle_ttl:
+            return 0
+        now = time.time()
+        idle = [name for name, entry in list(self._models.items())
+                if entry['in_use'] == 0 and now - entry['last_used'] > self.idle_ttl]
+        return sum(1 for name in idle if self.unload(name))
+
+    def _start_janitor(self):
+        """Start the idle-eviction thread once the first model is resident"""
+        if not self.idle_ttl or (self._janitor and self._janitor.is_alive()):
+            return
+
+        def _janitor_loop():
+            while self._models:
+                time.sleep(min(self.idle_ttl / 2.0, 60.0))
+                self.evict_idle()
+
+        self._janitor = threading.Thread(target=_janitor_loop, name="whisper-janitor", daemon=True)
+        self._janitor.start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Load/transcribe timings and residency for monitoring"""
+        now = time.time()
+        transcribes = list(self.transcribe_timings)
+        return {
+            'available': self.available,
+            'device': self.device,
+            'idle_ttl': self.idle_ttl,
+            'resident_models': {
+                name: {'idle_seconds': now - entry['last_used'], 'in_use': entry['in_use']}
+                for name, entry in self._models.items()
+            },
+            'loads': list(self.load_timings),
+            'transcribe_count': len(transcribes),
+            'avg_transcribe_seconds': (sum(t['seconds'] for t in transcribes) / len(transcribes)) if transcribes else None,
+            'recent_transcribes': transcribes[-10:]
+        }
+
+# Global instance
+whisper_manager = WhisperModelManager()
@@ -13,46 +13,172 @@ import eel
 import threading
 import time
 import re
+import queue
 import speech_recognition as sr
 from engine.features import *
 from engine.command import *
-from engine.speak_utils import speak
+from engine.speak_utils import speak, speak_async
+from engine.phrase_cache import phrase_cache
+from engine.tracing import tracer
 
 eel.init('www')
 
+try:
+    from config import CONTINUOUS_CAPTURE_STREAM
+except ImportError:
+    CONTINUOUS_CAPTURE_STREAM = True
+
+try:
+    from config import WAKE_WORD_ENABLED
+except ImportError:
+    WAKE_WORD_ENABLED = False
+
+# Fixed phrases, pre-rendered by the phrase cache so they play without live synthesis
+GREETING = "Hello! I'm Spitch, your AI assistant. Click the microphone button to start voice commands, or type your commands in the text box. I can help you with music, apps, web searches, and much more!"
+LISTENING_STARTED = "Voice assistant activated. I'm listening for your commands. Say 'stop' to stop me."
+LISTENING_STOPPED = "Voice assistant stopped."
+LISTENING_GOODBYE = "Stopping voice assistant. Goodbye!"
+
+phrase_cache.register([GREETING, LISTENING_STARTED, LISTENING_STOPPED, LISTENING_GOODBYE])
+
 # Global variable to control continuous listening
 continuous_listening = False
 listening_thread = None
-wake_word_enabled = False  # Disable wake word by default for easier use
+wake_word_enabled = WAKE_WORD_ENABLED  # Disabled by default for easier use
+wake_word_enrolling = False
+
+def _wake_word_filter():
+    """The wake word utterance filter when detection is enabled and enrolled, else None"""
+    from engine.wake_word import wake_word_spotter
+    if wake_word_enabled and wake_word_spotter.is_enrolled():
+        wake_word_spotter.on_detect = lambda cost: eel.DisplayMessage("Yes? I'm listening...")
+        return wake_word_spotter.filter
+    return None
+
+def _apply_wake_word(capture):
+    """Gate the capture stream on the wake word when it is enabled and enrolled"""
+    capture.utterance_filter = _wake_word_filter()
+
+def _open_capture_stream():
+    """Start the persistent microphone stream, or return None to fall back to takeCommand()"""
+    if not CONTINUOUS_CAPTURE_STREAM:
+        return None
+    try:
+        from engine.audio_capture import audio_capture
+        from engine.speak_utils import is_speaking
+        audio_capture.suppress_when = is_speaking
+        _apply_wake_word(audio_capture)
+        audio_capture.start()
+        return audio_capture
+    except Exception as e:
+        print(f"[LISTENING] Capture stream unavailable, using per-command microphone: {e}")
+        eel.DisplayMessage("Microphone stream unavailable, listening one command at a time")
+        return None
+
+def _end_trace(root, outcome, error=None):
+    """Finish a voice_command trace, noting how the attempt ended (command, no_speech, error, stop)"""
+    if root is not None:
+        root.set(outcome=outcome)
+    tracer.finish(root, error)
+
+def _start_recognition(capture):
+    """Recognize captured utterances on their own thread so the next command is
+    transcribed while the previous one is still executing"""
+    queries = queue.Queue()
+
+    def _recognize_loop():
+        while continuous_listening:
+            utterance = capture.get_utterance(timeout=0.5)
+            if utterance is None:
+                continue
+            print(f"[LISTENING] Captured {utterance.duration:.1f}s utterance")
+            # The trace opened here is finished by the listening loop once the command has run
+            root = tracer.begin('voice_command')
+            if root is not None:
+                root.start = utterance.started_at  # The command began when the user started speaking
+            with tracer.activate(root):
+                tracer.record('capture', utterance.started_at, utterance.started_at + utterance.duration,
+                              source='stream', seconds=round(utterance.duration, 2))
+                try:
+                    query = recognize_audio(utterance.audio)
+                except Exception as e:
+                    print(f"[LISTENING] Recognition error: {e}")
+                    _end_trace(root, 'error', e)
+                    continue
+            if query:
+                queries.put((query, root))
+            else:
+                _end_trace(root, 'no_speech')
+
+    threading.Thread(target=_recognize_loop, name="spitch-recognize", daemon=True).start()
+    return queries
+
+def _next_query(capture, queries):
+    """Wait for the next spoken command; returns (query, trace root)"""
+    if capture is None:
+        root = tracer.begin('voice_command')
+        with tracer.activate(root):
+            try:
+                # No capture stream: apply the wake word to each takeCommand() recording instead
+                query = takeCommand(utterance_filter=_wake_word_filter())
+            except Exception as e:
+                _end_trace(root, 'error', e)
+                raise
+        if not query:
+            _end_trace(root, 'no_speech')
+            return "", None
+        return query, root
+    try:
+        return queries.get(timeout=0.5)
+    except queue.Empty:
+        return "", None
 
 def continuous_listen():
     """Background thread function for continuous voice listening"""
     global continuous_listening
+    capture = _open_capture_stream()
+    queries = _start_recognition(capture) if capture is not None else None
+    eel.DisplayMessage("Listening... Say 'stop' or 'goodbye' to stop me")
     while continuous_listening:
         try:
-            print("[LISTENING] Listening for voice commands...")
-            eel.DisplayMessage("Listening... Say 'stop' or 'goodbye' to stop me")
+            if capture is not None and not capture.is_running():
+                # The device went away mid-session: keep listening through takeCommand()
+                print(f"[LISTENING] Capture stream stopped ({capture.error}), using per-command microphone")
+                eel.DisplayMessage("Microphone stream lost, listening one command at a time")
+                capture = None
+
+            if capture is None:
+                print("[LISTENING] Listening for voice commands...")
+                eel.DisplayMessage("Listening... Say 'stop' or 'goodbye' to stop me")
             
             # Take a voice command
-            query = takeCommand()
+            query, trace_root = _next_query(capture, queries)
             
             if query:
                 print(f"[HEARD] Heard: {query}")
                 
                 # Check for stop command first
                 if any(phrase in query.lower() for phrase in ['stop', 'stop listening', 'stop assistant', 'goodbye', 'exit', 'quit', 'bye', 'end']):
-                    speak("Stopping voice assistant. Goodbye!")
+                    _end_trace(trace_root, 'stop')
+                    speak(LISTENING_GOODBYE)
                     stop_continuous_listening()
                     eel.force_stop_listening_ui()
                     break
                 
-                # Process the command directly (no wake word required)
+                # Process the command (already gated by the wake word on the capture thread if enabled)
                 print(f"[PROCESSING] Processing command: {query}")
-                processTextCommand(query)
+                try:
+                    with tracer.activate(trace_root):
+                        processTextCommand(query)
+                except Exception as e:
+                    _end_trace(trace_root, 'error', e)
+                    raise
+                _end_trace(trace_root, 'command')
                 
-                # Brief pause before listening again
-                time.sleep(1)
-            else:
+                # Brief pause before listening again (the capture stream keeps recording meanwhile)
+                if capture is None:
+                    time.sleep(1)
+            elif capture is None:
                 # No speech detected, continue listening
                 time.sleep(0.5)
                 
@@ -64,6 +190,12 @@ def continuous_listen():
             print(f"Error in continuous listening: {e}")
             time.sleep(1)
 
+    if capture is not None:
+        capture.stop()
+        stats = capture.get_stats()
+        print(f"[LISTENING] Capture stats: {stats['utterances_emitted']} utterances, "
+              f"{stats['frames_dropped']} dropped frames, {stats['utterances_dropped']} dropped utterances")
+
 @eel.expose
 def start_continuous_listening():
     """Start continuous voice listening mode (called when mic button is clicked)"""
@@ -71,7 +203,7 @@ def start_continuous_listening():
     
     if not continuous_listening:
         continuous_listening = True
-        speak("Voice assistant activated. I'm listening for your commands. Say 'stop' to stop me.")
+        speak_async(LISTENING_STARTED)
         
         # Start listening in background thread
         listening_thread = threading.Thread(target=continuous_listen, daemon=True)
@@ -96,7 +228,7 @@ def stop_continuous_listening():
             except Exception as e:
                 print(f"Thread join error (non-critical): {e}")
         
-        speak("Voice assistant stopped.")
+        speak(LISTENING_STOPPED)
         return {"status": "stopped", "message": "Voice assistant stopped"}
     else:
         return {"status": "not_running", "message": "Voice assistant not running"}
@@ -107,18 +239,80 @@ def get_listening_status():
     global continuous_listening
     return {"listening": continuous_listening}
 
+@eel.expose
+def get_capture_stats():
+    """Get microphone capture statistics (frames read/dropped, utterances queued)"""
+    try:
+        from engine.audio_capture import audio_capture
+        return audio_capture.get_stats()
+    except Exception as e:
+        return {"running": False, "error": str(e)}
+
+def _enroll_wake_word():
+    """Record the wake word a few times, then turn wake word detection on"""
+    global wake_word_enabled, wake_word_enrolling
+    from engine.wake_word import wake_word_spotter
+    wake_word_enrolling = True
+    try:
+        speak(f"Let's teach me my wake word. Say '{wake_word_spotter.keyword}' each time I ask.")
+        wake_word_spotter.reset()
+        wake_word_spotter.enroll_from_microphone(prompt=eel.DisplayMessage)
+        if wake_word_spotter.is_enrolled():
+            wake_word_enabled = True
+            speak("Got it. Wake word detection enabled.")
+        else:
+            speak("I couldn't hear the wake word clearly. Please try again.")
+    except Exception as e:
+        print(f"[WakeWord] Enrollment failed: {e}")
+        speak("Wake word enrollment failed.")
+    finally:
+        wake_word_enrolling = False
+        _refresh_wake_word()
+
+def _refresh_wake_word():
+    """Apply the wake word setting to a running capture stream"""
+    if not CONTINUOUS_CAPTURE_STREAM:
+        return
+    try:
+        from engine.audio_capture import audio_capture
+        _apply_wake_word(audio_capture)
+    except Exception as e:
+        print(f"[WakeWord] Could not update capture stream: {e}")
+
+@eel.expose
+def enroll_wake_word():
+    """Record new wake word templates in the background"""
+    if wake_word_enrolling:
+        return {"status": "enrolling"}
+    threading.Thread(target=_enroll_wake_word, name="wake-word-enroll", daemon=True).start()
+    return {"status": "enrolling"}
+
 @eel.expose
 def toggle_wake_word():
     """Toggle wake word detection on/off"""
     global wake_word_enabled
+    from engine.wake_word import wake_word_spotter
+    if not wake_word_enabled and not wake_word_spotter.is_enrolled():
+        # Nothing to match against yet: record the wake word first, it turns on when done
+        enroll_wake_word()
+        return {"wake_word_enabled": False, "status": "enrolling"}
     wake_word_enabled = not wake_word_enabled
+    _refresh_wake_word()
     status = "enabled" if wake_word_enabled else "disabled"
     speak(f"Wake word detection {status}.")
     return {"wake_word_enabled": wake_word_enabled, "status": status}
 
-# Welcome message
+@eel.expose
+def get_wake_word_stats():
+    """Get wake word detections, rejections and CPU cost per hour of audio"""
+    from engine.wake_word import wake_word_spotter
+    stats = wake_word_spotter.get_stats()
+    stats['enabled'] = wake_word_enabled
+    return stats
+
+# Welcome message (queued so the UI starts while it plays)
 playAssistantSound()
-speak("Hello! I'm Spitch, your AI assistant. Click the microphone button to start voice commands, or type your commands in the text box. I can help you with music, apps, web searches, and much more!")
+speak_async(GREETING)
 
 # Open the web interface (handled by Eel now)
 # os.system('start chrome.exe --app="http://localhost:8000/index.html"')
@@ -244,15 +244,50 @@ $(document).ready(function() {
             .then(data => data.result);
     }
 
-    // Replace eel.processTextCommand(command)() with fetch
+    // Replace eel.processTextCommand(command)() with fetch, rendering the answer as it streams in
     function processTextCommandFetch(command) {
-        return fetch('/api/processTextCommand', {
+        return fetch('/api/stream', {
             method: 'POST',
             headers: {'Content-Type': 'application/json'},
             body: JSON.stringify({query: command})
+        }).then(res => {
+            const reader = res.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let text = '';
+            function read() {
+                return reader.read().then(({done, value}) => {
+                    if (done) return {response: text};
+                    buffer += decoder.decode(value, {stream: true});
+                    const events = buffer.split('\n\n');
+                    buffer = events.pop();
+                    for (const event of events) {
+                        if (!event.startsWith('data: ')) continue;
+                        const data = JSON.parse(event.slice(6));
+                        if (data.token) {
+                            text += data.token;
+                            $("#assistantResponse").text(text);
+                        }
+                        if (data.done) return {response: data.response || text};
+                    }
+                    return read();
+                });
+            }
+            return read();
         });
     }
 
+    // Stop the answer being generated
+    function cancelGenerationFetch() {
+        return fetch('/api/cancel', {method: 'POST'});
+    }
+
+    $(document).keydown(function(e) {
+        if (e.keyCode === 27) { // Escape key
+            cancelGenerationFetch();
+        }
+    });
+
     // Replace eel.test_command()(function(result) {...}) with fetch
     function testCommandFetch() {
         return fetch('/api/test_command')
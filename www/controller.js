@@ -20,6 +20,14 @@ $(document).ready(function () {
         $("#SiriWave").attr("hidden", true);
     }
     
+    // Render an AI answer while it is still being generated
+    eel.expose(StreamResponse)
+    function StreamResponse(text) {
+        $("#processingIndicator").hide();
+        $("#responseText").text(text);
+        $("#siriResponse").show();
+    }
+    
     // Update voice assistant status
     eel.expose(UpdateVoiceAssistantStatus)
     function UpdateVoiceAssistantStatus(isActive) {
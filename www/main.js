@@ -105,8 +105,11 @@ $(document).ready(function () {
             e.preventDefault();
             $("#MicBtn").click();
         }
-        // Escape key to stop voice assistant
-        if (e.keyCode === 27 && voiceAssistantActive) { // Escape key
+        // Escape key to stop the answer being generated and the voice assistant
+        if (e.keyCode === 27) { // Escape key
+            eel.cancel_generation()();
+        }
+        if (e.keyCode === 27 && voiceAssistantActive) {
             e.preventDefault();
             $("#MicBtn").click();
         }